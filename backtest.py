@@ -1,24 +1,44 @@
+import os
 import time
-from typing import Any, List, Optional, Type
+from typing import Any, Dict, List, Optional, Type, Union
 
 import pandas as pd
 
-from core.simulation_loader import SimulationLoader
+from core.batch_simulator import BatchSimulator
+from core.market_simulator import MarketSimulator
+from core.multi_timeframe_simulator import MultiTimeframeSimulator
+from core.simulation_loader import DEFAULT_CHUNK_SIZE, SimulationLoader
 from core.simulation_runner import SimulationRunner
+from enums.bar_path_model import BarPathModel
 from enums.indicator import Indicator
 from plotter.plot_manager import PlotManager
 from utils.logger import get_logger
 from utils.plot_perfomance import plot_performance_dashboard
 
 TIMEFRAMES: List[int] = [15]
+# Entries of a timeframe only in the direction of the trend of a higher one, e.g. {5: 60, 15: 60}
+# (every timeframe involved must be in TIMEFRAMES)
+HIGHER_TIMEFRAME_FILTER: Dict[int, int] = {}
 INDICATORS: List[Indicator] = [Indicator.TREND_SIGNALS, Indicator.BOLL, Indicator.SMMA, Indicator.RSI]
 SUB_PLOTS: List[Any] = []
 USE_LIGHTWEIGHT: bool = False
 EXPORT_TO_CSV: bool = True
 COMPARE_WITH_TREND_SIGNALS: bool = False
 EXPORT_POSITION_CSV: bool = True
+VECTORIZED: bool = False
+# Ticks per chunk to stream the tick file instead of loading it whole (tick-by-tick engine only)
+CHUNK_SIZE: Optional[int] = None
+# Incremental runs: resume from the checkpoint of each timeframe when it exists, then save it again,
+# so only the ticks appended since the previous run are simulated (tick-by-tick engine only)
+USE_CHECKPOINT: bool = False
+CHECKPOINT_PATH: str = "export/checkpoint_{timeframe}m.npz"
 
 TICK_PATH: str = "history/gold_minute_ticks.csv"
+# Simulate directly on OHLC bars (time, open, high, low, close) instead of TICK_PATH, resolving SL/TP
+# inside each bar with BAR_PATH_MODEL (vectorized engine, one timeframe at a time)
+BAR_PATH: Optional[str] = None
+BAR_PATH_MODEL: BarPathModel = BarPathModel.NEAREST_FIRST
+BAR_PATH_SEED: int = 0
 HISTORICAL_PATH: str = "history/gold_m15.csv"
 START_DATE: pd.Timestamp = pd.Timestamp(2025, 1, 1, 0, 0)
 PLOTTER_TRADES: bool = True
@@ -37,22 +57,72 @@ class Backtest:
         self.load_data()
     
     def load_data(self):
-        self.loader.load_data()
+        self.loader.load_data(stream=CHUNK_SIZE is not None and not self.loader.bars)
         self.loader.filter_by_start_date(START_DATE)
 
     def run(self):
+        per_timeframe = VECTORIZED or USE_CHECKPOINT or self.loader.bars
+        if HIGHER_TIMEFRAME_FILTER and per_timeframe:
+            raise ValueError(
+                "HIGHER_TIMEFRAME_FILTER requires VECTORIZED = False, USE_CHECKPOINT = False and BAR_PATH = None"
+            )
+        # Several timeframes (or a higher-timeframe filter) share one pass over the ticks.
+        if not per_timeframe and (len(TIMEFRAMES) > 1 or HIGHER_TIMEFRAME_FILTER):
+            self.run_multi_timeframe(self.indicators)
+            return
+
         for timeframe in TIMEFRAMES:
             self.run_backtest(timeframe, self.indicators)
 
+    def run_multi_timeframe(self, indicators: Optional[List[Indicator]] = None):
+        bot = MultiTimeframeSimulator(
+            TIMEFRAMES,
+            indicators=indicators,
+            tz=self.loader.get_tz(),
+            confirm_with=HIGHER_TIMEFRAME_FILTER
+        )
+        time_start = time.time()
+        for times, prices in self.loader.iter_tick_chunks(CHUNK_SIZE or DEFAULT_CHUNK_SIZE):
+            bot.process_ticks(times, prices)
+        bot.finalize_current_candle()
+        self.logger.info(f"Simulated timeframes {TIMEFRAMES} in {time.time() - time_start} seconds.")
+
+        for timeframe in TIMEFRAMES:
+            self.export_results(timeframe, bot[timeframe], indicators)
+
     def run_backtest(self, timeframe: int, indicators: Optional[List[Indicator]] = None):
+        if self.loader.bars:
+            runner = SimulationRunner(
+                self.loader,
+                timeframe=timeframe,
+                indicators=indicators,
+                bar_path_model=BAR_PATH_MODEL,
+                bar_path_seed=BAR_PATH_SEED
+            )
+            runner.run()
+            self.export_results(timeframe, runner.bot, indicators)
+            return
+
+        checkpoint = CHECKPOINT_PATH.format(timeframe=timeframe) if USE_CHECKPOINT else None
         runner = SimulationRunner(
             self.loader,
             timeframe=timeframe,
-            indicators=indicators
+            indicators=indicators,
+            vectorized=VECTORIZED,
+            chunk_size=CHUNK_SIZE,
+            resume_from=checkpoint if checkpoint is not None and os.path.exists(checkpoint) else None
         )
-        runner.run(progress=False)
-        df = runner.export_to_dataframe()
-        
+        runner.run(progress=False, checkpoint_path=checkpoint)
+        self.export_results(timeframe, runner.bot, indicators)
+
+    def export_results(
+        self,
+        timeframe: int,
+        bot: Union[MarketSimulator, BatchSimulator],
+        indicators: Optional[List[Indicator]] = None
+    ):
+        df = bot.export_to_dataframe()
+
         if EXPORT_TO_CSV:
             self.logger.info("Exporting CSV...")
             filename = f"export/backtest_{timeframe}m_results_{int(time.time())}.csv"
@@ -62,26 +132,31 @@ class Backtest:
         if EXPORT_POSITION_CSV or PLOTTER_PERFORMANCE:
             self.logger.info("Exporting PositionS CSV...")
             filename = f"export/backtest_{timeframe}m_positions_{int(time.time())}.csv"
-            positions_df = runner.bot.position_manager.export_closed_positions_to_dataframe()
+            positions_df = bot.position_manager.export_closed_positions_to_dataframe()
             if EXPORT_POSITION_CSV:
                 positions_df.to_csv(filename, index=False)
                 self.logger.info(f"Exported to {filename}")
             
             if PLOTTER_PERFORMANCE:
-                summary = runner.bot.position_manager.analyze_closed_positions()
-                plot_performance_dashboard(runner.bot.position_manager.closed_positions, summary)
+                summary = bot.position_manager.analyze_closed_positions()
+                plot_performance_dashboard(
+                    bot.position_manager.closed_positions,
+                    summary,
+                    tz=bot.position_manager.tz,
+                    equity_tracker=bot.equity_tracker
+                )
         
         if PLOTTER_HISTORICAL:
             self.logger.info("Plotting...")
             plotter = CLASS_USE_TO_PLOT(df[-500:], indicators)
-            plotter.set_positions(runner.bot.position_manager.closed_positions[-500:])
+            plotter.set_positions(bot.position_manager.closed_positions[-500:])
             plotter.plot(start_idx=0, end_idx=500)
             self.logger.info("Plotted")
 
 
 if __name__ == "__main__":
     backtest = Backtest(
-        loader=SimulationLoader(TICK_PATH, HISTORICAL_PATH),
+        loader=SimulationLoader(BAR_PATH or TICK_PATH, HISTORICAL_PATH, bars=BAR_PATH is not None),
         indicators=INDICATORS
     )
     backtest.run()
@@ -10,6 +10,7 @@ ATR_PERIOD = 1
 USE_ATR = True
 LENGTH = 9
 SMMA_LENGTH = 9
+SMMA_SEED = "sma"  # "sma" (media simple de los primeros SMMA_LENGTH cierres) o "first" (primer cierre)
 BREAK_EVEN_TRIGGER = 5
 TRAILING_DISTANCE = 5
 EARLY_CONFIRMATION_BODY_MULTIPLIER = 1.005
@@ -27,7 +28,13 @@ RRR_SOFT = 1.0
 RRR_HARD = 2.0
 MIN_RRR = 1.0
 LOOKBACK = 5
+MAX_LOOKBACK = 50
+BREAK_EVEN_ACTIVATE_USD = 60
+BREAK_EVEN_PROFIT_USD = 100
+MAX_POSITIONS = 1  # posiciones abiertas a la vez; > 1 permite piramidar en la dirección de la señal
+CLOSE_ON_TREND_CHANGE = True  # cerrar las posiciones contrarias cuando aparece una señal opuesta
 RSI_PERIOD = 10
+RSI_SMOOTHING = "simple"  # "simple" (media de las últimas RSI_PERIOD variaciones) o "wilder"
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 WS_URL = "wss://api-streaming-capital.backend-capital.com/connect"
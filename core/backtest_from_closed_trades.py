@@ -1,109 +1,159 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict
+
 import numpy as np
 import pandas as pd
-import vectorbt as vbt
-
-
-def align_to_candle_time(ts: pd.Timestamp, timeframe: int = 15) -> pd.Timestamp:
-    return ts.floor(f'{timeframe}min')
-
-
-def align_timestamp(ts: pd.Timestamp, timeframe_min: int = 15) -> pd.Timestamp:
-    """
-    Alinea cualquier timestamp al inicio de su vela correspondiente.
-    """
-    return ts.floor(f'{timeframe_min}min')
-
-
-def find_candle_index(candle_times: pd.Series, target_time: pd.Timestamp) -> Optional[int]:
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from config import BALANCE
+from models.instrument import XAUUSD, InstrumentSpec
+from utils.ensure_datetime import from_epoch_ns, to_epoch_ns
+from utils.logger import get_logger
+from utils.performance_analytics import (
+    drawdown_curve,
+    drawdown_periods,
+    periods_per_year,
+    returns_from_equity,
+    sharpe_ratio,
+    sortino_ratio,
+)
+
+
+def candle_indices(candle_times: np.ndarray, times: np.ndarray) -> np.ndarray:
     """
-    Busca el indice de la vela que corresponde al timestamp objetivo.
+    Index of the candle containing each time: the last candle opened at or before it (-1 before the first).
+    One searchsorted over the sorted int64 candle open times, valid for any timeframe, including the tick
+    that closes a candle and is stamped after the next candle boundary.
     """
-    target_time = align_timestamp(pd.to_datetime(target_time))
-    candle_times = pd.to_datetime(candle_times).dt.floor('15min')
+    return np.asarray(np.searchsorted(candle_times, times, side="right")) - 1
 
-    mask = candle_times == target_time
-    if mask.any():
-        return mask.idxmax()
-    else:
-        return None
 
-
-def process_trade_entry_exit(trade_row, candles_df):
-    """
-    Alinea y encuentra los indices de entry y exit para un trade.
-    """
-    entry_time_aligned = align_timestamp(trade_row['entry_time'])
-    exit_time_aligned = align_timestamp(trade_row['exit_time'])
-
-    entry_idx = find_candle_index(candles_df['time'], entry_time_aligned)
-    exit_idx = find_candle_index(candles_df['time'], exit_time_aligned)
-
-    return entry_idx, exit_idx
+@dataclass
+class ClosedTradesReplay:
+    """Result of BacktestFromClosedTrades.run_backtest: equity at every candle close and the replayed trades."""
+    times: np.ndarray
+    equity: np.ndarray
+    trades: pd.DataFrame
+    initial_balance: float
+    tz: Any = None
 
 
 class BacktestFromClosedTrades:
-    def __init__(self, trades_df: pd.DataFrame):
-        self.trades_df = trades_df.copy()
-
-    def prepare_orders(self):
-        direction_map = {'BUY': 1, 'SELL': -1}
-        self.trades_df['direction'] = self.trades_df['type'].map(direction_map)
-        self.trades_df['size'] = self.trades_df['lot_size'] * self.trades_df['direction']
-        self.trades_df['entry_time'] = pd.to_datetime(self.trades_df['entry_time'])
-        self.trades_df['exit_time'] = pd.to_datetime(self.trades_df['exit_time'])
-
-    def run_backtest(self, initial_balance=10000, fees=0.0001, slippage=0.0):
-        self.prepare_orders()
-
-        data = pd.read_csv("export/backtest_15m_results_1745850560.csv")
-        data['time'] = pd.to_datetime(data['time'])
-        self.trades_df['entry_candle_time'] = self.trades_df['entry_time'].apply(align_to_candle_time)
-        self.trades_df['exit_candle_time'] = self.trades_df['exit_time'].apply(align_to_candle_time)
-
-        entries = np.zeros(len(data), dtype=bool)
-        exits = np.zeros(len(data), dtype=bool)
-        sizes = np.zeros(len(data))
-                
-        # Para cada trade, marca en qué vela entra y sale
-        for _, trade in self.trades_df.iterrows():
-            entry_idx, exit_idx = process_trade_entry_exit(trade, data)
-            if entry_idx is not None and exit_idx is not None:
-                direction = 1 if trade['type'] == 'BUY' else -1
-                entries[entry_idx] = True
-                exits[exit_idx] = True
-                sizes[entry_idx] = trade['lot_size'] * direction
-
-        pf = vbt.Portfolio.from_signals(
-            open=data['open'].values,
-            high=data['high'].values,
-            low=data['low'].values,
-            close=data['close'].values,
-            entries=entries,
-            exits=exits,
-            size=sizes,
-            init_cash=10000,    # tu balance inicial
-            fees=0.0001,        # ejemplo: 0.01%
-            slippage=0.0        # sin slippage
+    def __init__(self, trades_df: pd.DataFrame, instrument: InstrumentSpec = XAUUSD):
+        """
+        trades_df: Closed positions as exported by PositionManager.export_closed_positions_to_dataframe
+        (or read back from its csv with parse_dates=["entry_time", "exit_time"])
+        instrument: Symbol the trades were made on; its contract_size converts lots to units
+        """
+        self.logger = get_logger(__name__)
+        self.trades_df = trades_df
+        self.instrument = instrument
+
+    def run_backtest(
+        self,
+        candles_df: pd.DataFrame,
+        initial_balance: float = BALANCE,
+        fees: float = 0.0001,
+        slippage: float = 0.0
+    ) -> ClosedTradesReplay:
+        """
+        Replays the trades on candles_df (the results DataFrame of the simulator: time/close columns).
+        Each trade enters at the close of the candle holding its entry_time and exits at the close of the
+        candle holding its exit_time; slippage moves both fills against the trade and fees are charged
+        on the notional of each fill (fractions of the price).
+        """
+        candle_times = to_epoch_ns(candles_df["time"])
+        closes = candles_df["close"].to_numpy(dtype=np.float64)
+        n_candles = len(closes)
+
+        entry_idx = candle_indices(candle_times, to_epoch_ns(self.trades_df["entry_time"]))
+        exit_idx = candle_indices(candle_times, to_epoch_ns(self.trades_df["exit_time"]))
+        valid = entry_idx >= 0
+        if not valid.all():
+            self.logger.warning(f"{int((~valid).sum())} trades start before the first candle and are skipped")
+        entry_idx = entry_idx[valid]
+        exit_idx = np.maximum(exit_idx[valid], entry_idx)
+
+        directions = np.where(self.trades_df["type"].to_numpy()[valid] == "BUY", 1, -1)
+        # Units per lot, as in PositionManager.close_position (profit = price move * contract_size * lot_size).
+        units = self.trades_df["lot_size"].to_numpy(dtype=np.float64)[valid] * self.instrument.contract_size
+        entry_prices = closes[entry_idx] * (1 + slippage * directions)
+        exit_prices = closes[exit_idx] * (1 - slippage * directions)
+        entry_fees = entry_prices * units * fees
+        exit_fees = exit_prices * units * fees
+        pnl = (exit_prices - entry_prices) * units * directions - entry_fees - exit_fees
+
+        # Realized profit lands on the exit candle; candles in [entry, exit) carry the open profit.
+        realized = np.cumsum(np.bincount(exit_idx, weights=pnl, minlength=n_candles))
+        lengths = exit_idx - entry_idx
+        trade_of_row: np.ndarray = np.repeat(np.arange(len(entry_idx)), lengths)
+        starts: np.ndarray = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        open_rows = entry_idx[trade_of_row] + np.arange(len(trade_of_row)) - starts
+        open_pnl = (
+            (closes[open_rows] - entry_prices[trade_of_row]) * units[trade_of_row] * directions[trade_of_row] -
+            entry_fees[trade_of_row]
+        )
+        equity = initial_balance + realized + np.bincount(open_rows, weights=open_pnl, minlength=n_candles)
+
+        trades = pd.DataFrame({
+            "entry_idx": entry_idx,
+            "exit_idx": exit_idx,
+            "direction": directions,
+            "size": units * directions,
+            "entry_price": entry_prices,
+            "exit_price": exit_prices,
+            "fees": entry_fees + exit_fees,
+            "pnl": pnl,
+        })
+        tz = getattr(candles_df["time"].dtype, "tz", None)
+        return ClosedTradesReplay(candle_times, equity, trades, initial_balance, tz)
+
+    def get_stats(self, replay: ClosedTradesReplay) -> Dict[str, Any]:
+        pnl = replay.trades["pnl"].to_numpy()
+        wins = pnl[pnl >= 0]
+        losses = pnl[pnl < 0]
+        drawdowns, drawdowns_pct = drawdown_curve(replay.equity)
+        periods = drawdown_periods(replay.times, replay.equity)
+        candles_per_year = periods_per_year(replay.times)
+        candles_per_year = None if np.isnan(candles_per_year) else candles_per_year
+        returns = returns_from_equity(replay.equity)
+        final_equity = float(replay.equity[-1]) if len(replay.equity) else replay.initial_balance
+        return {
+            "start_value": replay.initial_balance,
+            "end_value": final_equity,
+            "total_return_percent": (final_equity / replay.initial_balance - 1) * 100,
+            "total_trades": len(pnl),
+            "winrate_percent": len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+            "profit_factor": abs(wins.sum() / losses.sum()) if losses.sum() != 0 else np.inf,
+            "total_fees": float(replay.trades["fees"].sum()),
+            "max_drawdown": float(drawdowns.max()) if len(drawdowns) else 0.0,
+            "max_drawdown_percent": float(drawdowns_pct.max()) if len(drawdowns) else 0.0,
+            "max_drawdown_duration": periods["duration"].max() if len(periods) else pd.Timedelta(0),
+            "sharpe_ratio": sharpe_ratio(returns, candles_per_year),
+            "sortino_ratio": sortino_ratio(returns, candles_per_year),
+        }
+
+    def plot(self, replay: ClosedTradesReplay):
+        times = from_epoch_ns(replay.times, replay.tz)
+        drawdowns, _ = drawdown_curve(replay.equity)
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.03)
+        fig.add_trace(go.Scatter(x=times, y=replay.equity, name="Equity", line={"color": "blue"}), row=1, col=1)
+        fig.add_trace(
+            go.Scatter(x=times, y=-drawdowns, name="Drawdown", fill="tozeroy", line={"color": "red"}),
+            row=2, col=1
         )
-
-        return pf
-
-    def get_stats(self, portfolio):
-        return portfolio.stats()
-
-    def plot(self, portfolio):
-        fig = portfolio.plot()
         fig.update_layout(
             width=1800,
             height=1000,
+            template="plotly_dark",
         )
         fig.show()
 
 
 # Ejemplo de uso:
-# df = pd.read_csv("path_to_your_trades.csv", parse_dates=['entry_time', 'exit_time'])
-# backtester = BacktestFromClosedTrades(df)
-# portfolio = backtester.run_backtest()
-# print(backtester.get_stats(portfolio))
-# backtester.plot(portfolio)
+# trades = runner.bot.position_manager.export_closed_positions_to_dataframe()
+# backtester = BacktestFromClosedTrades(trades)
+# replay = backtester.run_backtest(runner.export_to_dataframe())
+# print(backtester.get_stats(replay))
+# backtester.plot(replay)
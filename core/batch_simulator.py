@@ -0,0 +1,535 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+from core.market_components.bar_path import DEFAULT_BRIDGE_POINTS, bar_minutes_of, build_bar_path, resample_bars_numba
+from core.position_components.equity_tracker import EquityTracker
+from core.position_components.exit_resolver import EXIT_NONE, resolve_exit_numba
+from core.position_components.trade_ledger import TradeLedger
+from core.position_manager import PositionManager, dollars_to_pips
+from enums.bar_path_model import BarPathModel
+from enums.indicator import Indicator, indicator_keys
+from indicators_tools.bollinger import rolling_bollinger_numba
+from indicators_tools.rsi import RSI_SMOOTHING_WILDER, rsi_rolling_numba
+from indicators_tools.smma import SMMA_SEED_SMA, smma_streaming_numba
+from indicators_tools.trend_signals import trend_signals_numba
+from models.instrument import InstrumentSpec
+from models.position import Position
+from models.strategy_params import StrategyParams
+from utils.calculate_next_open_time import get_next_open_time_ns
+from utils.ensure_datetime import from_epoch_ns
+from utils.logger import get_logger
+from utils.swing_index import calculate_tp_sl_batch
+
+EXIT_CHANGE_TREND_TO_SELL = 3
+EXIT_CHANGE_TREND_TO_BUY = 4
+EXIT_REASONS = ("", "SL", "TP", "CHANGE_TREND_TO_SELL", "CHANGE_TREND_TO_BUY")
+
+
+@njit
+def resample_ticks_numba(times: np.ndarray, prices: np.ndarray, timeframe: int):
+    """
+    Groups ticks into candles exactly like CandleManager + MarketSimulator.is_candle_closed:
+    a candle starts on the first tick after the previous close and the tick that reaches
+    next_open_time is the last tick of the candle.
+
+    Returns start/end tick indices, OHLC and the prev_close seen by the trend indicator
+    (close before the last tick of the candle).
+    """
+    n = len(times)
+    starts: np.ndarray = np.empty(n, dtype=np.int64)
+    ends: np.ndarray = np.empty(n, dtype=np.int64)
+    opens = np.empty(n)
+    highs = np.empty(n)
+    lows = np.empty(n)
+    closes = np.empty(n)
+    prev_closes = np.empty(n)
+
+    count = 0
+    in_candle = False
+    next_open_time = 0
+    for i in range(n):
+        price = prices[i]
+        if not in_candle:
+            starts[count] = i
+            opens[count] = price
+            highs[count] = price
+            lows[count] = price
+            closes[count] = price
+            next_open_time = get_next_open_time_ns(times[i], timeframe)
+            in_candle = True
+
+        prev_closes[count] = closes[count]
+        closes[count] = price
+        if price > highs[count]:
+            highs[count] = price
+        if price < lows[count]:
+            lows[count] = price
+
+        if times[i] >= next_open_time:
+            ends[count] = i
+            count += 1
+            in_candle = False
+
+    if in_candle:
+        ends[count] = n - 1
+        count += 1
+
+    return (
+        starts[:count], ends[:count], opens[:count], highs[:count],
+        lows[:count], closes[:count], prev_closes[:count]
+    )
+
+
+@njit
+def simulate_positions_numba(
+    times: np.ndarray,
+    prices: np.ndarray,
+    candle_starts: np.ndarray,
+    candle_ends: np.ndarray,
+    closes: np.ndarray,
+    buy_signals: np.ndarray,
+    sell_signals: np.ndarray,
+    signal_tps: np.ndarray,
+    signal_sls: np.ndarray,
+    lot_size: float,
+    balance: float,
+    activate_pips: float,
+    profit_pips: float,
+    pip_size: float,
+    contract_size: float,
+):
+    """
+    Replays PositionManager (V2 mode) over the whole tick array in one pass.
+
+    Ticks are only visited while a position is open (through resolve_exit_numba); entries and
+    trend-change exits are resolved at candle close. signal_tps/signal_sls hold the initial TP/SL
+    of every signal candle (see BatchSimulator._signal_tp_sl). Returns one row per trade; when a
+    position is still open at the end it is stored in row `count` with exit reason EXIT_NONE.
+    equity holds the mark-to-market balance at each candle close.
+    """
+    n_candles = len(candle_starts)
+    capacity = n_candles + 1
+    open_times: np.ndarray = np.empty(capacity, dtype=np.int64)
+    exit_times: np.ndarray = np.empty(capacity, dtype=np.int64)
+    directions: np.ndarray = np.empty(capacity, dtype=np.int64)
+    entries = np.empty(capacity)
+    entry_sls = np.empty(capacity)
+    entry_tps = np.empty(capacity)
+    exit_prices = np.empty(capacity)
+    exit_reasons: np.ndarray = np.zeros(capacity, dtype=np.int64)
+    profits = np.empty(capacity)
+    balances = np.empty(capacity)
+    quantities = np.empty(capacity)
+    sls = np.empty(capacity)
+    tps = np.empty(capacity)
+    equity = np.empty(n_candles)
+
+    count = 0
+    active = False
+    direction = 0
+    entry = 0.0
+    sl = 0.0
+    tp = 0.0
+    quantity = 0.0
+    no_levels = np.empty(0)
+
+    for k in range(n_candles):
+        if active:
+            exit_idx, price, reason, sl, tp, level_idx = resolve_exit_numba(
+                prices, candle_starts[k], candle_ends[k] + 1, direction, entry, sl, tp,
+                False, activate_pips, profit_pips, no_levels, no_levels, 0, pip_size
+            )
+            if reason != EXIT_NONE:
+                profit = (price - entry) * contract_size * lot_size * direction
+                balance += quantity + profit
+                exit_times[count] = times[exit_idx]
+                exit_prices[count] = price
+                exit_reasons[count] = reason
+                profits[count] = profit
+                balances[count] = balance
+                sls[count] = sl
+                tps[count] = tp
+                count += 1
+                active = False
+
+        if active:
+            reason = EXIT_NONE
+            if direction == 1 and not np.isnan(sell_signals[k]):
+                reason = EXIT_CHANGE_TREND_TO_SELL
+            elif direction == -1 and not np.isnan(buy_signals[k]):
+                reason = EXIT_CHANGE_TREND_TO_BUY
+
+            if reason != EXIT_NONE:
+                price = closes[k]
+                profit = (price - entry) * contract_size * lot_size * direction
+                balance += quantity + profit
+                exit_times[count] = times[candle_starts[k]]
+                exit_prices[count] = price
+                exit_reasons[count] = reason
+                profits[count] = profit
+                balances[count] = balance
+                sls[count] = sl
+                tps[count] = tp
+                count += 1
+                active = False
+        elif not np.isnan(buy_signals[k]) or not np.isnan(sell_signals[k]):
+            if not np.isnan(buy_signals[k]):
+                direction = 1
+                entry = float(buy_signals[k])
+                open_times[count] = times[candle_ends[k]]
+            else:
+                direction = -1
+                entry = float(sell_signals[k])
+                open_times[count] = times[candle_starts[k]]
+
+            tp = float(signal_tps[k])
+            sl = float(signal_sls[k])
+            quantity = lot_size * balance
+            balance -= quantity
+            directions[count] = direction
+            entries[count] = entry
+            entry_sls[count] = sl
+            entry_tps[count] = tp
+            quantities[count] = quantity
+            balances[count] = balance
+            active = True
+
+        # Mark-to-market at the candle close, like PositionManager.equity
+        equity[k] = balance
+        if active:
+            equity[k] += quantity + (closes[k] - entry) * contract_size * lot_size * direction
+
+    if active:
+        sls[count] = sl
+        tps[count] = tp
+
+    return (
+        count, active, balance, open_times, exit_times, directions, entries, entry_sls, entry_tps,
+        exit_prices, exit_reasons, profits, balances, quantities, sls, tps, equity
+    )
+
+
+class BatchSimulator:
+    """
+    Vectorized counterpart of MarketSimulator.
+
+    Takes the whole tick arrays at once, resamples them to candles, computes the indicators
+    as whole-array kernels and resolves entries/exits in a single compiled pass. The candle
+    dataframe and the closed positions match the tick-by-tick MarketSimulator.
+    """
+
+    def __init__(
+        self,
+        timeframe: int = 15,
+        indicators: Optional[List[Indicator]] = None,
+        params: Optional[StrategyParams] = None,
+        instrument: Optional[InstrumentSpec] = None
+    ):
+        """instrument: Pip and contract size of the symbol (defaults to XAUUSD)"""
+        self.logger = get_logger(__name__)
+        self.timeframe = timeframe
+        self.indicators: Optional[List[Indicator]] = indicators
+        self.params: StrategyParams = params or StrategyParams()
+        if not BatchSimulator.supports(self.params):
+            raise ValueError("BatchSimulator only supports one position closed on trend change; use MarketSimulator")
+        self.position_manager = PositionManager(params=self.params, instrument=instrument)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.equity_tracker = EquityTracker()
+        self.tz: Any = None
+
+    @staticmethod
+    def supports(params: StrategyParams) -> bool:
+        """True when params fit this engine: one position at a time, closed on trend change."""
+        return params.max_positions == 1 and params.close_on_trend_change
+
+    def run(self, times, prices, tz=None) -> None:
+        """
+        times: tick times, either datetimes or an int64 array of epoch nanoseconds (then tz applies)
+        prices: tick prices aligned with times
+        """
+        times_ns = self._times_ns(times, tz)
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+
+        starts, ends, opens, highs, lows, closes, prev_closes = resample_ticks_numba(
+            times_ns, prices, self.timeframe
+        )
+        self._run_candles(times_ns, prices, starts, ends, opens, highs, lows, closes, prev_closes)
+
+    def run_bars(
+        self,
+        times,
+        opens,
+        highs,
+        lows,
+        closes,
+        tz=None,
+        path_model: BarPathModel = BarPathModel.OHLC,
+        bar_minutes: Optional[int] = None,
+        path_points: int = DEFAULT_BRIDGE_POINTS,
+        seed: int = 0
+    ) -> None:
+        """
+        Simulates directly on OHLC bars (e.g. M1 or M15 history) without converting them to ticks.
+        The bars are grouped into candles of the timeframe; SL/TP and break-even are resolved inside each bar
+        on the price path of path_model (see core.market_components.bar_path.build_bar_path).
+        The true range of a candle uses the close of the previous candle (its own open for the first one).
+
+        times: bar open times, datetimes or int64 epoch nanoseconds (then tz applies)
+        bar_minutes: bar length (inferred from the smallest gap between bars when None)
+        path_points / seed: points per bar and random seed of BarPathModel.BROWNIAN_BRIDGE
+        """
+        times_ns = self._times_ns(times, tz)
+        opens = np.ascontiguousarray(opens, dtype=np.float64)
+        highs = np.ascontiguousarray(highs, dtype=np.float64)
+        lows = np.ascontiguousarray(lows, dtype=np.float64)
+        closes = np.ascontiguousarray(closes, dtype=np.float64)
+        if len(times_ns) and np.any(np.diff(times_ns) <= 0):
+            raise ValueError("Bar times must be strictly increasing")
+        if np.any(highs < np.maximum(opens, closes)) or np.any(lows > np.minimum(opens, closes)):
+            raise ValueError("Inconsistent OHLC bars: high below open/close or low above open/close")
+        if bar_minutes is None and len(times_ns) > 1:
+            bar_minutes = bar_minutes_of(times_ns)
+        if bar_minutes is not None and bar_minutes > self.timeframe:
+            raise ValueError(f"Bars of {bar_minutes}m cannot be simulated on a {self.timeframe}m timeframe")
+
+        path_times, path_prices, points = build_bar_path(
+            times_ns, opens, highs, lows, closes, path_model, bar_minutes, path_points, seed
+        )
+        bar_starts, bar_ends = resample_bars_numba(times_ns, self.timeframe)
+        candle_closes = closes[bar_ends]
+        prev_closes = np.empty(len(bar_starts))
+        if len(bar_starts):
+            prev_closes[0] = opens[0]
+            prev_closes[1:] = candle_closes[:-1]
+        self._run_candles(
+            path_times,
+            path_prices,
+            bar_starts * points,
+            bar_ends * points + points - 1,
+            opens[bar_starts],
+            np.maximum.reduceat(highs, bar_starts) if len(bar_starts) else highs[:0],
+            np.minimum.reduceat(lows, bar_starts) if len(bar_starts) else lows[:0],
+            candle_closes,
+            prev_closes,
+        )
+        self.logger.info(f"Bar simulation on {len(times_ns)} bars with the {path_model.value} path model")
+
+    def _times_ns(self, times, tz=None) -> np.ndarray:
+        if isinstance(times, np.ndarray) and times.dtype == np.int64:
+            self.tz = tz
+            return np.ascontiguousarray(times)
+        index = pd.DatetimeIndex(times)
+        self.tz = index.tz
+        return index.as_unit("ns").asi8
+
+    def _run_candles(
+        self,
+        times_ns: np.ndarray,
+        prices: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        prev_closes: np.ndarray,
+    ) -> None:
+        """Indicators, signals and positions over candles given as start/end (inclusive) indices into the prices."""
+        self.columns = {
+            "time": times_ns[starts],
+            "open": opens,
+            "high": highs,
+            "low": lows,
+            "close": closes,
+        }
+
+        trend, up, dn, buy_signal, sell_signal = trend_signals_numba(
+            highs, lows, closes, prev_closes, self.params.multiplier, self.params.atr_period
+        )
+        self.columns.update({
+            "trend": trend, "up": up, "dn": dn, "buy_signal": buy_signal, "sell_signal": sell_signal
+        })
+        self._calculate_indicators(closes)
+
+        rsi = self.columns.get("rsi")
+        if rsi is None:
+            rsi = np.full(len(closes), np.nan)
+
+        self._simulate_positions(times_ns, prices, starts, ends, closes, lows, highs, buy_signal, sell_signal, rsi)
+
+    def _indicator_window_ends(self, n_candles: int) -> np.ndarray:
+        """
+        Index of the last close seen by IndicatorManager.update_indicators at each candle.
+        MarketSimulator.finalize_current_candle only includes the current close once more than
+        rsi_period candles have been saved.
+        """
+        candle_idx = np.arange(n_candles)
+        return np.where(candle_idx > self.params.rsi_period, candle_idx, candle_idx - 1)
+
+    def _calculate_indicators(self, closes: np.ndarray) -> None:
+        if not self.indicators:
+            return
+
+        n_candles = len(closes)
+        ends = self._indicator_window_ends(n_candles)
+        period = self.params.bollinger_period
+        rsi_period = self.params.rsi_period
+        valid = np.arange(n_candles) >= period
+        window_ends = ends[valid]
+
+        def aligned(values: np.ndarray) -> np.ndarray:
+            result = np.full(n_candles, np.nan)
+            result[valid] = values[window_ends]
+            return result
+
+        if Indicator.BOLL in self.indicators:
+            ma, upper, lower = rolling_bollinger_numba(closes, period, self.params.desviation)
+            self.columns.update({"ma": aligned(ma), "upper": aligned(upper), "lower": aligned(lower)})
+
+        if Indicator.SMMA in self.indicators:
+            smma = smma_streaming_numba(closes, self.params.smma_length, self.params.smma_seed == SMMA_SEED_SMA)
+            self.columns["smma"] = aligned(smma)
+
+        if Indicator.RSI in self.indicators:
+            rsi = np.full(n_candles, np.nan)
+            if len(window_ends) > 0 and period > rsi_period:
+                # Series fed to RSIRolling: the initialization window, its last close again,
+                # then one close per candle.
+                first_end = window_ends[0]
+                series = np.concatenate((
+                    closes[first_end - period + 1:first_end + 1],
+                    closes[first_end:first_end + 1],
+                    closes[window_ends[1:]],
+                ))
+                wilder = self.params.rsi_smoothing == RSI_SMOOTHING_WILDER
+                rsi[valid] = rsi_rolling_numba(series, rsi_period, wilder)[period:]
+            self.columns["rsi"] = rsi
+
+    def _signal_tp_sl(
+        self,
+        lows: np.ndarray,
+        highs: np.ndarray,
+        buy_signal: np.ndarray,
+        sell_signal: np.ndarray,
+        rsi: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Initial TP/SL of every signal candle in one batch query (NaN elsewhere). Like
+        MarketSimulator.try_open_position, candle k sees the candles before it once more than two are saved.
+        """
+        n_candles = len(lows)
+        tps = np.full(n_candles, np.nan)
+        sls = np.full(n_candles, np.nan)
+        is_buy = ~np.isnan(buy_signal)
+        signal_idx = np.flatnonzero(is_buy | ~np.isnan(sell_signal))
+        if len(signal_idx) == 0:
+            return tps, sls
+
+        history = np.where(signal_idx + 1 > 2, signal_idx, signal_idx + 1)
+        directions = np.where(is_buy[signal_idx], 1, -1)
+        entries = np.where(is_buy[signal_idx], buy_signal[signal_idx], sell_signal[signal_idx])
+        tps[signal_idx], sls[signal_idx] = calculate_tp_sl_batch(
+            lows, highs, history, entries, directions, rsi[signal_idx],
+            self.params.rrr_soft, self.params.rrr_hard, self.params.min_rrr,
+            self.params.lookback, self.params.max_lookback
+        )
+        return tps, sls
+
+    def _simulate_positions(
+        self,
+        times_ns: np.ndarray,
+        prices: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        closes: np.ndarray,
+        lows: np.ndarray,
+        highs: np.ndarray,
+        buy_signal: np.ndarray,
+        sell_signal: np.ndarray,
+        rsi: np.ndarray,
+    ) -> None:
+        position_manager = self.position_manager
+        instrument = position_manager.instrument
+        params = self.params
+        lot_size = params.lot_size
+        signal_tps, signal_sls = self._signal_tp_sl(lows, highs, buy_signal, sell_signal, rsi)
+        (
+            count, active, balance, open_times, exit_times, directions, entries, entry_sls, entry_tps,
+            exit_prices, exit_reasons, profits, balances, quantities, sls, tps, equity
+        ) = simulate_positions_numba(
+            times_ns, prices, starts, ends, closes, buy_signal, sell_signal, signal_tps, signal_sls,
+            lot_size, position_manager.balance,
+            dollars_to_pips(params.break_even_activate_usd, lot_size, instrument),
+            dollars_to_pips(params.break_even_profit_usd, lot_size, instrument),
+            instrument.pip_size, instrument.contract_size,
+        )
+
+        ledger = TradeLedger(max(count, 1))
+        ledger.extend(
+            exit_reasons[:count],
+            list(EXIT_REASONS),
+            open_time=open_times[:count],
+            exit_time=exit_times[:count],
+            direction=directions[:count],
+            entry=entries[:count],
+            entry_sl=entry_sls[:count],
+            entry_tp=entry_tps[:count],
+            sl=sls[:count],
+            tp=tps[:count],
+            exit_price=exit_prices[:count],
+            profit=profits[:count],
+            balance=balances[:count],
+            quantity=quantities[:count],
+            lot_size=lot_size,
+            max_price=entries[:count],
+            min_price=entries[:count],
+        )
+        position_manager.closed_positions = ledger
+        self.equity_tracker = EquityTracker(max(len(equity), 1))
+        self.equity_tracker.extend(self.columns["time"], equity)
+        if active:
+            position_manager.active_position = Position(
+                direction=int(directions[count]),
+                entry=float(entries[count]),
+                entry_sl=float(entry_sls[count]),
+                entry_tp=float(entry_tps[count]),
+                sl=float(sls[count]),
+                tp=float(tps[count]),
+                open_time=int(open_times[count]),
+                lot_size=lot_size,
+                quantity=float(quantities[count]),
+                balance=float(balances[count]),
+                max_price=float(entries[count]),
+                min_price=float(entries[count]),
+            )
+
+        position_manager.tz = self.tz
+        position_manager.balance = float(balance)
+        self.logger.info(f"Batch simulation finished: {len(self.columns['time'])} candles, {count} trades")
+
+    def export_to_dataframe(self) -> pd.DataFrame:
+        if not self.columns:
+            return pd.DataFrame()
+
+        payload: Dict[str, Any] = {
+            "time": from_epoch_ns(self.columns["time"], self.tz),
+            "open": self.columns["open"],
+            "high": self.columns["high"],
+            "low": self.columns["low"],
+            "close": self.columns["close"],
+            "equity": self.equity_tracker.column("equity"),
+            "drawdown": self.equity_tracker.column("drawdown"),
+        }
+
+        if self.indicators is None:
+            return pd.DataFrame(payload)
+
+        for indicator in self.indicators:
+            for key in indicator_keys.get(indicator, []):
+                if key in self.columns:
+                    payload[key] = self.columns[key]
+
+        return pd.DataFrame(payload)
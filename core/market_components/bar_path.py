@@ -0,0 +1,151 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from numba import njit
+
+from enums.bar_path_model import BarPathModel
+from utils.calculate_next_open_time import NS_PER_MINUTE, get_next_open_time_ns
+
+# Price points per bar of the deterministic path models (open, first extreme, second extreme, close).
+FIXED_PATH_POINTS = 4
+DEFAULT_BRIDGE_POINTS = 16
+
+
+@njit
+def resample_bars_numba(times: np.ndarray, timeframe: int):
+    """
+    Groups bars into candles of timeframe minutes: a candle starts at the first bar after the previous
+    candle and holds every bar opened before its next_open_time (same boundaries as the tick engine).
+
+    Returns:
+        start and end (inclusive) bar index of every candle
+    """
+    n = len(times)
+    starts: np.ndarray = np.empty(n, dtype=np.int64)
+    ends: np.ndarray = np.empty(n, dtype=np.int64)
+    count = 0
+    next_open_time = 0
+    for i in range(n):
+        if count == 0 or times[i] >= next_open_time:
+            if count > 0:
+                ends[count - 1] = i - 1
+            starts[count] = i
+            next_open_time = get_next_open_time_ns(times[i], timeframe)
+            count += 1
+    if count > 0:
+        ends[count - 1] = n - 1
+    return starts[:count], ends[:count]
+
+
+@njit
+def brownian_bridge_paths_numba(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    points: int,
+    seed: int
+) -> np.ndarray:
+    """
+    points prices per bar: a Brownian bridge from the open to the close pinned at the high and the low.
+    The high comes first with probability (open - low) / (high - low), so the nearer extreme tends to be
+    visited first; both extremes sit at random inner points and every leg is a bridge scaled to the bar
+    range, clipped to [low, high]. The path keeps the bar OHLC exactly and is reproducible for a seed.
+    """
+    np.random.seed(seed)
+    n = len(opens)
+    path = np.empty((n, points))
+    anchor_idx: np.ndarray = np.empty(4, dtype=np.int64)
+    anchor_val = np.empty(4)
+    for b in range(n):
+        o, h, l, c = opens[b], highs[b], lows[b], closes[b]
+        bar_range = h - l
+        if bar_range <= 0.0:
+            path[b, :] = o
+            continue
+
+        first = np.random.randint(1, points - 1)
+        second = np.random.randint(1, points - 2)
+        if second >= first:
+            second += 1
+        high_first = np.random.random() < (o - l) / bar_range
+        anchor_idx[0] = 0
+        anchor_idx[1] = min(first, second)
+        anchor_idx[2] = max(first, second)
+        anchor_idx[3] = points - 1
+        anchor_val[0] = o
+        anchor_val[1] = h if high_first else l
+        anchor_val[2] = l if high_first else h
+        anchor_val[3] = c
+
+        sigma = bar_range / np.sqrt(points)
+        for leg in range(3):
+            start, stop = anchor_idx[leg], anchor_idx[leg + 1]
+            length = stop - start
+            walk = np.zeros(length + 1)
+            for j in range(1, length + 1):
+                walk[j] = walk[j - 1] + np.random.normal() * sigma
+            for j in range(length + 1):
+                frac = j / length
+                value = anchor_val[leg] + (anchor_val[leg + 1] - anchor_val[leg]) * frac + walk[j] - frac * walk[length]
+                path[b, start + j] = min(max(value, l), h)
+        for k in range(4):
+            path[b, anchor_idx[k]] = anchor_val[k]
+    return path
+
+
+def bar_minutes_of(times: np.ndarray) -> int:
+    """Bar length in minutes: the smallest gap between consecutive bars."""
+    gaps = np.diff(times)
+    gaps = gaps[gaps > 0]
+    if len(gaps) == 0:
+        raise ValueError("Cannot infer the bar length from fewer than two distinct bar times")
+    return max(int(gaps.min() // NS_PER_MINUTE), 1)
+
+
+def build_bar_path(
+    times: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    model: BarPathModel = BarPathModel.OHLC,
+    bar_minutes: Optional[int] = None,
+    points: int = DEFAULT_BRIDGE_POINTS,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Intra-bar price path of every bar, flattened in time order.
+
+    OHLC / OLHC visit the high before the low (or the reverse) in every bar; NEAREST_FIRST visits first
+    the extreme nearer to the open (the high on ties); BROWNIAN_BRIDGE uses points prices per bar
+    (see brownian_bridge_paths_numba). The points of a bar are spread evenly over its bar_minutes.
+
+    Returns:
+        (int64 epoch-ns times, float64 prices, points per bar)
+    """
+    if model == BarPathModel.BROWNIAN_BRIDGE:
+        if points < FIXED_PATH_POINTS:
+            raise ValueError(f"A Brownian bridge needs at least {FIXED_PATH_POINTS} points per bar, got {points}")
+        path = brownian_bridge_paths_numba(opens, highs, lows, closes, points, seed)
+    else:
+        points = FIXED_PATH_POINTS
+        high_first: np.ndarray
+        if model == BarPathModel.OHLC:
+            high_first = np.ones(len(opens), dtype=bool)
+        elif model == BarPathModel.OLHC:
+            high_first = np.zeros(len(opens), dtype=bool)
+        else:
+            high_first = (highs - opens) <= (opens - lows)
+        path = np.column_stack((
+            opens,
+            np.where(high_first, highs, lows),
+            np.where(high_first, lows, highs),
+            closes,
+        ))
+
+    if bar_minutes is None:
+        bar_minutes = bar_minutes_of(times) if len(times) > 1 else 1
+    offsets = np.arange(points, dtype=np.int64) * (bar_minutes * NS_PER_MINUTE // points)
+    path_times = (times[:, None] + offsets[None, :]).ravel()
+    return path_times, np.ascontiguousarray(path.ravel()), points
@@ -0,0 +1,103 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+COLUMNS = ("time", "open", "high", "low", "close")
+
+
+class CandleBuffer:
+    """
+    Columnar storage for closed candles: one preallocated NumPy array per column.
+
+    Unbounded (max_history=None) the arrays double when full, so append is amortized O(1) and the
+    whole history stays available for export. With max_history the buffer keeps 2 * max_history
+    slots and, when the end is reached, moves the last max_history rows back to the start; appends
+    stay amortized O(1) and every trailing window is still a contiguous, zero-copy view.
+    """
+
+    def __init__(self, capacity: int = 1024, max_history: Optional[int] = None):
+        if max_history is not None:
+            if max_history < 1:
+                raise ValueError("max_history must be positive")
+            capacity = 2 * max_history
+        self.max_history = max_history
+        self.start = 0
+        self.end = 0
+        self.total = 0
+        self.columns: Dict[str, np.ndarray] = {
+            "time": np.empty(capacity, dtype=np.int64),
+            "open": np.empty(capacity, dtype=np.float64),
+            "high": np.empty(capacity, dtype=np.float64),
+            "low": np.empty(capacity, dtype=np.float64),
+            "close": np.empty(capacity, dtype=np.float64),
+        }
+
+    def __len__(self) -> int:
+        """Number of candles currently held (equal to total when unbounded)."""
+        return self.end - self.start
+
+    @property
+    def capacity(self) -> int:
+        return len(self.columns["time"])
+
+    def _make_room(self) -> None:
+        if self.max_history is None:
+            new_capacity = max(2 * self.capacity, 1)
+            for name, values in self.columns.items():
+                grown = np.empty(new_capacity, dtype=values.dtype)
+                grown[:self.end] = values[:self.end]
+                self.columns[name] = grown
+            return
+
+        keep = self.max_history - 1
+        for values in self.columns.values():
+            values[:keep] = values[self.end - keep:self.end]
+        self.start = 0
+        self.end = keep
+
+    def append(self, time: int, open_: float, high: float, low: float, close: float) -> None:
+        if self.end == self.capacity:
+            self._make_room()
+
+        end = self.end
+        self.columns["time"][end] = time
+        self.columns["open"][end] = open_
+        self.columns["high"][end] = high
+        self.columns["low"][end] = low
+        self.columns["close"][end] = close
+        self.end = end + 1
+        self.total += 1
+        if self.max_history is not None and self.end - self.start > self.max_history:
+            self.start += 1
+
+    def view(self, column: str) -> np.ndarray:
+        """Zero-copy view of every candle held for column."""
+        return self.columns[column][self.start:self.end]
+
+    def tail(self, column: str, n: int, skip_last: int = 0) -> np.ndarray:
+        """
+        Zero-copy view of the last n candles of column, optionally ignoring the newest skip_last ones.
+        Returns fewer rows when the buffer holds less.
+        """
+        stop = max(self.end - skip_last, self.start)
+        return self.columns[column][max(stop - n, self.start):stop]
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "max_history": self.max_history,
+            "total": self.total,
+            "columns": {name: self.view(name).copy() for name in COLUMNS},
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        rows = len(state["columns"]["time"])
+        self.max_history = state["max_history"]
+        capacity = 2 * self.max_history if self.max_history is not None else max(rows, 1024)
+        self.columns = {}
+        for name in COLUMNS:
+            values = state["columns"][name]
+            self.columns[name] = np.empty(capacity, dtype=values.dtype)
+            self.columns[name][:rows] = values
+        self.start = 0
+        self.end = rows
+        self.total = state["total"]
@@ -1,29 +1,67 @@
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import asdict
+from typing import Any, Dict, Optional
 
 import numpy as np
 
+from core.market_components.candle_buffer import CandleBuffer
 from models.candle import Candle
-from utils.calculate_next_open_time import get_next_open_time
+from models.strategy_params import StrategyParams
+from utils.calculate_next_open_time import get_next_open_time_ns
 from utils.logger import get_logger
 
 
 class CandleManager:
-    def __init__(self, timeframe: int):
+    def __init__(self, timeframe: int, max_history: Optional[int] = None, params: Optional[StrategyParams] = None):
+        """
+        timeframe: Timeframe in minutes
+        max_history: Keep only the last max_history closed candles (None keeps all of them, needed for export).
+            It must cover the longest window read from the candles: bollinger_period, rsi_period + 1 and
+            max_lookback of params
+        params: Strategy params the candles are read with (defaults to StrategyParams())
+        """
+        params = params or StrategyParams()
+        min_history = max(params.bollinger_period, params.rsi_period + 1, params.max_lookback)
+        if max_history is not None and max_history < min_history:
+            raise ValueError(
+                f"max_history must be at least {min_history} (bollinger_period, rsi_period + 1 and max_lookback), "
+                f"got {max_history}"
+            )
         self.timeframe = timeframe
         self.logger = get_logger(__name__)
-        self.times: List[datetime] = []
-        self.opens: List[float] = []
-        self.highs: List[float] = []
-        self.lows: List[float] = []
-        self.closes: List[float] = []
+        self.buffer = CandleBuffer(max_history=max_history)
 
         self.current_candle: Optional[Candle] = None
-        self.next_open_time: Optional[datetime] = None
-        self.candle_time: Optional[datetime] = None
+        self.next_open_time: Optional[int] = None
+        self.candle_time: Optional[int] = None
         self.prev_close: Optional[float] = None
 
-    def create_new_candle(self, price: float, candle_time: datetime) -> Candle:
+    # Zero-copy views over the closed candles; valid until the next save_candle.
+    @property
+    def times(self) -> np.ndarray:
+        return self.buffer.view("time")
+
+    @property
+    def opens(self) -> np.ndarray:
+        return self.buffer.view("open")
+
+    @property
+    def highs(self) -> np.ndarray:
+        return self.buffer.view("high")
+
+    @property
+    def lows(self) -> np.ndarray:
+        return self.buffer.view("low")
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self.buffer.view("close")
+
+    @property
+    def total_candles(self) -> int:
+        """Number of candles saved since the start, including those dropped by max_history."""
+        return self.buffer.total
+
+    def create_new_candle(self, price: float, candle_time: int) -> Candle:
         if self.current_candle is None:
             self.prev_close = price
         else:
@@ -45,10 +83,10 @@ class CandleManager:
             buy_signal=np.nan,
             sell_signal=np.nan,
         )
-        self.next_open_time = get_next_open_time(candle_time, self.timeframe)
+        self.next_open_time = get_next_open_time_ns(candle_time, self.timeframe)
         return self.current_candle
 
-    def build_candle(self, price: float, candle_time: datetime) -> Candle:
+    def build_candle(self, price: float, candle_time: int) -> Candle:
         if self.current_candle is None:
             self.current_candle = self.create_new_candle(price, candle_time)
 
@@ -62,15 +100,55 @@ class CandleManager:
 
         return self.current_candle
 
+    def build_candle_range(self, prices: np.ndarray, candle_time: int) -> Optional[Candle]:
+        """
+        Same as calling build_candle for every price in order, for ticks known not to close the candle.
+        candle_time is the time of the first tick, used only if a new candle has to be created.
+        """
+        if len(prices) == 0:
+            return self.current_candle
+
+        if self.current_candle is None:
+            self.current_candle = self.create_new_candle(float(prices[0]), candle_time)
+
+        self.prev_close = float(prices[-2]) if len(prices) > 1 else self.current_candle.close
+        self.current_candle.close = float(prices[-1])
+
+        high = prices.max()
+        low = prices.min()
+        if high > self.current_candle.high:
+            self.current_candle.high = high
+        if low < self.current_candle.low:
+            self.current_candle.low = low
+
+        return self.current_candle
+
     def save_candle(self):
         if self.current_candle is None:
             self.logger.error("Current candle is None")
             return
         
-        self.times.append(self.current_candle.time)
-        self.opens.append(self.current_candle.open)
-        self.highs.append(self.current_candle.high)
-        self.lows.append(self.current_candle.low)
-        self.closes.append(self.current_candle.close)
+        candle = self.current_candle
+        self.buffer.append(candle.time, candle.open, candle.high, candle.low, candle.close)
 
         self.prev_close = self.current_candle.close
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "timeframe": self.timeframe,
+            "buffer": self.buffer.get_state(),
+            "current_candle": asdict(self.current_candle) if self.current_candle is not None else None,
+            "next_open_time": self.next_open_time,
+            "candle_time": self.candle_time,
+            "prev_close": self.prev_close,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        if state["timeframe"] != self.timeframe:
+            raise ValueError(f"Checkpoint timeframe {state['timeframe']} does not match {self.timeframe}")
+        self.buffer.set_state(state["buffer"])
+        candle = state["current_candle"]
+        self.current_candle = Candle(**candle) if candle is not None else None
+        self.next_open_time = state["next_open_time"]
+        self.candle_time = state["candle_time"]
+        self.prev_close = state["prev_close"]
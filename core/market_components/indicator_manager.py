@@ -1,28 +1,37 @@
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
-from config import (ATR_PERIOD, BOLLINGER_PERIOD, DESVIATION, MULTIPLIER,
-                    RSI_PERIOD, SMMA_LENGTH)
 from enums.indicator import Indicator
 from indicators_tools.atr import true_range, update_ema
-from indicators_tools.bollinger import bollinger_numba
-from indicators_tools.rsi import RSIFastRolling
-from indicators_tools.smma import smma_numba
+from indicators_tools.bollinger import RollingBollinger
+from indicators_tools.rsi import RSIRolling
+from indicators_tools.smma import StreamingSMMA
 from indicators_tools.trend_signals import update_trend_signal
 from models.candle import Candle
+from models.strategy_params import StrategyParams
 from utils.logger import get_logger
 
+# Per-candle indicator lists exported by MarketSimulator.export_to_dataframe
+SERIES = ("ma", "upper", "lower", "smma", "trend", "up", "dn", "rsi")
+
 
 class IndicatorManager:
-    def __init__(self, auto_save: bool = True, indicators: Optional[List[Indicator]] = None):
+    def __init__(
+        self,
+        auto_save: bool = True,
+        indicators: Optional[List[Indicator]] = None,
+        params: Optional[StrategyParams] = None
+    ):
         self.logger = get_logger(__name__)
         self.auto_save: bool = auto_save
         self.indicators: Optional[List[Indicator]] = indicators
-        self.ma: List[float] = [np.nan] * BOLLINGER_PERIOD
-        self.upper: List[float] = [np.nan] * BOLLINGER_PERIOD
-        self.lower: List[float] = [np.nan] * BOLLINGER_PERIOD
-        self.smma: List[float] = [np.nan] * BOLLINGER_PERIOD
+        self.params: StrategyParams = params or StrategyParams()
+        period = self.params.bollinger_period
+        self.ma: List[float] = [np.nan] * period
+        self.upper: List[float] = [np.nan] * period
+        self.lower: List[float] = [np.nan] * period
+        self.smma: List[float] = [np.nan] * period
         self.trend: List[int] = []
         self.up: List[float] = []
         self.dn: List[float] = []
@@ -33,27 +42,64 @@ class IndicatorManager:
         self.prev_dn: float = 0.0
         self.trend_val: int = -1
 
-        self.rsi: List[float] = [np.nan] * BOLLINGER_PERIOD
-        self.rsi_calculator: Optional[RSIFastRolling] = None
+        self.rsi: List[float] = [np.nan] * period
+        self.rsi_calculator: Optional[RSIRolling] = None
+
+        # Streaming state: every close is pushed once, in order, as it becomes visible to the indicators.
+        self.closes_seen: int = 0
+        self.bollinger = RollingBollinger(period=period, std_multiplier=self.params.desviation)
+        self.last_bollinger: Tuple[float, float, float] = (np.nan, np.nan, np.nan)
+        self.smma_calculator = StreamingSMMA(length=self.params.smma_length, seed=self.params.smma_seed)
+        self.last_smma: float = np.nan
 
     def initialize_rsi(self, closes: np.ndarray):
         if self.rsi_calculator is None:
-            self.rsi_calculator = RSIFastRolling(period=RSI_PERIOD)
+            self.rsi_calculator = RSIRolling(period=self.params.rsi_period, smoothing=self.params.rsi_smoothing)
         
         if not self.rsi_calculator.ready:
             self.rsi_calculator.initialize(closes)
     
-    def update_indicators(self, closes: List[float]) -> bool:
+    def push_close(self, close: float) -> None:
+        """Feeds one close to the streaming indicators (O(1))."""
+        if not self.indicators:
+            return
+        if Indicator.BOLL in self.indicators:
+            self.last_bollinger = self.bollinger.update(close)
+        if Indicator.SMMA in self.indicators:
+            self.last_smma = self.smma_calculator.update(close)
+
+    def update_indicators(
+        self,
+        closes: np.ndarray,
+        current_close: Optional[float] = None,
+        closes_total: Optional[int] = None
+    ) -> bool:
+        """
+        closes: Saved closes (or a trailing view of them), oldest first
+        current_close: Close of the candle being finalized, when the indicators must already include it
+        closes_total: Number of closes saved since the start (defaults to len(closes))
+        """
         if self.indicators is None:
             return False
 
         if len(self.indicators) == 0:
             return False
 
-        closes_array = np.array(closes[-BOLLINGER_PERIOD:])
-        if len(closes_array) < BOLLINGER_PERIOD:
+        if closes_total is None:
+            closes_total = len(closes)
+        new_closes = closes_total - self.closes_seen
+        if new_closes > 0:
+            for close in closes[len(closes) - new_closes:]:
+                self.push_close(close)
+        self.closes_seen = closes_total
+        if current_close is not None:
+            self.push_close(current_close)
+            self.closes_seen += 1
+
+        period = self.params.bollinger_period
+        if closes_total < period:
             return False
-        
+
         ma = None
         upper = None
         lower = None
@@ -63,42 +109,40 @@ class IndicatorManager:
             return False
         
         if Indicator.BOLL in self.indicators:
-            ma, upper, lower = self.__bollinger_bands(closes_array)
+            ma, upper, lower = self.__bollinger_bands()
             if ma is not None and upper is not None and lower is not None and self.auto_save:
                 self.ma.append(ma)
                 self.upper.append(upper)
                 self.lower.append(lower)
        
         if Indicator.SMMA in self.indicators:
-            latest_smma = self.__smma(closes_array)
+            latest_smma = self.__smma()
             if latest_smma is not None and self.auto_save:
                 self.smma.append(latest_smma)
 
         if Indicator.RSI in self.indicators:
             if self.rsi_calculator is None:
-                self.initialize_rsi(closes_array)
+                if current_close is None:
+                    self.initialize_rsi(closes[-period:])
+                else:
+                    self.initialize_rsi(np.append(closes[len(closes) - period + 1:], current_close))
 
             if self.rsi_calculator is not None and self.rsi_calculator.ready:
-                current_rsi = self.rsi_calculator.update(closes_array[-1])
+                last_close = current_close if current_close is not None else closes[-1]
+                current_rsi = self.rsi_calculator.update(last_close)
                 self.rsi.append(current_rsi)
 
         return True
 
-    def __bollinger_bands(self, closes_array: np.ndarray) -> Tuple[float | None, float | None, float | None]:
-        ma, upper, lower = bollinger_numba(
-            closes=closes_array,
-            period=BOLLINGER_PERIOD,
-            std_multiplier=DESVIATION
-        )
-        
+    def __bollinger_bands(self) -> Tuple[float | None, float | None, float | None]:
+        ma, upper, lower = self.last_bollinger
         if np.isnan(ma):
             return None, None, None
         
         return ma, upper, lower
         
-    def __smma(self, closes_array: np.ndarray) -> float | None:
-        smma_result = smma_numba(closes_array, length=SMMA_LENGTH)
-        latest_smma = smma_result[-1]
+    def __smma(self) -> float | None:
+        latest_smma = self.last_smma
         if np.isnan(latest_smma):
             return None
         
@@ -117,7 +161,7 @@ class IndicatorManager:
         if self.prev_atr is None:
             current_atr = tr
         else:
-            current_atr = update_ema(self.prev_atr, tr, ATR_PERIOD)
+            current_atr = update_ema(self.prev_atr, tr, self.params.atr_period)
 
         self.current_atr = current_atr
         self.prev_atr = current_atr
@@ -131,7 +175,7 @@ class IndicatorManager:
             prev_dn=self.prev_dn,
             trend_val=self.trend_val,
             atr=current_atr,
-            multiplier=MULTIPLIER
+            multiplier=self.params.multiplier
         )
 
         self.prev_up = up
@@ -144,3 +188,38 @@ class IndicatorManager:
             self.dn.append(dn)
 
         return trend_val, up, dn
+
+    def get_state(self) -> Dict[str, Any]:
+        """Saved indicator series and the running state of every streaming calculator."""
+        return {
+            "series": {name: np.array(getattr(self, name)) for name in SERIES},
+            "prev_atr": self.prev_atr,
+            "current_atr": self.current_atr,
+            "prev_up": self.prev_up,
+            "prev_dn": self.prev_dn,
+            "trend_val": self.trend_val,
+            "closes_seen": self.closes_seen,
+            "bollinger": self.bollinger.get_state(),
+            "last_bollinger": list(self.last_bollinger),
+            "smma": self.smma_calculator.get_state(),
+            "last_smma": self.last_smma,
+            "rsi": self.rsi_calculator.get_state() if self.rsi_calculator is not None else None,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        for name in SERIES:
+            setattr(self, name, state["series"][name].tolist())
+        self.prev_atr = state["prev_atr"]
+        self.current_atr = state["current_atr"]
+        self.prev_up = state["prev_up"]
+        self.prev_dn = state["prev_dn"]
+        self.trend_val = state["trend_val"]
+        self.closes_seen = state["closes_seen"]
+        self.bollinger.set_state(state["bollinger"])
+        self.last_bollinger = tuple(state["last_bollinger"])
+        self.smma_calculator.set_state(state["smma"])
+        self.last_smma = state["last_smma"]
+        self.rsi_calculator = None
+        if state["rsi"] is not None:
+            self.rsi_calculator = RSIRolling(period=self.params.rsi_period, smoothing=self.params.rsi_smoothing)
+            self.rsi_calculator.set_state(state["rsi"])
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 
@@ -26,4 +26,13 @@ class SignalManager:
             self.sell_signal.append(val_sell)
 
         return val_buy, val_sell
-     
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "buy_signal": np.array(self.buy_signal, dtype=np.float64),
+            "sell_signal": np.array(self.sell_signal, dtype=np.float64),
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.buy_signal = state["buy_signal"].tolist()
+        self.sell_signal = state["sell_signal"].tolist()
@@ -1,58 +1,131 @@
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
-from config import LOT_SIZE, RSI_PERIOD
 from core.market_components.candle_manager import CandleManager
 from core.market_components.indicator_manager import IndicatorManager
 from core.market_components.signal_manager import SignalManager
+from core.position_components.equity_tracker import EquityTracker
 from core.position_manager import PositionManager
 from enums.indicator import Indicator, indicator_keys
 from enums.type_signals import TypeSignal
+from models.account import Account
+from models.instrument import InstrumentSpec
+from models.position import BUY, SELL
+from models.strategy_params import StrategyParams
+from utils.checkpoint import load_checkpoint, save_checkpoint
+from utils.ensure_datetime import from_epoch_ns
 from utils.logger import get_logger
-from utils.trades_utils import calculate_initial_tp_sl
+from utils.swing_index import SwingIndex
 
 
 class MarketSimulator:
 
-    def __init__(self, timeframe: int = 15, indicators: Optional[List[Indicator]] = None):
+    def __init__(
+        self,
+        timeframe: int = 15,
+        indicators: Optional[List[Indicator]] = None,
+        params: Optional[StrategyParams] = None,
+        tz: Any = None,
+        instrument: Optional[InstrumentSpec] = None,
+        account: Optional[Account] = None,
+        max_history: Optional[int] = None
+    ):
+        """
+        timeframe: Timeframe in minutes
+        tz: Timezone of the tick times, used only when exporting (ticks are epoch nanoseconds)
+        instrument: Pip and contract size of the symbol (defaults to XAUUSD)
+        account: Balance shared with other simulators (see PortfolioSimulator)
+        max_history: Keep only the last max_history closed candles (see CandleManager); trades are unchanged
+            and export_to_dataframe returns only those candles
+        """
         self.logger = get_logger(__name__)
-        self.candle_manager = CandleManager(timeframe)
-        self.indicator_manager = IndicatorManager(indicators=indicators)
+        self.tz = tz
+        self.params: StrategyParams = params or StrategyParams()
+        self.candle_manager = CandleManager(timeframe, max_history=max_history, params=self.params)
+        self.indicator_manager = IndicatorManager(indicators=indicators, params=self.params)
         self.signal_manager = SignalManager()
-        self.position_manager = PositionManager()
-        self.candle_time: Optional[datetime] = None
+        self.position_manager = PositionManager(params=self.params, tz=tz, instrument=instrument, account=account)
+        self.swing_index = SwingIndex(lookback=self.params.lookback, max_lookback=self.params.max_lookback)
+        self.equity_tracker = EquityTracker()
+        self.candle_time: Optional[int] = None
+        # Ticks processed so far stamped exactly at candle_time (a resumed run skips only these).
+        self.candle_time_ticks = 0
         self.indicators: Optional[List[Indicator]] = indicators
+        # Called with the direction (BUY/SELL) of every entry signal; returning False skips the entry.
+        self.entry_filter: Optional[Callable[[int], bool]] = None
 
-    def is_candle_closed(self, candle_time: datetime) -> bool:
+    def is_candle_closed(self, candle_time: int) -> bool:
         return self.candle_manager.next_open_time is not None and candle_time >= self.candle_manager.next_open_time
 
-    def process_tick(self, price: float, candle_time: datetime):
-        if candle_time >= datetime(2025, 4, 25, 6, 15) and candle_time <= datetime(2025, 4, 25, 7, 5):
-            self.logger.info(f"Time {candle_time} Price {price}")
-        
-        if self.position_manager.active_position:
+    def process_tick(self, price: float, candle_time: int):
+        if self.position_manager.has_open_positions:
             self.position_manager.update_position(price=price, time=candle_time)
 
+        self.candle_time_ticks = self.candle_time_ticks + 1 if candle_time == self.candle_time else 1
         self.candle_time = candle_time
         self.candle_manager.build_candle(price, candle_time)
         
         if self.is_candle_closed(candle_time):
             self.finalize_current_candle()
 
+    def process_ticks(self, times: np.ndarray, prices: np.ndarray, start: int = 0, stop: Optional[int] = None):
+        """
+        Process ticks[start:stop] in order. Equivalent to calling process_tick for each tick, but the ticks
+        up to the one that closes the current candle are aggregated in one call; while a position is open
+        its exit is resolved over the same range, so the simulator jumps straight to the exit tick.
+        """
+        if stop is None:
+            stop = len(prices)
+
+        i = start
+        while i < stop:
+            candle = self.candle_manager.current_candle
+            next_open_time = self.candle_manager.next_open_time
+            if candle is None or next_open_time is None:
+                self.process_tick(float(prices[i]), int(times[i]))
+                i += 1
+                continue
+
+            close_idx = i + int(np.searchsorted(times[i:stop], next_open_time))
+            if close_idx == i:
+                self.process_tick(float(prices[i]), int(times[i]))
+                i += 1
+                continue
+
+            exit_idx = -1
+            if self.position_manager.has_open_positions:
+                exit_idx = self.position_manager.update_position_range(prices, times, i, close_idx)
+            last_idx = exit_idx if exit_idx >= 0 else close_idx - 1
+            self.candle_manager.build_candle_range(prices[i:last_idx + 1], times[i])
+            self._advance_candle_time(times, i, last_idx + 1)
+            i = last_idx + 1
+
+    def _advance_candle_time(self, times: np.ndarray, start: int, stop: int) -> None:
+        """candle_time and candle_time_ticks after processing times[start:stop] (sorted, not empty)."""
+        last_time = int(times[stop - 1])
+        run_start = start + int(np.searchsorted(times[start:stop], last_time))
+        ticks = stop - run_start
+        if run_start == start and last_time == self.candle_time:
+            ticks += self.candle_time_ticks
+        self.candle_time = last_time
+        self.candle_time_ticks = ticks
+
     def finalize_current_candle(self):
         if self.candle_manager.current_candle is None:
             return
     
-        current_closes = self.candle_manager.closes.copy()
-        if len(current_closes) > RSI_PERIOD:
-            current_closes.pop(0)
-            current_closes.append(self.candle_manager.current_candle.close)
-        
+        # The current close is only visible to the indicators once more than rsi_period candles are saved.
+        current_close = None
+        if self.candle_manager.total_candles > self.params.rsi_period:
+            current_close = self.candle_manager.current_candle.close
+
         is_success = self.indicator_manager.update_indicators(
-            current_closes,
+            self.candle_manager.closes,
+            current_close,
+            self.candle_manager.total_candles
         )
         if is_success and len(self.indicator_manager.ma) > 0:
             self.candle_manager.current_candle.ma = self.indicator_manager.ma[-1]
@@ -82,98 +155,175 @@ class MarketSimulator:
         self.candle_manager.current_candle.buy_signal = buy
         self.candle_manager.current_candle.sell_signal = sell
         self.candle_manager.save_candle()
+        self.swing_index.append(self.candle_manager.current_candle.low, self.candle_manager.current_candle.high)
 
         self.try_open_position()
+        candle = self.candle_manager.current_candle
+        self.equity_tracker.update(candle.time, self.position_manager.equity(candle.close))
         self.candle_manager.current_candle = None
 
     def check_open_position(self):
-        if self.position_manager.active_position is None:
+        """Closes every open position against the signal of the current candle (when close_on_trend_change)."""
+        if not self.params.close_on_trend_change:
             return
-        
-        current_position = self.position_manager.active_position
+
         candle = self.candle_manager.current_candle
         current_price = candle.close
         buy_signal = candle.buy_signal
         sell_signal = candle.sell_signal
         force_close_position = self.position_manager.force_close_position
 
-        if current_position["type"] == TypeSignal.BUY and sell_signal is not None and not np.isnan(sell_signal):
-            force_close_position(
-                current_price,
-                self.candle_manager.current_candle.time,
-                "CHANGE_TREND_TO_SELL"
-            )
+        for current_position in self.position_manager.open_positions:
+            if current_position.direction == BUY and sell_signal is not None and not np.isnan(sell_signal):
+                force_close_position(
+                    current_price,
+                    self.candle_manager.current_candle.time,
+                    "CHANGE_TREND_TO_SELL",
+                    position=current_position
+                )
 
-        elif current_position["type"] == TypeSignal.SELL and buy_signal is not None and not np.isnan(buy_signal):
-            force_close_position(
-                current_price,
-                self.candle_manager.current_candle.time,
-                "CHANGE_TREND_TO_BUY"
-            )
+            elif current_position.direction == SELL and buy_signal is not None and not np.isnan(buy_signal):
+                force_close_position(
+                    current_price,
+                    self.candle_manager.current_candle.time,
+                    "CHANGE_TREND_TO_BUY",
+                    position=current_position
+                )
+
+    def _calculate_tp_sl(self, entry: float, direction: int) -> Tuple[float, float]:
+        """
+        calculate_initial_tp_sl over the saved candles (without the newest one once more than two are saved),
+        answered by the swing index instead of rescanning the lows/highs.
+        """
+        return self.swing_index.calculate_tp_sl(
+            entry,
+            direction,
+            self.indicator_manager.rsi[-1],
+            rrr_soft=self.params.rrr_soft,
+            rrr_hard=self.params.rrr_hard,
+            min_rrr=self.params.min_rrr,
+            skip_last=1 if self.candle_manager.total_candles > 2 else 0
+        )
 
     def try_open_position(self):
-        if self.position_manager.active_position is not None:
+        """
+        With one position (max_positions == 1) a candle either manages the open position or opens a new one.
+        With several, opposite positions are closed first and the signal then opens another position
+        while the book has room (pyramiding on repeated signals).
+        """
+        if self.position_manager.has_open_positions:
             self.check_open_position()
-            return
+            if self.params.max_positions == 1 or not self.position_manager.can_open():
+                return
 
         buy_signal = self.candle_manager.current_candle.buy_signal
         sell_signal = self.candle_manager.current_candle.sell_signal
 
         if buy_signal is not None and not np.isnan(buy_signal):
-            lows = self.candle_manager.lows.copy()
-            highs = self.candle_manager.highs.copy()
-            if len(highs) > 2:
-                highs.pop(-1)
-            
-            if len(lows) > 2:
-                lows.pop(-1)
-
-            tp, sl = calculate_initial_tp_sl(
-                lows=lows,
-                highs=highs,
-                entry=buy_signal,
-                direction=TypeSignal.BUY,
-                rsi=self.indicator_manager.rsi[-1]
-            )
+            if self.entry_filter is not None and not self.entry_filter(BUY):
+                return
+            tp, sl = self._calculate_tp_sl(buy_signal, 1)
             self.position_manager.open_position(
                 trade_type=TypeSignal.BUY,
                 entry_price=buy_signal,
                 tp=tp,
                 sl=sl,
-                lot_size=LOT_SIZE,
+                lot_size=self.params.lot_size,
                 time=self.candle_time,
             )
         elif sell_signal is not None and not np.isnan(sell_signal):
-            lows = self.candle_manager.lows.copy()
-            highs = self.candle_manager.highs.copy()
-            if len(highs) > 2:
-                highs.pop(-1)
-            
-            if len(lows) > 2:
-                lows.pop(-1)
-            tp, sl = calculate_initial_tp_sl(
-                lows=lows,
-                highs=highs,
-                entry=sell_signal,
-                direction=TypeSignal.SELL,
-                rsi=self.indicator_manager.rsi[-1]
-            )
+            if self.entry_filter is not None and not self.entry_filter(SELL):
+                return
+            tp, sl = self._calculate_tp_sl(sell_signal, -1)
             self.position_manager.open_position(
                 trade_type=TypeSignal.SELL,
                 entry_price=sell_signal,
-                lot_size=LOT_SIZE,
+                lot_size=self.params.lot_size,
                 tp=tp,
                 sl=sl,
                 time=self.candle_manager.current_candle.time,
             )
 
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Complete simulator state after the last processed tick: candle buffers and the open candle,
+        indicator and signal state, swing index, positions and equity curve.
+        """
+        return {
+            "timeframe": self.candle_manager.timeframe,
+            "indicators": [indicator.value for indicator in self.indicators or []],
+            "params": asdict(self.params),
+            "symbol": self.position_manager.instrument.symbol,
+            "candle_time": self.candle_time,
+            "candle_time_ticks": self.candle_time_ticks,
+            "candle_manager": self.candle_manager.get_state(),
+            "indicator_manager": self.indicator_manager.get_state(),
+            "signal_manager": self.signal_manager.get_state(),
+            "swing_index": self.swing_index.get_state(),
+            "position_manager": self.position_manager.get_state(),
+            "equity_tracker": self.equity_tracker.get_state(),
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restores a get_state snapshot; timeframe, indicators and params must match this simulator."""
+        if state["timeframe"] != self.candle_manager.timeframe:
+            raise ValueError(
+                f"Checkpoint timeframe {state['timeframe']} does not match {self.candle_manager.timeframe}"
+            )
+        indicators = [indicator.value for indicator in self.indicators or []]
+        if state["indicators"] != indicators:
+            raise ValueError(f"Checkpoint indicators {state['indicators']} do not match {indicators}")
+        if state["params"] != asdict(self.params):
+            raise ValueError("Checkpoint was saved with different strategy params")
+        if state["symbol"] != self.position_manager.instrument.symbol:
+            raise ValueError(
+                f"Checkpoint symbol {state['symbol']} does not match {self.position_manager.instrument.symbol}"
+            )
+
+        self.candle_time = state["candle_time"]
+        self.candle_time_ticks = state["candle_time_ticks"]
+        self.candle_manager.set_state(state["candle_manager"])
+        self.indicator_manager.set_state(state["indicator_manager"])
+        self.signal_manager.set_state(state["signal_manager"])
+        self.swing_index.set_state(state["swing_index"])
+        self.position_manager.set_state(state["position_manager"])
+        self.equity_tracker.set_state(state["equity_tracker"])
+
+    def save_checkpoint(self, path: str) -> str:
+        """
+        Writes get_state to a compressed npz file (see utils.checkpoint). Save before
+        finalize_current_candle so the open candle is resumed instead of closed early.
+        """
+        path = save_checkpoint(path, self.get_state())
+        self.logger.info(f"Checkpoint saved to {path}")
+        return path
+
+    def load_checkpoint(self, path: str) -> None:
+        """
+        Restores a checkpoint written by save_checkpoint; feed it the ticks after the first candle_time_ticks
+        ticks stamped at candle_time.
+        """
+        self.set_state(load_checkpoint(path))
+        self.logger.info(f"Checkpoint loaded from {path}")
+
     def export_to_dataframe(self) -> pd.DataFrame:
+        """
+        One row per closed candle. With max_history only the retained candles are exported and the
+        equity, indicator and signal columns are cut to the same last rows.
+        """
+        rows = len(self.candle_manager.times)
+
+        def tail(values):
+            return values[len(values) - rows:]
+
         payload = {
-            "time": self.candle_manager.times,
+            "time": from_epoch_ns(self.candle_manager.times, self.tz),
             "open": self.candle_manager.opens,
             "high": self.candle_manager.highs,
             "low": self.candle_manager.lows,
-            "close": self.candle_manager.closes
+            "close": self.candle_manager.closes,
+            "equity": tail(self.equity_tracker.column("equity")),
+            "drawdown": tail(self.equity_tracker.column("drawdown")),
         }
 
         if self.indicators is None:
@@ -183,10 +333,10 @@ class MarketSimulator:
             try:
                 for key in indicator_keys.get(indicator, []):
                     if key in ["buy_signal", "sell_signal"]:
-                        payload[key] = getattr(self.signal_manager, key)
+                        payload[key] = tail(getattr(self.signal_manager, key))
                         continue
                     
-                    payload[key] = getattr(self.indicator_manager, key)
+                    payload[key] = tail(getattr(self.indicator_manager, key))
             except Exception as e:
                 self.logger.error(f"Error exporting indicator {indicator} to dataframe: {e}", exc_info=True)
         
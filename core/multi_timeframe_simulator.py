@@ -0,0 +1,100 @@
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.market_simulator import MarketSimulator
+from enums.indicator import Indicator
+from models.strategy_params import StrategyParams
+from utils.logger import get_logger
+
+
+class MultiTimeframeSimulator:
+    """
+    Several MarketSimulator stacks (candles, indicators, signals, positions), one per timeframe, fed from a
+    single pass over the ticks. The ticks are walked in segments ending at the next candle close of any
+    timeframe; each stack aggregates its segment in one call, so the Python work grows with the number of
+    candles and exits, not with ticks times timeframes.
+
+    Inside a segment the higher timeframes are processed first: a lower-timeframe candle closing on the same
+    tick already sees the higher-timeframe candle closed by that tick, and never a later one.
+    """
+
+    def __init__(
+        self,
+        timeframes: List[int],
+        indicators: Optional[List[Indicator]] = None,
+        params: Optional[StrategyParams] = None,
+        tz: Any = None,
+        confirm_with: Optional[Dict[int, int]] = None
+    ):
+        """
+        timeframes: Timeframes in minutes
+        confirm_with: Maps a timeframe to a higher one whose trend (trend_val) must agree with its entries,
+            e.g. {5: 60, 15: 60} only opens 5m/15m BUYs while the 1h trend is up and SELLs while it is down
+        """
+        if len(set(timeframes)) != len(timeframes) or not timeframes:
+            raise ValueError(f"Timeframes must be distinct and not empty: {timeframes}")
+
+        self.logger = get_logger(__name__)
+        self.tz = tz
+        # Highest timeframe first: the processing order within a segment.
+        self.timeframes: List[int] = sorted(timeframes, reverse=True)
+        self.simulators: Dict[int, MarketSimulator] = {
+            timeframe: MarketSimulator(timeframe=timeframe, indicators=indicators, params=params, tz=tz)
+            for timeframe in self.timeframes
+        }
+
+        self.confirm_with: Dict[int, int] = dict(confirm_with or {})
+        for timeframe, higher in self.confirm_with.items():
+            if timeframe not in self.simulators or higher not in self.simulators:
+                raise ValueError(f"Unknown timeframe in confirm_with: {timeframe} -> {higher}")
+            if higher <= timeframe:
+                raise ValueError(f"Confirmation timeframe {higher} must be higher than {timeframe}")
+            self.simulators[timeframe].entry_filter = self.trend_filter(higher)
+
+    def __getitem__(self, timeframe: int) -> MarketSimulator:
+        return self.simulators[timeframe]
+
+    def trend_filter(self, timeframe: int) -> Callable[[int], bool]:
+        """Entry filter accepting a direction only while the last closed candle of timeframe trends the same way."""
+        simulator = self.simulators[timeframe]
+
+        def accept(direction: int) -> bool:
+            return (
+                simulator.candle_manager.total_candles > 0 and
+                simulator.indicator_manager.trend_val == direction
+            )
+
+        return accept
+
+    def _segment_stop(self, times: np.ndarray, start: int, stop: int) -> int:
+        """End (exclusive) of the segment starting at start: one past the next candle-closing tick of any timeframe."""
+        segment_stop = stop
+        for simulator in self.simulators.values():
+            next_open_time = simulator.candle_manager.next_open_time
+            if simulator.candle_manager.current_candle is None or next_open_time is None:
+                return start + 1
+            close_idx = start + int(np.searchsorted(times[start:segment_stop], next_open_time))
+            if close_idx < segment_stop:
+                segment_stop = close_idx + 1
+        return segment_stop
+
+    def process_ticks(self, times: np.ndarray, prices: np.ndarray, start: int = 0, stop: Optional[int] = None):
+        """Process ticks[start:stop] on every timeframe; same results per timeframe as separate MarketSimulators."""
+        if stop is None:
+            stop = len(prices)
+
+        i = start
+        while i < stop:
+            segment_stop = self._segment_stop(times, i, stop)
+            for timeframe in self.timeframes:
+                self.simulators[timeframe].process_ticks(times, prices, i, segment_stop)
+            i = segment_stop
+
+    def finalize_current_candle(self):
+        for timeframe in self.timeframes:
+            self.simulators[timeframe].finalize_current_candle()
+
+    def export_to_dataframe(self, timeframe: int) -> pd.DataFrame:
+        return self.simulators[timeframe].export_to_dataframe()
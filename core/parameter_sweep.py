@@ -0,0 +1,150 @@
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from core.batch_simulator import BatchSimulator
+from core.shared_ticks import SharedTicks, SharedTicksHandle
+from core.simulation_loader import SimulationLoader
+from core.simulation_runner import SimulationRunner
+from enums.indicator import Indicator
+from models.strategy_params import StrategyParams
+from utils.logger import get_logger
+
+# Tick arrays attached by the current worker process, set once by _init_worker.
+_worker_ticks: Optional[SharedTicks] = None
+
+
+def grid_space(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the values of every parameter."""
+    keys = list(space.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_space(space: Dict[str, Any], n_samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Random samples of the search space.
+    A list/tuple of values is sampled uniformly from its items; a (low, high) pair given as a dict
+    {"low": ..., "high": ...} is sampled uniformly (as int when both bounds are ints).
+    """
+    rng = random.Random(seed)
+    points = []
+    for _ in range(n_samples):
+        point: Dict[str, Any] = {}
+        for key, values in space.items():
+            if isinstance(values, dict):
+                low, high = values["low"], values["high"]
+                if isinstance(low, int) and isinstance(high, int):
+                    point[key] = rng.randint(low, high)
+                else:
+                    point[key] = rng.uniform(low, high)
+            else:
+                point[key] = rng.choice(list(values))
+        points.append(point)
+    return points
+
+
+def _init_worker(handle: SharedTicksHandle) -> None:
+    global _worker_ticks
+    _worker_ticks = SharedTicks.attach(handle)
+
+
+def _run_point(
+    point: Dict[str, Any],
+    base_params: StrategyParams,
+    timeframe: int,
+    indicators: Optional[List[Indicator]],
+    vectorized: bool
+) -> Dict[str, Any]:
+    if _worker_ticks is None:
+        raise ValueError("Worker is not initialized")
+
+    params = replace(base_params, **point)
+    # Points the BatchSimulator cannot run (several positions, no trend-change exit) use the tick engine.
+    vectorized = vectorized and BatchSimulator.supports(params)
+    loader = SimulationLoader.from_arrays(_worker_ticks.times, _worker_ticks.prices, _worker_ticks.handle.tz)
+    runner = SimulationRunner(
+        loader,
+        timeframe=timeframe,
+        indicators=indicators,
+        vectorized=vectorized,
+        params=params
+    )
+    runner.run()
+    summary = runner.bot.position_manager.analyze_closed_positions() if runner.bot else {}
+    return {**point, **summary}
+
+
+class ParameterSweep:
+    def __init__(
+        self,
+        loader: SimulationLoader,
+        timeframe: int = 15,
+        indicators: Optional[List[Indicator]] = None,
+        base_params: Optional[StrategyParams] = None,
+        vectorized: bool = True,
+        max_workers: Optional[int] = None
+    ):
+        """
+        loader: Instance of SimulationLoader already loaded (and filtered)
+        timeframe: Timeframe in minutes for every run
+        base_params: Parameters not covered by the search space (defaults to config.py)
+        vectorized: Run each point with the BatchSimulator instead of the tick-by-tick MarketSimulator;
+            points it does not support (max_positions != 1 or close_on_trend_change=False) still run tick by tick
+        max_workers: Size of the process pool (defaults to the number of CPUs)
+        """
+        self.logger = get_logger(__name__)
+        self.loader = loader
+        self.timeframe = timeframe
+        self.indicators = indicators
+        self.base_params = base_params or StrategyParams()
+        self.vectorized = vectorized
+        self.max_workers = max_workers
+
+    def run(self, points: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Runs one simulation per point of the search space in a process pool.
+        The tick arrays are published once (SimulationLoader.share) and every worker attaches to them
+        zero-copy at start-up, so no worker reloads the csv or keeps its own copy.
+
+        Returns:
+            pd.DataFrame: one row per point with its parameters and analyze_closed_positions summary
+        """
+        valid_keys = {field.name for field in fields(StrategyParams)}
+        for point in points:
+            unknown = set(point) - valid_keys
+            if unknown:
+                raise ValueError(f"Unknown parameters in search space: {sorted(unknown)}")
+
+        if self.vectorized:
+            tick_points = sum(not BatchSimulator.supports(replace(self.base_params, **point)) for point in points)
+            if tick_points:
+                self.logger.info(f"{tick_points} points need the tick-by-tick engine and run without vectorization")
+        self.logger.info(f"Running sweep over {len(points)} points...")
+        shared_ticks = self.loader.share()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(shared_ticks.handle,)
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_point, point, self.base_params, self.timeframe, self.indicators, self.vectorized
+                    )
+                    for point in points
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            shared_ticks.close()
+
+        return pd.DataFrame(results)
+
+    def run_grid(self, space: Dict[str, Sequence[Any]]) -> pd.DataFrame:
+        return self.run(grid_space(space))
+
+    def run_random(self, space: Dict[str, Any], n_samples: int, seed: Optional[int] = None) -> pd.DataFrame:
+        return self.run(random_space(space, n_samples, seed))
@@ -0,0 +1,178 @@
+import heapq
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.market_simulator import MarketSimulator
+from core.position_components.equity_tracker import EquityTracker
+from core.simulation_loader import DEFAULT_CHUNK_SIZE, SimulationLoader
+from enums.indicator import Indicator
+from models.account import Account
+from models.instrument import InstrumentSpec
+from models.strategy_params import StrategyParams
+from utils.logger import get_logger
+
+TickChunks = Iterable[Tuple[np.ndarray, np.ndarray]]
+
+
+def merge_tick_streams(streams: List[TickChunks]) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    k-way merge by time of several chunked tick streams, each sorted by time.
+    A heap holds the head time of every stream; the stream with the smallest head yields the run of its
+    ticks that stays before the head of every other stream (ties go to the lower stream index), found with
+    one searchsorted. Only the current chunk of each stream is held, so memory is bounded by the chunk size.
+
+    Yields:
+        (stream index, times, prices) runs in global time order; times and prices are views of the chunk.
+    """
+    iterators = [iter(stream) for stream in streams]
+    exhausted: Tuple[np.ndarray, np.ndarray] = (np.empty(0, dtype=np.int64), np.empty(0))
+    chunks: List[Tuple[np.ndarray, np.ndarray]] = [exhausted] * len(streams)
+    positions = [0] * len(streams)
+
+    def advance(idx: int) -> bool:
+        for times, prices in iterators[idx]:
+            if len(times):
+                chunks[idx] = (times, prices)
+                positions[idx] = 0
+                return True
+        chunks[idx] = exhausted
+        return False
+
+    heap: List[Tuple[int, int]] = []
+    for idx in range(len(streams)):
+        if advance(idx):
+            heap.append((int(chunks[idx][0][0]), idx))
+    heapq.heapify(heap)
+
+    while heap:
+        _, idx = heapq.heappop(heap)
+        times, prices = chunks[idx]
+        pos = positions[idx]
+        if heap:
+            other_time, other_idx = heap[0]
+            side: Literal["left", "right"] = "right" if idx < other_idx else "left"
+            end = pos + int(np.searchsorted(times[pos:], other_time, side=side))
+        else:
+            end = len(times)
+
+        yield idx, times[pos:end], prices[pos:end]
+        positions[idx] = end
+        if end == len(times) and not advance(idx):
+            continue
+        heapq.heappush(heap, (int(chunks[idx][0][positions[idx]]), idx))
+
+
+class PortfolioSimulator:
+    """
+    One MarketSimulator per symbol, all sharing one Account, fed from a time-ordered merge of their tick
+    streams. Each symbol keeps its own candles, indicators and position; entries size against the shared
+    balance as it stands at that tick. equity_tracker samples the portfolio equity (balance plus every
+    open position marked at its symbol's last price) whenever a symbol closes a candle.
+    """
+
+    def __init__(
+        self,
+        instruments: List[InstrumentSpec],
+        timeframe: int = 15,
+        indicators: Optional[List[Indicator]] = None,
+        params: Optional[StrategyParams] = None,
+        tz: Any = None
+    ):
+        """
+        instruments: Pip and contract size of every symbol traded
+        timeframe: Timeframe in minutes, the same for every symbol
+        """
+        symbols = [instrument.symbol for instrument in instruments]
+        if len(set(symbols)) != len(symbols) or not symbols:
+            raise ValueError(f"Symbols must be distinct and not empty: {symbols}")
+
+        self.logger = get_logger(__name__)
+        self.tz = tz
+        self.params: StrategyParams = params or StrategyParams()
+        self.account = Account.with_balance(self.params.balance)
+        self.simulators: Dict[str, MarketSimulator] = {
+            instrument.symbol: MarketSimulator(
+                timeframe=timeframe,
+                indicators=indicators,
+                params=self.params,
+                tz=tz,
+                instrument=instrument,
+                account=self.account
+            )
+            for instrument in instruments
+        }
+        self.equity_tracker = EquityTracker()
+
+    def __getitem__(self, symbol: str) -> MarketSimulator:
+        return self.simulators[symbol]
+
+    @staticmethod
+    def mark_price(simulator: MarketSimulator) -> Optional[float]:
+        """Last price seen by simulator: the close of its open candle, else of its last saved candle."""
+        candle_manager = simulator.candle_manager
+        if candle_manager.current_candle is not None:
+            return candle_manager.current_candle.close
+        if len(candle_manager.closes):
+            return float(candle_manager.closes[-1])
+        return None
+
+    def equity(self) -> float:
+        """Shared balance plus every open position (quantity and open profit) at its symbol's last price."""
+        equity = self.account.balance
+        for simulator in self.simulators.values():
+            position_manager = simulator.position_manager
+            price = self.mark_price(simulator)
+            if position_manager.has_open_positions and price is not None:
+                equity += position_manager.equity(price) - position_manager.balance
+        return equity
+
+    def process_streams(self, streams: Dict[str, TickChunks]):
+        """Runs the merged ticks of streams (symbol -> iterable of (times, prices) chunks) through the simulators."""
+        unknown = set(streams) - set(self.simulators)
+        if unknown:
+            raise ValueError(f"No instrument spec for symbols: {sorted(unknown)}")
+
+        symbols = list(streams)
+        for idx, times, prices in merge_tick_streams([streams[symbol] for symbol in symbols]):
+            simulator = self.simulators[symbols[idx]]
+            candles = len(simulator.equity_tracker)
+            simulator.process_ticks(times, prices)
+            if len(simulator.equity_tracker) > candles:
+                self.equity_tracker.update(int(times[-1]), self.equity())
+
+    def finalize_current_candle(self):
+        for simulator in self.simulators.values():
+            simulator.finalize_current_candle()
+        last_times = [
+            simulator.candle_time for simulator in self.simulators.values() if simulator.candle_time is not None
+        ]
+        if last_times:
+            self.equity_tracker.update(int(max(last_times)), self.equity())
+
+    def run(self, loaders: Dict[str, SimulationLoader], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        loaders: Loaded SimulationLoader per symbol (tick stores or streamed csv files); their ticks are
+            merged chunk by chunk, so at most one chunk per symbol is in memory
+        """
+        self.process_streams({symbol: loader.iter_tick_chunks(chunk_size) for symbol, loader in loaders.items()})
+        self.finalize_current_candle()
+        self.logger.info(
+            f"Portfolio of {len(loaders)} symbols finished. Balance: {self.account.balance} Equity: {self.equity()}"
+        )
+
+    def export_to_dataframe(self, symbol: str) -> pd.DataFrame:
+        return self.simulators[symbol].export_to_dataframe()
+
+    def export_closed_positions_to_dataframe(self) -> pd.DataFrame:
+        """Closed trades of every symbol (with a symbol column) in exit order."""
+        frames = []
+        for symbol, simulator in self.simulators.items():
+            positions = simulator.position_manager.export_closed_positions_to_dataframe()
+            if len(positions):
+                positions.insert(0, "symbol", symbol)
+                frames.append(positions)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True).sort_values("exit_time", kind="stable", ignore_index=True)
@@ -1,5 +1,8 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from models.position import BUY, Position
 from utils.logger import get_logger
 
 
@@ -10,8 +13,11 @@ class BreakEvenLevel:
 
 
 class BreakEvenManager:
-    def __init__(self, multi_level: bool = False):
+    def __init__(self, multi_level: bool = False, pip_size: float = 0.1):
+        """pip_size: price move of one pip of the instrument (0.1 for XAUUSD)"""
         self.multi_level = multi_level
+        self.pip_size = pip_size
+        self.pips_per_unit = 1.0 / pip_size
         self.levels: List[BreakEvenLevel] = []
         self.active_level_idx = 0
         self.logger = get_logger(__name__)
@@ -39,43 +45,73 @@ class BreakEvenManager:
                 return False
             return current_profit_pips >= self.activate_pips
 
-    def apply(self, position: Dict[str, Any], current_price: float):
+    def apply(self, position: Position, current_price: float):
         if self.multi_level:
             level = self.levels[self.active_level_idx]
-            if position['type'].value == 'BUY':
+            if position.direction == BUY:
                 if self.active_level_idx == 0:
-                    position['sl'] = position['entry']
-                    position['tp'] = position['entry'] + (level.profit_pips / 10)
+                    position.sl = position.entry
+                    position.tp = position.entry + (level.profit_pips / self.pips_per_unit)
                     
                 elif self.active_level_idx == 1:
-                    if current_price >= position['entry'] + (level.activate_pips / 10):
-                        position['sl'] = current_price
+                    if current_price >= position.entry + (level.activate_pips / self.pips_per_unit):
+                        position.sl = current_price
                     else:
-                        position['sl'] = position['entry'] + (level.activate_pips / 10)
+                        position.sl = position.entry + (level.activate_pips / self.pips_per_unit)
                     
-                    position['tp'] = current_price + (level.profit_pips / 10)
+                    position.tp = current_price + (level.profit_pips / self.pips_per_unit)
                 elif self.active_level_idx == 2:
-                    position['sl'] = position['sl'] + (level.activate_pips / 10)
-                    position['tp'] = current_price + (level.profit_pips / 10)
+                    position.sl = position.sl + (level.activate_pips / self.pips_per_unit)
+                    position.tp = current_price + (level.profit_pips / self.pips_per_unit)
             else:
-                position['sl'] = position['entry'] - (level.activate_pips / 10)
+                position.sl = position.entry - (level.activate_pips / self.pips_per_unit)
             
             self.logger.info(
                 "Level: {} profit_pips: {} current_price: {} New SL: {} New TP: {}".format(
                     self.active_level_idx,
                     level.profit_pips,
                     current_price,
-                    position['sl'],
-                    position['tp']
+                    position.sl,
+                    position.tp
                 )
             )
             self.active_level_idx += 1
         else:
             if self.profit_pips is None:
                 return
-            if position['type'].value == 'BUY' and self.activate_pips is not None:
-                position['sl'] = position['sl'] + (self.activate_pips / 10)
-                position['tp'] = position['tp'] + (self.profit_pips / 10)
+            if position.direction == BUY and self.activate_pips is not None:
+                position.sl = position.sl + (self.activate_pips / self.pips_per_unit)
+                position.tp = position.tp + (self.profit_pips / self.pips_per_unit)
             else:
                 if self.activate_pips is not None:
-                    position['sl'] = position['entry'] - (self.activate_pips / 10)
+                    position.sl = position.entry - (self.activate_pips / self.pips_per_unit)
+
+    def kernel_params(self) -> Tuple[bool, float, float, np.ndarray, np.ndarray, int, float]:
+        """Arguments describing this manager for resolve_exit_numba."""
+        activate_pips = np.inf if self.activate_pips is None else self.activate_pips
+        profit_pips = np.nan if self.profit_pips is None else self.profit_pips
+        level_activate_pips = np.array([level.activate_pips for level in self.levels], dtype=np.float64)
+        level_profit_pips = np.array([level.profit_pips for level in self.levels], dtype=np.float64)
+        return (
+            self.multi_level, activate_pips, profit_pips,
+            level_activate_pips, level_profit_pips, self.active_level_idx, self.pip_size
+        )
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "multi_level": self.multi_level,
+            "pip_size": self.pip_size,
+            "levels": [[level.activate_pips, level.profit_pips] for level in self.levels],
+            "active_level_idx": self.active_level_idx,
+            "activate_pips": self.activate_pips,
+            "profit_pips": self.profit_pips,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.multi_level = state["multi_level"]
+        self.pip_size = state["pip_size"]
+        self.pips_per_unit = 1.0 / self.pip_size
+        self.levels = [BreakEvenLevel(activate_pips, profit_pips) for activate_pips, profit_pips in state["levels"]]
+        self.active_level_idx = state["active_level_idx"]
+        self.activate_pips = state["activate_pips"]
+        self.profit_pips = state["profit_pips"]
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from numba import njit
+
+COLUMNS = ("time", "equity", "drawdown")
+
+
+@njit
+def track_drawdown_numba(
+    times: np.ndarray,
+    equity: np.ndarray,
+    drawdowns: np.ndarray,
+    peak: float,
+    peak_time: int,
+    underwater: bool,
+    max_drawdown: float,
+    max_drawdown_percent: float,
+    max_duration: int
+) -> Tuple[float, int, bool, float, float, int]:
+    """
+    Continues the running peak/drawdown state over new equity samples and writes the drawdown of each one.
+    A drawdown lasts from its peak until equity gets back to that peak, or until the latest sample
+    (same convention as utils.performance_analytics.drawdown_periods).
+
+    Returns:
+        The updated (peak, peak_time, underwater, max_drawdown, max_drawdown_percent, max_duration).
+    """
+    for i in range(len(equity)):
+        value = float(equity[i])
+        time = int(times[i])
+        if value >= peak:
+            if underwater and time - peak_time > max_duration:
+                max_duration = time - peak_time
+            peak = value
+            peak_time = time
+            underwater = False
+            drawdowns[i] = 0.0
+            continue
+
+        drawdown = peak - value
+        drawdowns[i] = drawdown
+        underwater = True
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+        if drawdown / peak * 100 > max_drawdown_percent:
+            max_drawdown_percent = drawdown / peak * 100
+        if time - peak_time > max_duration:
+            max_duration = time - peak_time
+    return peak, peak_time, underwater, max_drawdown, max_drawdown_percent, max_duration
+
+
+class EquityTracker:
+    """
+    Mark-to-market equity sampled once per candle (balance plus the open position valued at the close),
+    kept in preallocated arrays that double when full. The running peak, drawdown and its duration
+    are updated in O(1) per sample, so the maxima are available at any time without another pass.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.columns: Dict[str, np.ndarray] = {
+            "time": np.empty(capacity, dtype=np.int64),
+            "equity": np.empty(capacity, dtype=np.float64),
+            "drawdown": np.empty(capacity, dtype=np.float64),
+        }
+        self.peak = -np.inf
+        self.peak_time = 0
+        self.underwater = False
+        self.max_drawdown = 0.0
+        self.max_drawdown_percent = 0.0
+        # Nanoseconds
+        self.max_drawdown_duration = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column over the stored samples."""
+        return self.columns[name][:self.size]
+
+    @property
+    def drawdown(self) -> float:
+        return float(self.columns["drawdown"][self.size - 1]) if self.size else 0.0
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self.columns["time"])
+        if self.size + rows <= capacity:
+            return
+
+        new_capacity = max(2 * capacity, self.size + rows)
+        for name, values in self.columns.items():
+            grown = np.empty(new_capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    def update(self, time: int, equity: float) -> None:
+        self.extend(np.array([time], dtype=np.int64), np.array([equity], dtype=np.float64))
+
+    def extend(self, times: np.ndarray, equity: np.ndarray) -> None:
+        rows = len(times)
+        if rows == 0:
+            return
+
+        self._reserve(rows)
+        start, stop = self.size, self.size + rows
+        self.columns["time"][start:stop] = times
+        self.columns["equity"][start:stop] = equity
+        (
+            self.peak, self.peak_time, self.underwater,
+            self.max_drawdown, self.max_drawdown_percent, self.max_drawdown_duration
+        ) = track_drawdown_numba(
+            self.columns["time"][start:stop], self.columns["equity"][start:stop],
+            self.columns["drawdown"][start:stop], self.peak, self.peak_time, self.underwater,
+            self.max_drawdown, self.max_drawdown_percent, self.max_drawdown_duration
+        )
+        self.size = stop
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "columns": {name: self.column(name).copy() for name in COLUMNS},
+            "peak": self.peak,
+            "peak_time": self.peak_time,
+            "underwater": self.underwater,
+            "max_drawdown": self.max_drawdown,
+            "max_drawdown_percent": self.max_drawdown_percent,
+            "max_drawdown_duration": self.max_drawdown_duration,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        rows = len(state["columns"]["time"])
+        capacity = max(rows, len(self.columns["time"]))
+        for name in COLUMNS:
+            self.columns[name] = np.empty(capacity, dtype=self.columns[name].dtype)
+            self.columns[name][:rows] = state["columns"][name]
+        self.size = rows
+        self.peak = state["peak"]
+        self.peak_time = state["peak_time"]
+        self.underwater = state["underwater"]
+        self.max_drawdown = state["max_drawdown"]
+        self.max_drawdown_percent = state["max_drawdown_percent"]
+        self.max_drawdown_duration = state["max_drawdown_duration"]
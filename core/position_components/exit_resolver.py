@@ -0,0 +1,81 @@
+import numpy as np
+from numba import njit
+
+EXIT_NONE = 0
+EXIT_SL = 1
+EXIT_TP = 2
+EXIT_REASON_NAMES = {EXIT_SL: "SL", EXIT_TP: "TP"}
+
+
+@njit
+def resolve_exit_numba(
+    prices: np.ndarray,
+    start: int,
+    stop: int,
+    direction: int,
+    entry: float,
+    sl: float,
+    tp: float,
+    multi_level: bool,
+    activate_pips: float,
+    profit_pips: float,
+    level_activate_pips: np.ndarray,
+    level_profit_pips: np.ndarray,
+    level_idx: int,
+    pip_size: float,
+):
+    """
+    Walks prices[start:stop] applying the PositionManager V2 rules (break-even, then SL, then TP)
+    and stops at the first tick that closes the position.
+
+    direction: 1 for BUY, -1 for SELL.
+    Break-even follows BreakEvenManager.should_apply/apply: in normal mode pass activate_pips=inf
+    to disable it and profit_pips=nan to reproduce a manager without profit_pips.
+    pip_size: price move of one pip of the instrument (0.1 for XAUUSD).
+
+    Returns:
+        (exit_index, exit_price, reason, sl, tp, level_idx). exit_index is -1 and reason EXIT_NONE
+        when no tick in the slice closes the position; sl/tp/level_idx are the updated state.
+    """
+    n_levels = len(level_activate_pips)
+    pips_per_unit = 1.0 / pip_size
+    for i in range(start, stop):
+        price = float(prices[i])
+        if direction == 1:
+            current_profit_pips = (price - entry) / pip_size
+        else:
+            current_profit_pips = (entry - price) / pip_size
+
+        if multi_level:
+            if level_idx < n_levels and current_profit_pips >= level_activate_pips[level_idx]:
+                level_activate = level_activate_pips[level_idx]
+                level_profit = level_profit_pips[level_idx]
+                if direction == 1:
+                    if level_idx == 0:
+                        sl = entry
+                        tp = entry + (level_profit / pips_per_unit)
+                    elif level_idx == 1:
+                        if price >= entry + (level_activate / pips_per_unit):
+                            sl = price
+                        else:
+                            sl = entry + (level_activate / pips_per_unit)
+                        tp = price + (level_profit / pips_per_unit)
+                    elif level_idx == 2:
+                        sl = sl + (level_activate / pips_per_unit)
+                        tp = price + (level_profit / pips_per_unit)
+                else:
+                    sl = entry - (level_activate / pips_per_unit)
+                level_idx += 1
+        elif current_profit_pips >= activate_pips and not np.isnan(profit_pips):
+            if direction == 1:
+                sl = sl + (activate_pips / pips_per_unit)
+                tp = tp + (profit_pips / pips_per_unit)
+            else:
+                sl = entry - (activate_pips / pips_per_unit)
+
+        if (direction == 1 and price < sl) or (direction == -1 and price > sl):
+            return i, price, EXIT_SL, sl, tp, level_idx
+        if (direction == 1 and price > tp) or (direction == -1 and price < tp):
+            return i, price, EXIT_TP, sl, tp, level_idx
+
+    return -1, np.nan, EXIT_NONE, sl, tp, level_idx
@@ -0,0 +1,134 @@
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numba import njit
+
+from core.position_components.break_even_manager import BreakEvenManager
+from models.position import BUY, Position
+
+# Relative slack on the trigger prices: a position is re-checked slightly before its level so that
+# rounding in the level (entry + pips * pip_size) never hides a tick the exact V2 rules would act on.
+TRIGGER_TOLERANCE = 1e-9
+
+
+@njit
+def first_crossing_numba(prices: np.ndarray, start: int, stop: int, high: float, low: float) -> int:
+    """Index of the first price in prices[start:stop] at or above high or at or below low, -1 if none."""
+    for i in range(start, stop):
+        if prices[i] >= high or prices[i] <= low:
+            return i
+    return -1
+
+
+def trigger_levels(position: Position, manager: Optional[BreakEvenManager]) -> Tuple[float, float]:
+    """
+    Nearest price above (high) and below (low) the market at which the V2 rules (break-even, SL, TP)
+    can change or close position; inf / -inf when there is none on that side.
+    BUY: TP and break-even activation above, SL below. SELL: SL above, TP and activation below.
+    """
+    activation = np.nan
+    if manager is not None:
+        if manager.multi_level:
+            if manager.active_level_idx < len(manager.levels):
+                activation = manager.levels[manager.active_level_idx].activate_pips
+        elif manager.activate_pips is not None and manager.profit_pips is not None:
+            activation = manager.activate_pips
+
+    if position.direction == BUY:
+        high = position.tp
+        if not np.isnan(activation):
+            high = min(high, position.entry + activation * manager.pip_size)
+        return high, position.sl
+
+    low = position.tp
+    if not np.isnan(activation):
+        low = max(low, position.entry - activation * manager.pip_size)
+    return position.sl, low
+
+
+class PositionBook:
+    """
+    Open positions of one PositionManager when several may be open at once.
+
+    Each position has one entry in a min-heap of its high trigger and one in a max-heap of its low
+    trigger (see trigger_levels). A tick only pops the entries whose level it crossed, so only those
+    positions are re-evaluated; entries of a position re-evaluated or closed since they were pushed
+    are stale (older version) and dropped lazily. next_trigger scans a tick range in a compiled loop against
+    the nearest levels of both heaps, so the ticks in between are skipped without Python work.
+    """
+
+    def __init__(self):
+        self.positions: Dict[int, Position] = {}
+        self.managers: Dict[int, Optional[BreakEvenManager]] = {}
+        self.versions: Dict[int, int] = {}
+        self.keys: Dict[int, int] = {}
+        self.high_heap: List[Tuple[float, int, int]] = []
+        # Levels stored negated: a max-heap on top of heapq.
+        self.low_heap: List[Tuple[float, int, int]] = []
+        self.next_key = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[Position]:
+        return iter(list(self.positions.values()))
+
+    def manager(self, position: Position) -> Optional[BreakEvenManager]:
+        return self.managers[self.keys[id(position)]]
+
+    def add(self, position: Position, manager: Optional[BreakEvenManager]) -> None:
+        key = self.next_key
+        self.next_key += 1
+        self.positions[key] = position
+        self.managers[key] = manager
+        self.keys[id(position)] = key
+        self.versions[key] = 0
+        self.reindex(key)
+
+    def remove(self, position: Position) -> None:
+        key = self.keys.pop(id(position))
+        del self.positions[key]
+        del self.managers[key]
+        del self.versions[key]
+
+    def reindex(self, key: int) -> None:
+        """Pushes the current trigger levels of a position; its previous heap entries become stale."""
+        version = self.versions[key] + 1
+        self.versions[key] = version
+        high, low = trigger_levels(self.positions[key], self.managers[key])
+        heapq.heappush(self.high_heap, (high, version, key))
+        heapq.heappush(self.low_heap, (-low, version, key))
+
+    def _discard_stale(self, heap: List[Tuple[float, int, int]]) -> None:
+        while heap and self.versions.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def nearest_levels(self) -> Tuple[float, float]:
+        self._discard_stale(self.high_heap)
+        self._discard_stale(self.low_heap)
+        high = self.high_heap[0][0] if self.high_heap else np.inf
+        low = -self.low_heap[0][0] if self.low_heap else -np.inf
+        return high, low
+
+    def next_trigger(self, prices: np.ndarray, start: int, stop: int) -> int:
+        """Index of the first tick in prices[start:stop] that crosses any trigger level, -1 if none does."""
+        high, low = self.nearest_levels()
+        return first_crossing_numba(
+            prices, start, stop, high - TRIGGER_TOLERANCE * abs(high), low + TRIGGER_TOLERANCE * abs(low)
+        )
+
+    def pop_triggered(self, price: float) -> List[int]:
+        """Keys (in opening order) of the positions with a trigger level crossed by price."""
+        triggered = set()
+        heap = self.high_heap
+        while heap and heap[0][0] - TRIGGER_TOLERANCE * abs(heap[0][0]) <= price:
+            level, version, key = heapq.heappop(heap)
+            if self.versions.get(key) == version:
+                triggered.add(key)
+        heap = self.low_heap
+        while heap and -heap[0][0] + TRIGGER_TOLERANCE * abs(heap[0][0]) >= price:
+            level, version, key = heapq.heappop(heap)
+            if self.versions.get(key) == version:
+                triggered.add(key)
+        return sorted(triggered)
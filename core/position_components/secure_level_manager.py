@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from models.position import BUY, Position
 from utils.logger import get_logger
 
 
@@ -15,15 +15,15 @@ class SecureLevelManager:
             self.logger.info(f"Secure level applied at {current_profit_pips} pips")
         return is_apply
 
-    def apply(self, position: Dict[str, Any], current_profit_pips: float, current_price: float):
-        if position['type'].value == 'BUY':
+    def apply(self, position: Position, current_profit_pips: float, current_price: float):
+        if position.direction == BUY:
             if current_profit_pips >= self.secure_pips:
-                position['sl'] = current_price - (self.secure_pips / 10)
+                position.sl = current_price - (self.secure_pips / 10)
             else:
-                position['sl'] = position['entry']
+                position.sl = position.entry
         else:
-            if position['entry'] - current_price > self.secure_pips:
-                position['sl'] = current_price + self.secure_pips
+            if position.entry - current_price > self.secure_pips:
+                position.sl = current_price + self.secure_pips
             else:
-                position['sl'] = position['entry']
+                position.sl = position.entry
         self.active = True
@@ -0,0 +1,199 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from enums.entry_context import EntryContext
+from enums.type_signals import TypeSignal
+from models.position import BUY, Position
+from utils.ensure_datetime import from_epoch_ns
+from utils.performance_analytics import drawdown_curve
+
+FLOAT_COLUMNS = (
+    "entry", "entry_sl", "entry_tp", "sl", "tp", "exit_price", "profit", "balance", "quantity", "lot_size",
+    "max_price", "min_price", "sl_break_even", "tp_break_even", "sl_trail", "tp_trail",
+)
+INT_COLUMNS = ("open_time", "exit_time", "direction", "exit_reason", "entry_context")
+BOOL_COLUMNS = ("breakeven_applied", "trail_active")
+# Position fields that may be None; stored as NaN.
+OPTIONAL_COLUMNS = ("sl_break_even", "tp_break_even", "sl_trail", "tp_trail")
+ENTRY_CONTEXTS = tuple(EntryContext)
+# Every exit reason the engines produce, in a fixed order: codes and export categories are the same
+# for any run and engine. Other reasons are appended after them when first seen.
+EXIT_REASONS = ("SL", "TP", "CHANGE_TREND_TO_SELL", "CHANGE_TREND_TO_BUY")
+TYPE_NAMES = (TypeSignal.BUY.value, TypeSignal.SELL.value)
+
+
+class TradeLedger:
+    """
+    Closed trades stored column-wise: one preallocated NumPy array per field, doubled when full.
+    exit_reason and entry_context are stored as small integer codes (see reason_names / ENTRY_CONTEXTS).
+    Indexing returns Position records rebuilt from the columns.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.size = 0
+        self.reason_names: List[str] = list(EXIT_REASONS)
+        self.reason_codes: Dict[str, int] = {reason: code for code, reason in enumerate(EXIT_REASONS)}
+        self.columns: Dict[str, np.ndarray] = {}
+        for name in FLOAT_COLUMNS:
+            self.columns[name] = np.empty(capacity, dtype=np.float64)
+        for name in INT_COLUMNS:
+            self.columns[name] = np.empty(capacity, dtype=np.int64)
+        for name in BOOL_COLUMNS:
+            self.columns[name] = np.empty(capacity, dtype=np.bool_)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Position]:
+        for i in range(self.size):
+            yield self[i]
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Position, List[Position]]:
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(self.size))]
+
+        if key < 0:
+            key += self.size
+        if not 0 <= key < self.size:
+            raise IndexError("TradeLedger index out of range")
+
+        row: Dict[str, Any] = {name: values[key].item() for name, values in self.columns.items()}
+        for name in OPTIONAL_COLUMNS:
+            if np.isnan(row[name]):
+                row[name] = None
+        row["exit_reason"] = self.reason_names[row["exit_reason"]]
+        row["entry_context"] = ENTRY_CONTEXTS[row["entry_context"]]
+        return Position(status="closed", **row)
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column over the stored trades."""
+        return self.columns[name][:self.size]
+
+    def readonly_column(self, name: str) -> np.ndarray:
+        """column() without write access, safe to hand out (e.g. inside an exported DataFrame)."""
+        values = self.column(name).view()
+        values.flags.writeable = False
+        return values
+
+    def reason_code(self, reason: str) -> int:
+        code = self.reason_codes.get(reason)
+        if code is None:
+            code = len(self.reason_names)
+            self.reason_names.append(reason)
+            self.reason_codes[reason] = code
+        return code
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self.columns["entry"])
+        if self.size + rows <= capacity:
+            return
+
+        new_capacity = max(2 * capacity, self.size + rows)
+        for name, values in self.columns.items():
+            grown = np.empty(new_capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    def append(self, position: Position) -> None:
+        self._reserve(1)
+        i = self.size
+        columns = self.columns
+        for name in FLOAT_COLUMNS:
+            value = getattr(position, name)
+            columns[name][i] = np.nan if value is None else value
+        columns["open_time"][i] = position.open_time
+        columns["exit_time"][i] = position.exit_time
+        columns["direction"][i] = position.direction
+        columns["exit_reason"][i] = self.reason_code(position.exit_reason)
+        columns["entry_context"][i] = ENTRY_CONTEXTS.index(position.entry_context)
+        columns["breakeven_applied"][i] = position.breakeven_applied
+        columns["trail_active"][i] = position.trail_active
+        self.size += 1
+
+    def extend(self, exit_reasons: np.ndarray, reason_names: List[str], **values: Any) -> None:
+        """
+        Bulk append from arrays (one value per trade). exit_reasons are codes into reason_names;
+        omitted columns take their Position defaults.
+        """
+        rows = len(exit_reasons)
+        if rows == 0:
+            return
+
+        self._reserve(rows)
+        start, stop = self.size, self.size + rows
+        codes: np.ndarray = np.full(len(reason_names), -1, dtype=np.int64)
+        for code in np.unique(exit_reasons):
+            codes[code] = self.reason_code(reason_names[code])
+        self.columns["exit_reason"][start:stop] = codes[exit_reasons]
+        defaults = {
+            "entry_context": ENTRY_CONTEXTS.index(EntryContext.STANDARD),
+            "breakeven_applied": False,
+            "trail_active": False,
+        }
+        for name in FLOAT_COLUMNS + INT_COLUMNS + BOOL_COLUMNS:
+            if name == "exit_reason":
+                continue
+            if name in values:
+                self.columns[name][start:stop] = values[name]
+            elif name in defaults:
+                self.columns[name][start:stop] = defaults[name]
+            elif name in OPTIONAL_COLUMNS:
+                self.columns[name][start:stop] = np.nan
+            else:
+                raise ValueError(f"Missing ledger column: {name}")
+        self.size = stop
+
+    def drawdowns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """drawdown_curve of the balance after each trade."""
+        return drawdown_curve(self.column("balance"))
+
+    def to_dataframe(self, tz: Optional[Any] = None) -> pd.DataFrame:
+        """
+        Closed trades in the export schema of PositionManager.export_closed_positions_to_dataframe.
+        Numeric columns are read-only views of the ledger (no copy; editing them in place raises instead of
+        changing the trade history); type, exit_reason and entry_context are categoricals built from the stored
+        codes, with the categories in a fixed order (EXIT_REASONS for exit_reason).
+        """
+        if self.size == 0:
+            return pd.DataFrame()
+
+        return pd.DataFrame({
+            "entry_time": from_epoch_ns(self.readonly_column("open_time"), tz),
+            "exit_time": from_epoch_ns(self.readonly_column("exit_time"), tz),
+            "type": pd.Categorical.from_codes((self.column("direction") != BUY).view(np.int8), TYPE_NAMES),
+            "entry_price": self.readonly_column("entry"),
+            "entry_sl": self.readonly_column("entry_sl"),
+            "entry_tp": self.readonly_column("entry_tp"),
+            "exit_price": self.readonly_column("exit_price"),
+            "exit_reason": pd.Categorical.from_codes(self.column("exit_reason"), self.reason_names),
+            "lot_size": self.readonly_column("lot_size"),
+            "breakeven_applied": self.readonly_column("breakeven_applied"),
+            "trail_active": self.readonly_column("trail_active"),
+            "sl_break_even": self.readonly_column("sl_break_even"),
+            "tp_break_even": self.readonly_column("tp_break_even"),
+            "sl_trail": self.readonly_column("sl_trail"),
+            "tp_trail": self.readonly_column("tp_trail"),
+            "max_price": self.readonly_column("max_price"),
+            "min_price": self.readonly_column("min_price"),
+            "entry_context": pd.Categorical.from_codes(
+                self.column("entry_context"), [context.value for context in ENTRY_CONTEXTS]
+            ),
+        }, copy=False)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "reason_names": list(self.reason_names),
+            "columns": {name: self.column(name).copy() for name in self.columns},
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        rows = len(state["columns"]["entry"])
+        capacity = max(rows, len(self.columns["entry"]))
+        for name, values in self.columns.items():
+            self.columns[name] = np.empty(capacity, dtype=values.dtype)
+            self.columns[name][:rows] = state["columns"][name]
+        self.reason_names = list(state["reason_names"])
+        self.reason_codes = {reason: code for code, reason in enumerate(self.reason_names)}
+        self.size = rows
@@ -1,5 +1,6 @@
-from typing import Any, Dict, Optional
+from typing import Optional
 
+from models.position import BUY, Position
 from utils.logger import get_logger
 
 
@@ -19,11 +20,11 @@ class TrailingStopManager:
             return True
         return abs(current_profit_pips - self.last_trailing_price) >= self.step_pips
 
-    def apply(self, position: Dict[str, Any], current_price: float):
-        if position['type'].value == 'BUY':
+    def apply(self, position: Position, current_price: float):
+        if position.direction == BUY:
             new_sl = current_price - self.trailing_pips
-            if new_sl > position['sl']:
-                position['sl'] = new_sl
+            if new_sl > position.sl:
+                position.sl = new_sl
         else:
-            position['sl'] = current_price + self.trailing_pips
+            position.sl = current_price + self.trailing_pips
         self.last_trailing_price = current_price
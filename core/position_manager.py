@@ -1,46 +1,95 @@
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 import numpy as np
 import pandas as pd # type: ignore
 
-from config import BALANCE, BREAK_EVEN_TRIGGER, LOT_SIZE, TRAILING_DISTANCE
 from core.position_components.break_even_manager import BreakEvenManager
+from core.position_components.exit_resolver import EXIT_NONE, EXIT_REASON_NAMES, resolve_exit_numba
+from core.position_components.position_book import PositionBook
 from core.position_components.secure_level_manager import SecureLevelManager
+from core.position_components.trade_ledger import TradeLedger
 from core.position_components.trailing_stop_manager import TrailingStopManager
 from enums.entry_context import EntryContext
 from enums.type_signals import TypeSignal
+from models.account import Account
+from models.instrument import XAUUSD, InstrumentSpec
+from models.position import BUY, SELL, Position, direction_from_signal
+from models.strategy_params import StrategyParams
+from utils.ensure_datetime import to_timestamp
 from utils.logger import get_logger
 
 
-def dollars_to_pips(dollar_amount: float, lot_size: float) -> float:
+def dollars_to_pips(dollar_amount: float, lot_size: float, instrument: InstrumentSpec = XAUUSD) -> float:
     """
-    Convert dollars to pips in XAUUSD.
+    Convert dollars to pips of the instrument (XAUUSD by default).
 
-    Each pip (0.1 of movement) is worth:
+    In XAUUSD each pip (0.1 of movement) is worth:
     - 10 USD per 1.0 lot
     - 1 USD per 0.1 lot
     - 0.1 USD per 0.01 lot
     """
-    pip_value_per_lot = 10  # 10 USD by pip in 1.0 lot in XAUUSD
-    pip_value = pip_value_per_lot * lot_size
+    pip_value = instrument.pip_value_per_lot * lot_size
     pips = dollar_amount / pip_value
     return pips
 
 
 class PositionManager:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        params: Optional[StrategyParams] = None,
+        tz: Any = None,
+        instrument: Optional[InstrumentSpec] = None,
+        account: Optional[Account] = None
+    ) -> None:
+        """
+        instrument: Pip size and contract size of the traded symbol (defaults to XAUUSD)
+        account: Balance shared with other managers (a new account with params.balance by default)
+        """
         self.logger = get_logger(self.__class__.__name__)
-        self.active_position: Optional[Dict[str, Any]] = None
-        self.closed_positions: List[Dict[str, Any]] = []
-        self.balance: float = BALANCE
-        self.balance_initial: float = BALANCE
-        self.lot_size: float = LOT_SIZE
+        self.tz = tz
+        self.params: StrategyParams = params or StrategyParams()
+        self.instrument: InstrumentSpec = instrument or XAUUSD
+        self.account: Account = account or Account.with_balance(self.params.balance)
+        self.active_position: Optional[Position] = None
+        self.closed_positions: TradeLedger = TradeLedger()
+        self.balance_initial: float = self.account.initial_balance
+        self.lot_size: float = self.params.lot_size
         self.work_mode: str = 'V2'
 
         self.break_even_manager: Optional[BreakEvenManager] = None
         self.trailing_stop_manager: Optional[TrailingStopManager] = None
         self.secure_level_manager: Optional[SecureLevelManager] = None
+        # With params.max_positions > 1 the open positions (each with its own break-even manager) live in the
+        # book instead of active_position / break_even_manager.
+        self.book: Optional[PositionBook] = PositionBook() if self.params.max_positions > 1 else None
+        if self.book is not None and self.work_mode != 'V2':
+            raise ValueError("Several open positions are only supported in V2 mode")
+
+    @property
+    def balance(self) -> float:
+        return self.account.balance
+
+    @balance.setter
+    def balance(self, value: float) -> None:
+        self.account.balance = value
+
+    @property
+    def open_positions(self) -> List[Position]:
+        """Every open position, oldest first."""
+        if self.book is not None:
+            return list(self.book)
+        return [self.active_position] if self.active_position is not None else []
+
+    @property
+    def has_open_positions(self) -> bool:
+        if self.book is not None:
+            return len(self.book) > 0
+        return self.active_position is not None
+
+    def can_open(self) -> bool:
+        if self.book is not None:
+            return len(self.book) < self.params.max_positions
+        return self.active_position is None
 
     def open_position(
         self,
@@ -48,61 +97,63 @@ class PositionManager:
         entry_price: float,
         tp: float,
         sl: float,
-        time: datetime,
-        lot_size: float = LOT_SIZE,
+        time: int,
+        lot_size: Optional[float] = None,
         entry_context: EntryContext = EntryContext.STANDARD
     ) -> None:
-        if self.active_position is not None:
+        if lot_size is None:
+            lot_size = self.lot_size
+
+        if not self.can_open():
             self.logger.error("Position already open. Cannot open new position.")
-            self.logger.info(f"Active position: {self.active_position.get('type')}")
+            self.logger.info(f"Open positions: {[position.type for position in self.open_positions]}")
             return
 
         quantity = lot_size * self.balance
         self.balance -= quantity
-        self.active_position = {
-            "type": trade_type,
-            "entry": entry_price,
-            "entry_sl": sl,
-            "entry_tp": tp,
-            "sl": sl,
-            "tp": tp,
-            "sl_break_even": None,
-            "tp_break_even": None,
-            "sl_trail": None,
-            "tp_trail": None,
-            "status": "open",
-            "trail_active": False,
-            "breakeven_applied": False,
-            "max_price": entry_price,
-            "min_price": entry_price,
-            "open_time": time,
-            "lot_size": lot_size,
-            "entry_context": entry_context,
-            "reason": "",
-            "balance": self.balance,
-            "quantity": quantity,
-        }
+        position = Position(
+            direction=direction_from_signal(trade_type),
+            entry=entry_price,
+            entry_sl=sl,
+            entry_tp=tp,
+            sl=sl,
+            tp=tp,
+            open_time=time,
+            lot_size=lot_size,
+            quantity=quantity,
+            balance=self.balance,
+            max_price=entry_price,
+            min_price=entry_price,
+            entry_context=entry_context,
+        )
 
-        self.break_even_manager = BreakEvenManager(multi_level=False)
-        activate_pips = dollars_to_pips(60, lot_size)
-        profit_pips = dollars_to_pips(100, lot_size)
-        self.break_even_manager.set_normal(activate_pips=activate_pips, profit_pips=profit_pips)
-        self.logger.info(f"Opened {trade_type.value} Entry: {entry_price} TP: {tp} SL: {sl} Time: {time}")
+        break_even_manager = BreakEvenManager(multi_level=False, pip_size=self.instrument.pip_size)
+        activate_pips = dollars_to_pips(self.params.break_even_activate_usd, lot_size, self.instrument)
+        profit_pips = dollars_to_pips(self.params.break_even_profit_usd, lot_size, self.instrument)
+        break_even_manager.set_normal(activate_pips=activate_pips, profit_pips=profit_pips)
+        if self.book is not None:
+            self.book.add(position, break_even_manager)
+        else:
+            self.active_position = position
+            self.break_even_manager = break_even_manager
+        self.logger.info(
+            f"Opened {trade_type.value} Entry: {entry_price} TP: {tp} SL: {sl} Time: {to_timestamp(time, self.tz)}"
+        )
 
-    def update_position_v1(self, price: float, time: datetime) -> bool:
+    def update_position_v1(self, price: float, time: int) -> bool:
         pos = self.active_position
-        if not pos or pos["status"] != "open":
+        if not pos or pos.status != "open":
             return False
     
-        pos["max_price"] = max(pos["max_price"], price)
-        pos["min_price"] = min(pos["min_price"], price)
-        current_sl = pos["sl_trail"] or pos["sl_break_even"] or pos["sl"]
-        current_tp = pos["tp_trail"] or pos["tp_break_even"] or pos["tp"]
+        pos.max_price = max(pos.max_price, price)
+        pos.min_price = min(pos.min_price, price)
+        current_sl = pos.sl_trail or pos.sl_break_even or pos.sl
+        current_tp = pos.tp_trail or pos.tp_break_even or pos.tp
         
-        if not pos["breakeven_applied"] and self.check_break_even(price, time):
+        if not pos.breakeven_applied and self.check_break_even(price, time):
             return True
 
-        if pos["breakeven_applied"] and self.check_trailing_stop(price):
+        if pos.breakeven_applied and self.check_trailing_stop(price):
             return True
 
         if self.check_sl_hit(price, time, current_sl):
@@ -113,57 +164,89 @@ class PositionManager:
         
         return False
     
-    def update_position_v2(self, price: float, time: datetime) -> bool:
-        pos = self.active_position
-        if not pos or pos["status"] != "open":
-            return False
+    def check_exit_v2(
+        self,
+        pos: Position,
+        break_even_manager: Optional[BreakEvenManager],
+        price: float,
+        time: int
+    ) -> Optional[str]:
+        """
+        V2 rules for one position at one tick: break-even first, then SL, then TP.
 
+        Returns:
+            Optional[str]: "SL" or "TP" when the position must close at price, None otherwise
+        """
         current_profit_pips = self.calculate_profit_pips(pos, price)
         # apply Break Even
-        if self.break_even_manager and self.break_even_manager.should_apply(current_profit_pips):
-            self.break_even_manager.apply(pos, price)
+        if break_even_manager and break_even_manager.should_apply(current_profit_pips):
+            break_even_manager.apply(pos, price)
             self.logger.info(
-                f"Break-even applied. Current Price: {price} New TP: {pos['tp']} New SL: {pos['sl']} Time: {time}"
+                f"Break-even applied. Current Price: {price} New TP: {pos.tp} New SL: {pos.sl} "
+                f"Time: {to_timestamp(time, self.tz)}"
             )
 
-        if (pos["type"].value == "BUY" and price < pos["sl"]) or (pos["type"].value == "SELL" and price > pos["sl"]):
-            pos["status"] = "closed"
-            pos["exit_price"] = price
-            pos["exit_time"] = time
-            pos["exit_reason"] = "SL"
-            self.close_position(price, time, reason="SL")
-            self.active_position = None
-            self.logger.info(f"Position closed due to SL at {price} Time: {time}")
-            return True
+        if (pos.direction == BUY and price < pos.sl) or (pos.direction == SELL and price > pos.sl):
+            return "SL"
+        if (pos.direction == BUY and price > pos.tp) or (pos.direction == SELL and price < pos.tp):
+            return "TP"
+        return None
 
-        elif (
-            (pos["type"].value == "BUY" and price > pos["tp"]) or (pos["type"].value == "SELL" and price < pos["tp"])
-        ):
-            pos["status"] = "closed"
-            pos["exit_price"] = price
-            pos["exit_time"] = time
-            pos["exit_reason"] = "TP"
-            self.close_position(price, time, reason="TP")
-            self.active_position = None
-            self.logger.info(f"Position closed due to TP at {price} Time: {time}")
-            return True
+    def update_position_v2(self, price: float, time: int) -> bool:
+        pos = self.active_position
+        if not pos or pos.status != "open":
+            return False
 
-        return False
+        reason = self.check_exit_v2(pos, self.break_even_manager, price, time)
+        if reason is None:
+            return False
+
+        self.close_position(price, time, reason=reason)
+        self.active_position = None
+        self.logger.info(f"Position closed due to {reason} at {price} Time: {to_timestamp(time, self.tz)}")
+        return True
+
+    def update_book(self, price: float, time: int) -> bool:
+        """
+        V2 rules at one tick for the positions of the book whose trigger levels the price crossed
+        (the others cannot change at this price).
+
+        Returns:
+            bool: True if any position was closed
+        """
+        book = self.book
+        if book is None:
+            return False
 
-    def update_position(self, price: float, time: datetime) -> bool:
+        closed = False
+        for key in book.pop_triggered(price):
+            pos = book.positions[key]
+            reason = self.check_exit_v2(pos, book.managers[key], price, time)
+            if reason is None:
+                book.reindex(key)
+                continue
+            self.close_position(price, time, reason=reason, position=pos)
+            self.logger.info(f"Position closed due to {reason} at {price} Time: {to_timestamp(time, self.tz)}")
+            closed = True
+        return closed
+
+    def update_position(self, price: float, time: int) -> bool:
         """
         Update the position based on the work mode.
         V1: Standard mode
         V2: Advanced mode
         Args:
             price (float): current price of the market
-            time (datetime): current time of the market
+            time (int): current time of the market (epoch nanoseconds)
 
         Returns:
             bool: True if the position is updated, False otherwise
         """
+        if self.book is not None:
+            return self.update_book(price, time)
+
         pos = self.active_position
-        if not pos or pos["status"] != "open":
+        if not pos or pos.status != "open":
             return False
         
         if self.work_mode == 'V1':
@@ -172,29 +255,82 @@ class PositionManager:
             return self.update_position_v2(price, time)
         return False
 
-    def calculate_profit_pips(self, pos: Dict[str, Any], current_price: float) -> float:
-        """ Calculate the profit in pips.
+    def update_position_range(self, prices: np.ndarray, times: np.ndarray, start: int, stop: int) -> int:
+        """
+        Update the position with the ticks prices[start:stop] in a single call.
+        In V2 mode the exit is resolved by the compiled kernel and the position jumps straight
+        to the exit tick; other modes step through update_position tick by tick.
+
+        Args:
+            prices (np.ndarray): tick prices
+            times (np.ndarray): tick times (epoch nanoseconds), aligned with prices
+            start (int): first tick index (inclusive)
+            stop (int): last tick index (exclusive)
+
+        Returns:
+            int: index of the tick that closed the position, -1 if it is still open. With a position book
+            the whole range is processed (jumping between the ticks that cross a trigger level) and -1 is returned.
+        """
+        if self.book is not None:
+            i = start
+            while len(self.book) and i < stop:
+                i = self.book.next_trigger(prices, i, stop)
+                if i < 0:
+                    break
+                self.update_book(float(prices[i]), int(times[i]))
+                i += 1
+            return -1
+
+        pos = self.active_position
+        if not pos or pos.status != "open":
+            return -1
+
+        if self.work_mode != 'V2' or self.break_even_manager is None:
+            for i in range(start, stop):
+                if self.update_position(float(prices[i]), int(times[i])):
+                    return i
+            return -1
+
+        multi_level, activate_pips, profit_pips, level_activate, level_profit, level_idx, pip_size = (
+            self.break_even_manager.kernel_params()
+        )
+        exit_idx, exit_price, reason, sl, tp, level_idx = resolve_exit_numba(
+            prices, start, stop, pos.direction, pos.entry, pos.sl, pos.tp,
+            multi_level, activate_pips, profit_pips, level_activate, level_profit, level_idx, pip_size
+        )
+        pos.sl = sl
+        pos.tp = tp
+        self.break_even_manager.active_level_idx = level_idx
+
+        if reason == EXIT_NONE:
+            return -1
+
+        self.close_position(exit_price, times[exit_idx], reason=EXIT_REASON_NAMES[reason])
+        return exit_idx
+
+    def calculate_profit_pips(self, pos: Position, current_price: float) -> float:
+        """ Calculate the profit in pips of the instrument.
         In XAUUSD 1 pip = 0.1 of price.
 
         Args:
-            pos (Dict[str, Any]): position data
+            pos (Position): position data
             current_price (float): current price of the market
 
         Returns:
             float: profit in pips
         """
-        if pos["type"].value == "BUY":
-            diff = current_price - pos["entry"]
+        if pos.direction == BUY:
+            diff = current_price - pos.entry
         else:
-            diff = pos["entry"] - current_price
-        return diff / 0.1  # 1 pip = 0.1 movement
+            diff = pos.entry - current_price
+        return diff / self.instrument.pip_size
 
-    def check_sl_hit(self, price: float, time: datetime, sl: float) -> bool:
+    def check_sl_hit(self, price: float, time: int, sl: float) -> bool:
         """ Check if the SL is hit.
 
         Args:
             price (float): current price of the market
-            time (datetime): current time of the market
+            time (int): current time of the market (epoch nanoseconds)
             sl (float): stop loss price
 
         Returns:
@@ -204,21 +340,21 @@ class PositionManager:
             return False
         
         pos = self.active_position
-        if pos["type"] == TypeSignal.BUY and price <= sl:
+        if pos.direction == BUY and price <= sl:
             self.close_position(price, time, reason="SL")
             return True
         
-        if pos["type"] == TypeSignal.SELL and price >= sl:
+        if pos.direction == SELL and price >= sl:
             self.close_position(price, time, reason="SL")
             return True
         return False
 
-    def check_tp_hit(self, price: float, time: datetime, tp: float) -> bool:
+    def check_tp_hit(self, price: float, time: int, tp: float) -> bool:
         """ Check if the TP is hit.
 
         Args:
             price (float): current price of the market
-            time (datetime): current time of the market
+            time (int): current time of the market (epoch nanoseconds)
             tp (float): take profit price
 
         Returns:
@@ -228,21 +364,21 @@ class PositionManager:
             return False
         pos = self.active_position
         
-        if pos["type"] == TypeSignal.BUY and price >= tp:
+        if pos.direction == BUY and price >= tp:
             self.close_position(price, time, reason="TP")
             return True
         
-        if pos["type"] == TypeSignal.SELL and price <= tp:
+        if pos.direction == SELL and price <= tp:
             self.close_position(price, time, reason="TP")
             return True
         return False
 
-    def check_break_even(self, price: float, time: datetime) -> bool:
+    def check_break_even(self, price: float, time: int) -> bool:
         """ Check if the break even is hit.
 
         Args:
             price (float): current price of the market
-            time (datetime): current time of the market
+            time (int): current time of the market (epoch nanoseconds)
 
         Returns:
             bool: True if the break even is hit, False otherwise
@@ -252,22 +388,23 @@ class PositionManager:
             return False
         
         pos = self.active_position
-        trigger_price = pos["entry"] + BREAK_EVEN_TRIGGER
-        if pos["type"] == TypeSignal.SELL:
-            trigger_price = pos["entry"] - BREAK_EVEN_TRIGGER
+        trigger_price = pos.entry + self.params.break_even_trigger
+        if pos.direction == SELL:
+            trigger_price = pos.entry - self.params.break_even_trigger
 
         if (
-            (pos["type"] == TypeSignal.BUY and price >= trigger_price) or
-            (pos["type"] == TypeSignal.SELL and price <= trigger_price)
+            (pos.direction == BUY and price >= trigger_price) or
+            (pos.direction == SELL and price <= trigger_price)
         ):
-            pos["sl_break_even"] = pos["entry"]
-            pos["tp_break_even"] = pos["tp"] + BREAK_EVEN_TRIGGER
-            if pos["type"] == TypeSignal.SELL:
-                pos["tp_break_even"] = pos["tp"] - BREAK_EVEN_TRIGGER
+            pos.sl_break_even = pos.entry
+            pos.tp_break_even = pos.tp + self.params.break_even_trigger
+            if pos.direction == SELL:
+                pos.tp_break_even = pos.tp - self.params.break_even_trigger
 
-            pos["breakeven_applied"] = True
+            pos.breakeven_applied = True
             self.logger.info(
-                f"Break-even applied. New SL: {pos['sl_break_even']} New TP: {pos['tp_break_even']} Time: {time}"
+                f"Break-even applied. New SL: {pos.sl_break_even} New TP: {pos.tp_break_even} "
+                f"Time: {to_timestamp(time, self.tz)}"
             )
             return True
         return False
@@ -284,89 +421,143 @@ class PositionManager:
         if not self.active_position:
             return False
         pos = self.active_position
-        base_sl = pos["sl_trail"] or pos["sl_break_even"] or pos["sl"]
-        trail_trigger = base_sl + TRAILING_DISTANCE if pos["type"] == TypeSignal.BUY else base_sl - TRAILING_DISTANCE
+        base_sl = pos.sl_trail or pos.sl_break_even or pos.sl
+        trailing_distance = self.params.trailing_distance
+        trail_trigger = base_sl + trailing_distance if pos.direction == BUY else base_sl - trailing_distance
         if (
-            (pos["type"] == TypeSignal.BUY and price >= trail_trigger) or
-            (pos["type"] == TypeSignal.SELL and price <= trail_trigger and price < pos["entry"])
+            (pos.direction == BUY and price >= trail_trigger) or
+            (pos.direction == SELL and price <= trail_trigger and price < pos.entry)
         ):
-            pos["sl_trail"] = pos["entry"]
-            pos["tp_trail"] = pos["tp"] + TRAILING_DISTANCE
-            if pos["type"] == TypeSignal.SELL:
-                pos["tp_trail"] = pos["tp"] - TRAILING_DISTANCE
-            pos["trail_active"] = True
-            self.logger.info(f"Trailing stop updated. New SL: {pos['sl_trail']} New TP: {pos['tp_trail']}")
+            pos.sl_trail = pos.entry
+            pos.tp_trail = pos.tp + trailing_distance
+            if pos.direction == SELL:
+                pos.tp_trail = pos.tp - trailing_distance
+            pos.trail_active = True
+            self.logger.info(f"Trailing stop updated. New SL: {pos.sl_trail} New TP: {pos.tp_trail}")
             return True
         return False
 
-    def close_position(self, price: float, time: datetime, reason: str) -> None:
+    def close_position(self, price: float, time: int, reason: str, position: Optional[Position] = None) -> None:
         """ Close the current position.
 
         Args:
             price (float): current price of the market
-            time (datetime): current time of the market
+            time (int): current time of the market (epoch nanoseconds)
             reason (str): reason for closing the position
+            position (Optional[Position]): position of the book to close (defaults to active_position)
         """
-        if not self.active_position:
+        pos = position or self.active_position
+        if not pos:
             return
         
-        pos = self.active_position
-        pos["status"] = "closed"
-        pos["exit_price"] = price
-        pos["exit_time"] = time
-        pos["exit_reason"] = reason
-        if pos["type"] == TypeSignal.BUY:
-            profit = (price - pos["entry"]) * 100 * pos["lot_size"]
+        pos.status = "closed"
+        pos.exit_price = price
+        pos.exit_time = time
+        pos.exit_reason = reason
+        contract_size = self.instrument.contract_size
+        if pos.direction == BUY:
+            profit = (price - pos.entry) * contract_size * pos.lot_size
         else:
-            profit = (pos["entry"] - price) * 100 * pos["lot_size"]
+            profit = (pos.entry - price) * contract_size * pos.lot_size
         
-        self.balance += (pos["quantity"] + profit)
-        pos["profit"] = profit
-        pos["balance"] = self.balance
+        self.balance += (pos.quantity + profit)
+        pos.profit = profit
+        pos.balance = self.balance
         self.closed_positions.append(pos)
         self.logger.info(
             "Position Closed({}) due to {} Close: {} Open: {} Time: {} Profit: {}".format(
-                pos["type"].value,
+                pos.type.value,
                 reason,
                 price,
-                pos["entry"],
-                time,
+                pos.entry,
+                to_timestamp(time, self.tz),
                 profit
             )
         )
-        self.active_position = None
+        if self.book is not None:
+            self.book.remove(pos)
+        else:
+            self.active_position = None
+
+    def equity(self, price: float) -> float:
+        """Balance plus the open positions (their quantity and open profit) valued at price."""
+        contract_size = self.instrument.contract_size
+        if self.book is not None:
+            equity = self.balance
+            for pos in self.book:
+                equity += pos.quantity + (price - pos.entry) * contract_size * pos.lot_size * pos.direction
+            return equity
 
-    def force_close_position(self, price: float, time: datetime, reason: str) -> None:
-        if self.active_position and self.active_position["status"] == "open":
-            self.close_position(price, time, reason)
+        pos = self.active_position
+        if pos is None:
+            return self.balance
+        return self.balance + pos.quantity + (price - pos.entry) * contract_size * pos.lot_size * pos.direction
+
+    def get_state(self) -> Dict[str, Any]:
+        """Balances, the active position with its break-even manager and the closed-trade ledger."""
+        if self.trailing_stop_manager is not None or self.secure_level_manager is not None:
+            raise ValueError("Checkpoints do not support the trailing stop or secure level managers")
+        return {
+            "balance": self.balance,
+            "balance_initial": self.balance_initial,
+            "lot_size": self.lot_size,
+            "work_mode": self.work_mode,
+            "active_position": self.active_position.to_state() if self.active_position is not None else None,
+            "break_even_manager": (
+                self.break_even_manager.get_state() if self.break_even_manager is not None else None
+            ),
+            "book": [
+                {
+                    "position": position.to_state(),
+                    "break_even_manager": self.book.manager(position).get_state(),
+                }
+                for position in self.book
+            ] if self.book is not None else None,
+            "closed_positions": self.closed_positions.get_state(),
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.balance = state["balance"]
+        self.balance_initial = state["balance_initial"]
+        self.lot_size = state["lot_size"]
+        self.work_mode = state["work_mode"]
+        position = state["active_position"]
+        self.active_position = Position.from_state(position) if position is not None else None
+        self.break_even_manager = None
+        if state["break_even_manager"] is not None:
+            self.break_even_manager = BreakEvenManager(pip_size=self.instrument.pip_size)
+            self.break_even_manager.set_state(state["break_even_manager"])
+        if (state["book"] is not None) != (self.book is not None):
+            raise ValueError("Checkpoint max_positions mode does not match the params")
+        if self.book is not None:
+            self.book = PositionBook()
+            for entry in state["book"]:
+                manager = BreakEvenManager(pip_size=self.instrument.pip_size)
+                manager.set_state(entry["break_even_manager"])
+                self.book.add(Position.from_state(entry["position"]), manager)
+        self.closed_positions.set_state(state["closed_positions"])
+
+    def force_close_position(self, price: float, time: int, reason: str, position: Optional[Position] = None) -> None:
+        pos = position or self.active_position
+        if pos and pos.status == "open":
+            self.close_position(price, time, reason, position=pos)
 
     def analyze_closed_positions(self) -> Dict[str, Any]:
         if not self.closed_positions:
             return {}
 
-        total_trades = len(self.closed_positions)
-        wins = 0
-        losses = 0
-        total_profit = 0.0
-        total_loss = 0.0
-        profits = []
-        losses_list = []
-
-        for pos in self.closed_positions:
-            profit = pos["profit"]
-
-            if profit >= 0:
-                wins += 1
-                profits.append(profit)
-                total_profit += profit
-            else:
-                losses += 1
-                losses_list.append(profit)
-                total_loss += profit
-
-        winrate = (wins / total_trades) * 100 if total_trades > 0 else 0
-        avg_win = np.mean(profits) if profits else 0.0
-        avg_loss = np.mean(losses_list) if losses_list else 0.0
+        profits = self.closed_positions.column("profit")
+        total_trades = len(profits)
+        is_win = profits >= 0
+        wins = int(np.count_nonzero(is_win))
+        losses = total_trades - wins
+        total_profit = profits[is_win].sum()
+        total_loss = profits[~is_win].sum()
+        drawdowns, drawdowns_pct = self.closed_positions.drawdowns()
+
+        winrate = (wins / total_trades) * 100
+        avg_win = total_profit / wins if wins else 0.0
+        avg_loss = total_loss / losses if losses else 0.0
         profit_factor = abs(total_profit / total_loss) if total_loss != 0 else np.inf
         expectancy = (winrate / 100) * avg_win + ((1 - winrate / 100) * avg_loss)
 
@@ -388,30 +579,9 @@ class PositionManager:
             "balance_final": self.balance,
             "balance_final_percent": balance_final_percent,
             "balance_final_absolute": balance_final_absolute,
+            "max_drawdown": drawdowns.max(),
+            "max_drawdown_percent": drawdowns_pct.max(),
         }
 
     def export_closed_positions_to_dataframe(self) -> pd.DataFrame:
-        if not self.closed_positions:
-            return pd.DataFrame()
-
-        data = {
-            "entry_time": [pos["open_time"] for pos in self.closed_positions],
-            "exit_time": [pos["exit_time"] for pos in self.closed_positions],
-            "type": [pos["type"].value for pos in self.closed_positions],
-            "entry_price": [pos["entry"] for pos in self.closed_positions],
-            "entry_sl": [pos["entry_sl"] for pos in self.closed_positions],
-            "entry_tp": [pos["entry_tp"] for pos in self.closed_positions],
-            "exit_price": [pos["exit_price"] for pos in self.closed_positions],
-            "exit_reason": [pos["exit_reason"] for pos in self.closed_positions],
-            "lot_size": [pos["lot_size"] for pos in self.closed_positions],
-            "breakeven_applied": [pos["breakeven_applied"] for pos in self.closed_positions],
-            "trail_active": [pos["trail_active"] for pos in self.closed_positions],
-            "sl_break_even": [pos["sl_break_even"] for pos in self.closed_positions],
-            "tp_break_even": [pos["tp_break_even"] for pos in self.closed_positions],
-            "sl_trail": [pos["sl_trail"] for pos in self.closed_positions],
-            "tp_trail": [pos["tp_trail"] for pos in self.closed_positions],
-            "max_price": [pos["max_price"] for pos in self.closed_positions],
-            "min_price": [pos["min_price"] for pos in self.closed_positions],
-            "entry_context": [pos["entry_context"].value for pos in self.closed_positions],
-        }
-        return pd.DataFrame(data)
+        return self.closed_positions.to_dataframe(self.tz)
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.tick_store import TickStore
+
+
+@dataclass(frozen=True)
+class SharedTicksHandle:
+    """
+    Picklable description of tick arrays published by one process and attached by others.
+    kind "shm": arrays live in two multiprocessing.shared_memory blocks.
+    kind "mmap": arrays are a [start:stop] range of an on-disk TickStore, shared through the page cache.
+    """
+    kind: str
+    length: int
+    tz: Optional[str] = None
+    times_name: str = ""
+    prices_name: str = ""
+    store_path: str = ""
+    start: int = 0
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        # Python < 3.13 always registers the block with the resource tracker. Pool workers share the
+        # publisher's tracker, so the registration is a no-op and only the publisher unlinks the block.
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedTicks:
+    """
+    One copy of the tick arrays for many processes. The publisher copies the arrays once into shared
+    memory (or points at an on-disk TickStore); workers attach zero-copy through the handle.
+    """
+
+    def __init__(
+        self,
+        handle: SharedTicksHandle,
+        times: np.ndarray,
+        prices: np.ndarray,
+        blocks: Tuple[shared_memory.SharedMemory, ...] = (),
+        owner: bool = False
+    ):
+        self.handle = handle
+        self.times = times
+        self.prices = prices
+        self._blocks = blocks
+        self._owner = owner
+
+    @classmethod
+    def publish(cls, times: np.ndarray, prices: np.ndarray, tz=None) -> "SharedTicks":
+        """Copies the arrays once into shared memory blocks owned by the calling process."""
+        length = len(times)
+        times_block = shared_memory.SharedMemory(create=True, size=max(length, 1) * 8)
+        prices_block = shared_memory.SharedMemory(create=True, size=max(length, 1) * 8)
+        shared_times = np.ndarray((length,), dtype=np.int64, buffer=times_block.buf)
+        shared_prices = np.ndarray((length,), dtype=np.float64, buffer=prices_block.buf)
+        shared_times[:] = times
+        shared_prices[:] = prices
+        handle = SharedTicksHandle(
+            kind="shm",
+            length=length,
+            tz=str(tz) if tz is not None else None,
+            times_name=times_block.name,
+            prices_name=prices_block.name,
+        )
+        return cls(handle, shared_times, shared_prices, (times_block, prices_block), owner=True)
+
+    @classmethod
+    def from_store(cls, store: TickStore, start: int = 0, stop: Optional[int] = None) -> "SharedTicks":
+        """Shares a range of an on-disk TickStore; nothing is copied, workers memory-map the same files."""
+        times, prices = store.slice(start, stop)
+        handle = SharedTicksHandle(
+            kind="mmap",
+            length=len(times),
+            tz=store.tz,
+            store_path=store.path,
+            start=start,
+        )
+        return cls(handle, times, prices)
+
+    @classmethod
+    def attach(cls, handle: SharedTicksHandle) -> "SharedTicks":
+        if handle.kind == "mmap":
+            store = TickStore(handle.store_path).load()
+            times, prices = store.slice(handle.start, handle.start + handle.length)
+            return cls(handle, times, prices)
+
+        if handle.kind != "shm":
+            raise ValueError(f"Unknown shared ticks kind: {handle.kind}")
+
+        times_block = _attach_shared_memory(handle.times_name)
+        prices_block = _attach_shared_memory(handle.prices_name)
+        times = np.ndarray((handle.length,), dtype=np.int64, buffer=times_block.buf)
+        prices = np.ndarray((handle.length,), dtype=np.float64, buffer=prices_block.buf)
+        return cls(handle, times, prices, (times_block, prices_block))
+
+    def close(self) -> None:
+        """Detaches from the shared blocks; the publisher also frees them."""
+        self.times = np.empty(0, dtype=np.int64)
+        self.prices = np.empty(0, dtype=np.float64)
+        for block in self._blocks:
+            block.close()
+            if self._owner:
+                block.unlink()
+        self._blocks = ()
+
+    def __enter__(self) -> "SharedTicks":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,42 +1,176 @@
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from core.shared_ticks import SharedTicks, SharedTicksHandle
+from core.tick_store import TickStore, get_store_path
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
 
 class SimulationLoader:
-    def __init__(self, ticks_path: str, historical_path: Optional[str] = None):
+    def __init__(
+        self,
+        ticks_path: str,
+        historical_path: Optional[str] = None,
+        use_store: bool = True,
+        bars: bool = False
+    ):
         """
-        ticks_path: Path to the csv file with format time, tick
+        ticks_path: Path to the csv file with format time, tick (or to a tick store directory)
         historical_path: (optional) Path to the csv file with historical candles (for indicators or starting point)
+        use_store: Prefer the columnar tick store next to ticks_path when it exists
+        bars: ticks_path holds OHLC bars (time, open, high, low, close) to simulate directly; read them with get_bars
         """
         self.ticks_path = ticks_path
         self.historical_path = historical_path
+        self.use_store = use_store
+        self.bars = bars
+        self.bars_df = None
         self.ticks_df = None
         self.historical_df = None
+        self.tick_store: Optional[TickStore] = None
+        self.tick_start: int = 0
+        self.shared_ticks: Optional[SharedTicks] = None
+        # Streaming mode: the csv is only read in chunks by iter_tick_chunks
+        self.stream = False
+        self.start_date: Optional[pd.Timestamp] = None
+        self.tz = None
+
+    @classmethod
+    def from_arrays(cls, times: np.ndarray, prices: np.ndarray, tz=None) -> "SimulationLoader":
+        """Loader over tick arrays already in memory (int64 epoch-ns times, float64 prices)."""
+        loader = cls(ticks_path="")
+        loader.tick_store = TickStore.from_arrays(times, prices, tz)
+        return loader
+
+    @classmethod
+    def attach(cls, handle: SharedTicksHandle) -> "SimulationLoader":
+        """Loader over tick arrays published by another process with share(); attaches zero-copy."""
+        shared_ticks = SharedTicks.attach(handle)
+        loader = cls.from_arrays(shared_ticks.times, shared_ticks.prices, handle.tz)
+        loader.shared_ticks = shared_ticks
+        return loader
+
+    def share(self) -> SharedTicks:
+        """
+        Publishes the (filtered) tick arrays for other processes. A loader backed by an on-disk tick store
+        is shared through the memory-mapped files; otherwise the arrays are copied once to shared memory.
+        Pass `.handle` to the workers and call `.close()` on the returned object when they are done.
+        """
+        if self.tick_store is not None and self.tick_store.path:
+            return SharedTicks.from_store(self.tick_store, self.tick_start)
+
+        times, prices = self.get_ticks()
+        return SharedTicks.publish(times, prices, self.get_tz())
+
+    def load_data(self, stream: bool = False):
+        """
+        Loads the data from the tick store (if present) or the csv files.
+        stream: Do not read the tick csv now; iter_tick_chunks reads it chunk by chunk (a tick store is
+        memory-mapped either way)
+        """
+        store_path = get_store_path(self.ticks_path)
+        if self.bars:
+            self.bars_df = pd.read_csv(self.ticks_path, parse_dates=["time"])
+        elif self.use_store and TickStore.exists(store_path):
+            self.tick_store = TickStore(store_path).load()
+            self.tick_start = 0
+        elif stream:
+            self.stream = True
+            self.tz = pd.DatetimeIndex(pd.read_csv(self.ticks_path, parse_dates=["time"], nrows=1)["time"]).tz
+        else:
+            self.ticks_df = pd.read_csv(self.ticks_path, parse_dates=["time"])
 
-    def load_data(self):
-        """Loads the data from the csv files."""
-        self.ticks_df = pd.read_csv(self.ticks_path, parse_dates=["time"])
         if self.historical_path:
             self.historical_df = pd.read_csv(self.historical_path, parse_dates=["time"])
 
     def filter_by_start_date(self, start_date: pd.Timestamp):
         """Filters the DataFrames to start the simulation from a specific date."""
-        if self.ticks_df is not None:
+        if self.bars_df is not None:
+            self.bars_df = self.bars_df[self.bars_df["time"] >= start_date].reset_index(drop=True)
+        elif self.tick_store is not None:
+            self.tick_start = self.tick_store.index_of(start_date)
+        elif self.stream:
+            self.start_date = start_date
+        elif self.ticks_df is not None:
             self.ticks_df = self.ticks_df[self.ticks_df["time"] >= start_date].reset_index(drop=True)
-        
+
         if self.historical_df is not None:
             self.historical_df = self.historical_df[self.historical_df["time"] <= start_date].reset_index(drop=True)
 
     def get_ticks(self):
-        """Returns ticks as arrays ready to simulate."""
-        
+        """
+        Returns ticks as arrays ready to simulate: (int64 epoch-ns times, float64 prices), zero-copy when backed
+        by the tick store. Times are converted back to datetimes only on export (see get_tz).
+        """
+        if self.tick_store is not None:
+            return self.tick_store.slice(self.tick_start)
+
+        if self.bars:
+            raise ValueError("The loader holds OHLC bars, read them with get_bars()")
+        if self.stream:
+            raise ValueError("Ticks are streamed, read them with iter_tick_chunks()")
         if self.ticks_df is None:
             raise ValueError("Ticks DataFrame is not loaded")
-        times = self.ticks_df["time"].to_list()
-        prices = self.ticks_df["tick"].values
+        times = pd.DatetimeIndex(self.ticks_df["time"]).as_unit("ns").asi8
+        prices = self.ticks_df["tick"].to_numpy(dtype=np.float64)
         return times, prices
 
+    def iter_tick_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yields the (filtered) ticks in order as (int64 epoch-ns times, float64 prices) chunks of up to chunk_size
+        rows: zero-copy slices of the tick store or of the loaded arrays, or csv chunks parsed one at a time in
+        streaming mode, so only one chunk is in memory.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        if not self.stream:
+            times, prices = self.get_ticks()
+            for start in range(0, len(times), chunk_size):
+                yield times[start:start + chunk_size], prices[start:start + chunk_size]
+            return
+
+        start_ns = None
+        if self.start_date is not None:
+            start_ts = pd.Timestamp(self.start_date)
+            if self.tz is not None and start_ts.tzinfo is None:
+                start_ts = start_ts.tz_localize(self.tz)
+            start_ns = start_ts.as_unit("ns").value
+
+        for chunk in pd.read_csv(self.ticks_path, parse_dates=["time"], chunksize=chunk_size):
+            times = pd.DatetimeIndex(chunk["time"]).as_unit("ns").asi8
+            prices = chunk["tick"].to_numpy(dtype=np.float64)
+            if start_ns is not None:
+                first = int(np.searchsorted(times, start_ns))
+                times, prices = times[first:], prices[first:]
+            if len(times):
+                yield times, prices
+
+    def get_bars(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the (filtered) OHLC bars as arrays: (int64 epoch-ns times, opens, highs, lows, closes)."""
+        if self.bars_df is None:
+            raise ValueError("Bars DataFrame is not loaded (use bars=True)")
+        times = pd.DatetimeIndex(self.bars_df["time"]).as_unit("ns").asi8
+        opens, highs, lows, closes = (
+            self.bars_df[column].to_numpy(dtype=np.float64) for column in ("open", "high", "low", "close")
+        )
+        return times, opens, highs, lows, closes
+
+    def get_tz(self):
+        """Timezone of the tick times (None when naive)."""
+        if self.bars_df is not None:
+            return pd.DatetimeIndex(self.bars_df["time"]).tz
+        if self.tick_store is not None:
+            return self.tick_store.tz
+        if self.stream:
+            return self.tz
+        if self.ticks_df is None:
+            raise ValueError("Ticks DataFrame is not loaded")
+        return pd.DatetimeIndex(self.ticks_df["time"]).tz
+
     def get_historical(self):
         """Returns the historical DataFrame (optional, if loaded)."""
         return self.historical_df
@@ -1,56 +1,200 @@
 import time
-from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 
+import numpy as np
+
+from core.batch_simulator import BatchSimulator
+from core.market_components.bar_path import DEFAULT_BRIDGE_POINTS
 from core.market_simulator import MarketSimulator
 from core.simulation_loader import SimulationLoader
+from enums.bar_path_model import BarPathModel
 from enums.indicator import Indicator
+from models.strategy_params import StrategyParams
+from utils.ensure_datetime import to_timestamp
 from utils.logger import get_logger
 
+PROGRESS_BLOCK = 5000
+
 
 class SimulationRunner:
-    bot: Optional[MarketSimulator] = None
+    bot: Optional[Union[MarketSimulator, BatchSimulator]] = None
     
-    def __init__(self, loader: SimulationLoader, timeframe: int = 15, indicators: Optional[List[Indicator]] = None):
+    def __init__(
+        self,
+        loader: SimulationLoader,
+        timeframe: int = 15,
+        indicators: Optional[List[Indicator]] = None,
+        vectorized: bool = False,
+        params: Optional[StrategyParams] = None,
+        chunk_size: Optional[int] = None,
+        resume_from: Optional[str] = None,
+        bar_path_model: BarPathModel = BarPathModel.OHLC,
+        bar_path_points: int = DEFAULT_BRIDGE_POINTS,
+        bar_path_seed: int = 0
+    ):
         """
         loader: Instance of SimulationLoader already loaded
         timeframe: Timeframe in minutes for the simulation (e.g., 15m)
+        vectorized: Use the BatchSimulator (whole-array engine) instead of the tick-by-tick MarketSimulator
+        params: Strategy parameters (defaults to the values in config.py)
+        chunk_size: Feed the MarketSimulator from loader.iter_tick_chunks, chunk_size ticks at a time, instead of
+            the whole arrays; candle, indicator and position state carry over between chunks
+        resume_from: Checkpoint written by run(checkpoint_path=...); the MarketSimulator is restored from it and
+            only the loader ticks after its last processed tick are simulated
+        bar_path_model: Intra-bar price path used when the loader holds OHLC bars (loader.bars); bar data always
+            runs on the BatchSimulator (see BatchSimulator.run_bars), bar_path_points / bar_path_seed apply to
+            BarPathModel.BROWNIAN_BRIDGE
         """
         
         self.logger = get_logger(__name__)
         self.loader: SimulationLoader = loader
-        self.bot: Optional[MarketSimulator] = None
+        self.bot: Optional[Union[MarketSimulator, BatchSimulator]] = None
         self.timeframe = timeframe
+        self.vectorized = vectorized
+        self.params: Optional[StrategyParams] = params
         self.indicators: Optional[List[Indicator]] = indicators
-        self.times: list[datetime] = []
-        self.prices: list[float] = []
+        self.chunk_size = chunk_size
+        self.resume_from = resume_from
+        self.bar_path_model = bar_path_model
+        self.bar_path_points = bar_path_points
+        self.bar_path_seed = bar_path_seed
+        self.times: np.ndarray = np.empty(0, dtype=np.int64)
+        self.prices: np.ndarray = np.empty(0, dtype=np.float64)
+        # Time of the last tick of the restored checkpoint and how many ticks at that time are still to skip.
+        self.resume_time: Optional[int] = None
+        self.resume_skip = 0
 
         self._load_data()
 
     def _load_data(self):
-        # Initialize times and prices from the loader
-        self.times, self.prices = self.loader.get_ticks()
-        self.bot = MarketSimulator(timeframe=self.timeframe, indicators=self.indicators)
+        if self.loader.bars:
+            if self.chunk_size is not None or self.resume_from is not None:
+                raise ValueError("Bar data runs on the vectorized engine; chunk_size and resume_from are not supported")
+            self.bot = BatchSimulator(timeframe=self.timeframe, indicators=self.indicators, params=self.params)
+            return
+        if self.vectorized and self.chunk_size is not None:
+            raise ValueError("The vectorized engine needs the whole tick arrays; chunk_size requires vectorized=False")
+        if self.vectorized and self.resume_from is not None:
+            raise ValueError(
+                "Checkpoints are only supported by the tick-by-tick engine; resume_from requires vectorized=False"
+            )
+
+        # Initialize times and prices from the loader (chunked runs read them in run)
+        if self.chunk_size is None:
+            self.times, self.prices = self.loader.get_ticks()
+        if self.vectorized:
+            self.bot = BatchSimulator(timeframe=self.timeframe, indicators=self.indicators, params=self.params)
+        else:
+            self.bot = MarketSimulator(
+                timeframe=self.timeframe,
+                indicators=self.indicators,
+                params=self.params,
+                tz=self.loader.get_tz()
+            )
+            if self.resume_from is not None:
+                self.bot.load_checkpoint(self.resume_from)
+                self.resume_time = self.bot.candle_time
+                self.resume_skip = self.bot.candle_time_ticks
+                self.times, self.prices = self._skip_processed(self.times, self.prices)
+
+    def _skip_processed(self, times: np.ndarray, prices: np.ndarray):
+        """
+        Drops the ticks already simulated before the restored checkpoint: those before its candle_time and
+        the first candle_time_ticks stamped at it (later ticks sharing that time were appended after the
+        checkpoint and are kept). Chunks are passed in order; skipping stops at the first kept tick.
+        """
+        if self.resume_time is None:
+            return times, prices
+        start = int(np.searchsorted(times, self.resume_time, side="left"))
+        same_time = int(np.searchsorted(times, self.resume_time, side="right")) - start
+        skip = min(same_time, self.resume_skip)
+        self.resume_skip -= skip
+        start += skip
+        if start < len(times):
+            self.resume_time = None
+        return times[start:], prices[start:]
+
+    def run(self, progress: bool = False, checkpoint_path: Optional[str] = None):
+        """
+        checkpoint_path: Save the MarketSimulator state there after the last tick, before the open candle
+            is finalized, so a later run with resume_from continues exactly where this one stopped
+        """
+        if self.chunk_size is not None:
+            self._run_chunks(progress, checkpoint_path)
+            return
+        if self.loader.bars:
+            if checkpoint_path is not None:
+                raise ValueError("Checkpoints are only supported by the tick-by-tick engine")
+            self._run_bars()
+            return
 
-    def run(self, progress: bool = False):
         total_ticks = len(self.times)
         self.logger.info(f"Running simulation with {total_ticks} ticks...")
-        self.logger.info(f"Start time: {self.times[0]}")
-        self.logger.info(f"End time: {self.times[-1]}")
+        if total_ticks:
+            self.logger.info(f"Start time: {to_timestamp(self.times[0], self.loader.get_tz())}")
+            self.logger.info(f"End time: {to_timestamp(self.times[-1], self.loader.get_tz())}")
         if self.bot is None:
             self.logger.error("Bot is not initialized")
             return
 
         time_start = time.time()
-        for i in range(total_ticks):
-            self.bot.process_tick(self.prices[i], self.times[i])
-            if progress and i % 5000 == 0:
+        if isinstance(self.bot, BatchSimulator):
+            self.bot.run(self.times, self.prices, tz=self.loader.get_tz())
+            self.logger.info(f"Simulation finished in {time.time() - time_start} seconds.")
+            return
+
+        for i in range(0, total_ticks, PROGRESS_BLOCK):
+            self.bot.process_ticks(self.times, self.prices, i, min(i + PROGRESS_BLOCK, total_ticks))
+            if progress:
                 self.logger.info(f"Processed {i}/{total_ticks} ticks...")
         
+        if checkpoint_path is not None:
+            self.bot.save_checkpoint(checkpoint_path)
         self.bot.finalize_current_candle()
         time_end = time.time()
         self.logger.info(f"Simulation finished in {time_end - time_start} seconds.")
 
+    def _run_bars(self):
+        if self.bot is None:
+            self.logger.error("Bot is not initialized")
+            return
+
+        times, opens, highs, lows, closes = self.loader.get_bars()
+        self.logger.info(f"Running bar simulation with {len(times)} bars ({self.bar_path_model.value} path)...")
+        time_start = time.time()
+        self.bot.run_bars(
+            times, opens, highs, lows, closes,
+            tz=self.loader.get_tz(),
+            path_model=self.bar_path_model,
+            path_points=self.bar_path_points,
+            seed=self.bar_path_seed
+        )
+        self.logger.info(f"Simulation finished in {time.time() - time_start} seconds.")
+
+    def _run_chunks(self, progress: bool = False, checkpoint_path: Optional[str] = None):
+        if not isinstance(self.bot, MarketSimulator):
+            self.logger.error("Bot is not initialized")
+            return
+
+        self.logger.info(f"Running chunked simulation ({self.chunk_size} ticks per chunk)...")
+        time_start = time.time()
+        processed = 0
+        for times, prices in self.loader.iter_tick_chunks(self.chunk_size):
+            times, prices = self._skip_processed(times, prices)
+            if len(times) == 0:
+                continue
+            if processed == 0:
+                self.logger.info(f"Start time: {to_timestamp(times[0], self.loader.get_tz())}")
+            self.bot.process_ticks(times, prices)
+            processed += len(times)
+            if progress:
+                self.logger.info(f"Processed {processed} ticks...")
+
+        if checkpoint_path is not None:
+            self.bot.save_checkpoint(checkpoint_path)
+        self.bot.finalize_current_candle()
+        self.logger.info(f"Simulation of {processed} ticks finished in {time.time() - time_start} seconds.")
+
     def export_to_dataframe(self):
         if self.bot is None:
             raise ValueError("Bot is not initialized")
@@ -0,0 +1,234 @@
+import json
+import os
+import sys
+from typing import Any, Dict, Literal, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+
+STORE_SUFFIX = ".ticks"
+TIME_FILE = "time.npy"
+PRICE_FILE = "price.npy"
+META_FILE = "meta.json"
+
+logger = get_logger(__name__)
+
+_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+_HEADER_WRITERS = {
+    (1, 0): np.lib.format.write_array_header_1_0,
+    (2, 0): np.lib.format.write_array_header_2_0,
+}
+
+
+def append_to_npy(file_path: str, values: np.ndarray) -> None:
+    """
+    Appends values to a 1-D .npy file in place: the header is rewritten with the new length (NumPy pads it
+    so the length can grow) and only the new values are written at the end of the file.
+    """
+    with open(file_path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        if version not in _HEADER_READERS:
+            raise ValueError(f"Unsupported .npy format version {version} in {file_path}")
+        shape, fortran_order, dtype = _HEADER_READERS[version](f)
+        data_offset = f.tell()
+        if len(shape) != 1 or dtype != values.dtype:
+            raise ValueError(f"Cannot append {values.dtype} values to {file_path} ({dtype}, shape {shape})")
+
+        rows = shape[0] + len(values)
+        header = {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": fortran_order,
+            "shape": (rows,),
+        }
+        f.seek(0)
+        _HEADER_WRITERS[version](f, header)
+        if f.tell() != data_offset:
+            raise ValueError(f"The header of {file_path} has no room for {rows} rows")
+        f.seek(data_offset + shape[0] * dtype.itemsize)
+        f.write(np.ascontiguousarray(values).tobytes())
+
+
+def get_store_path(ticks_path: str) -> str:
+    """
+    Store directory that sits next to a tick csv
+    (history/gold_minute_ticks.csv -> history/gold_minute_ticks.ticks).
+    """
+    if ticks_path.endswith(STORE_SUFFIX):
+        return ticks_path
+    return os.path.splitext(ticks_path)[0] + STORE_SUFFIX
+
+
+def convert_csv_to_store(csv_path: str, store_path: Optional[str] = None, chunk_size: int = 1_000_000) -> str:
+    """
+    One-time conversion of a tick csv (time, tick) to the columnar store. The csv is parsed chunk by chunk
+    straight into memory-mapped output files, so files larger than RAM can be converted.
+
+    Args:
+        csv_path (str): path to the csv file with format time, tick
+        store_path (Optional[str]): output directory, defaults to get_store_path(csv_path)
+        chunk_size (int): csv rows parsed at a time
+
+    Returns:
+        str: path of the written store
+    """
+    store_path = store_path or get_store_path(csv_path)
+    # First pass without date parsing, only to size the output files.
+    rows = sum(len(chunk) for chunk in pd.read_csv(csv_path, usecols=["time"], dtype=str, chunksize=chunk_size))
+    os.makedirs(store_path, exist_ok=True)
+    times_out = np.lib.format.open_memmap(
+        os.path.join(store_path, TIME_FILE), mode="w+", dtype=np.int64, shape=(rows,)
+    )
+    prices_out = np.lib.format.open_memmap(
+        os.path.join(store_path, PRICE_FILE), mode="w+", dtype=np.float64, shape=(rows,)
+    )
+
+    tz = None
+    pos = 0
+    for chunk in pd.read_csv(csv_path, parse_dates=["time"], chunksize=chunk_size):
+        times = pd.DatetimeIndex(chunk["time"])
+        values = times.as_unit("ns").asi8
+        if pos == 0:
+            tz = times.tz
+        elif len(values) and values[0] < times_out[pos - 1]:
+            raise ValueError("Tick times must be sorted")
+        if len(values) > 1 and np.any(np.diff(values) < 0):
+            raise ValueError("Tick times must be sorted")
+
+        times_out[pos:pos + len(values)] = values
+        prices_out[pos:pos + len(values)] = chunk["tick"].to_numpy(dtype=np.float64)
+        pos += len(values)
+
+    times_out.flush()
+    prices_out.flush()
+    TickStore.write_meta(store_path, rows, tz)
+    logger.info(f"Converted {rows} ticks from {csv_path} to {store_path}")
+    return store_path
+
+
+class TickStore:
+    """
+    On-disk columnar tick store: int64 epoch-ns times plus float64 prices, one .npy file per column,
+    memory-mapped on load so no parsing or copy happens until the data is touched.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.times: Optional[np.ndarray] = None
+        self.prices: Optional[np.ndarray] = None
+        self.tz: Optional[str] = None
+
+    @classmethod
+    def from_arrays(cls, times: np.ndarray, prices: np.ndarray, tz=None) -> "TickStore":
+        """In-memory store over existing arrays (no file behind it)."""
+        store = cls(path="")
+        store.times = times
+        store.prices = prices
+        store.tz = str(tz) if tz is not None else None
+        return store
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, TIME_FILE)) and os.path.isfile(os.path.join(path, PRICE_FILE))
+
+    @staticmethod
+    def write(path: str, times: np.ndarray, prices: np.ndarray, tz=None) -> None:
+        if len(times) != len(prices):
+            raise ValueError("times and prices must have the same length")
+        if len(times) > 1 and np.any(np.diff(times) < 0):
+            raise ValueError("Tick times must be sorted")
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, TIME_FILE), np.ascontiguousarray(times, dtype=np.int64))
+        np.save(os.path.join(path, PRICE_FILE), np.ascontiguousarray(prices, dtype=np.float64))
+        TickStore.write_meta(path, len(times), tz)
+
+    @staticmethod
+    def append(path: str, times: np.ndarray, prices: np.ndarray, tz=None, **meta: Any) -> int:
+        """
+        Appends ticks to the store at path (creating it when missing). Only the new rows are written, so
+        extending a large store costs as much as the rows added. The ticks must not start before the last
+        stored tick. meta: extra entries kept in meta.json (e.g. the source rows already converted).
+
+        Returns:
+            int: rows in the store after the append
+        """
+        times = np.ascontiguousarray(times, dtype=np.int64)
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        if not TickStore.exists(path):
+            TickStore.write(path, times, prices, tz)
+            TickStore.write_meta(path, len(times), tz, **meta)
+            return len(times)
+
+        if len(times) != len(prices):
+            raise ValueError("times and prices must have the same length")
+        if len(times) > 1 and np.any(np.diff(times) < 0):
+            raise ValueError("Tick times must be sorted")
+        stored = TickStore(path).load()
+        stored_tz = stored.tz
+        if stored_tz != (str(tz) if tz is not None else None):
+            raise ValueError(f"Cannot append ticks in timezone {tz} to a store in {stored_tz}")
+        stored_times = stored.slice()[0]
+        rows = len(stored_times)
+        if rows and len(times) and times[0] < stored_times[-1]:
+            raise ValueError("Appended ticks must not start before the last stored tick")
+        # Drop the memory maps before the files are extended.
+        del stored, stored_times
+
+        append_to_npy(os.path.join(path, TIME_FILE), times)
+        append_to_npy(os.path.join(path, PRICE_FILE), prices)
+        kept = {key: value for key, value in TickStore.read_meta(path).items() if key not in ("rows", "tz")}
+        TickStore.write_meta(path, rows + len(times), tz, **{**kept, **meta})
+        return rows + len(times)
+
+    @staticmethod
+    def write_meta(path: str, rows: int, tz=None, **extra: Any) -> None:
+        meta = {**extra, "rows": int(rows), "tz": str(tz) if tz is not None else None}
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def read_meta(path: str) -> Dict[str, Any]:
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.isfile(meta_path):
+            return {}
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def load(self) -> "TickStore":
+        self.times = np.load(os.path.join(self.path, TIME_FILE), mmap_mode="r")
+        self.prices = np.load(os.path.join(self.path, PRICE_FILE), mmap_mode="r")
+        self.tz = TickStore.read_meta(self.path).get("tz")
+        return self
+
+    def __len__(self) -> int:
+        return 0 if self.times is None else len(self.times)
+
+    def to_ns(self, ts: pd.Timestamp) -> int:
+        """Epoch-ns value of ts, interpreting naive timestamps in the store timezone."""
+        ts = pd.Timestamp(ts)
+        if self.tz is not None and ts.tzinfo is None:
+            ts = ts.tz_localize(self.tz)
+        return int(ts.as_unit("ns").value)
+
+    def index_of(self, ts: pd.Timestamp, side: Literal["left", "right"] = "left") -> int:
+        """Index bisection on the time column."""
+        if self.times is None:
+            raise ValueError("TickStore is not loaded")
+        return int(np.searchsorted(self.times, self.to_ns(ts), side=side))
+
+    def slice(self, start: int = 0, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy views over [start:stop]."""
+        if self.times is None or self.prices is None:
+            raise ValueError("TickStore is not loaded")
+        return self.times[start:stop], self.prices[start:stop]
+
+
+if __name__ == "__main__":
+    # python -m core.tick_store history/gold_minute_ticks.csv
+    for csv_file in sys.argv[1:]:
+        convert_csv_to_store(csv_file)
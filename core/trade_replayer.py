@@ -1,24 +1,101 @@
 import time
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
-from lightweight_charts import Chart # type: ignore
+from numba import njit
 
-from core.position_manager import PositionManager
+from core.position_components.exit_resolver import EXIT_NONE, EXIT_REASON_NAMES, resolve_exit_numba
+from core.position_manager import PositionManager, dollars_to_pips
 from core.position_components.break_even_manager import BreakEvenManager
 from enums.type_signals import TypeSignal
+from models.strategy_params import StrategyParams
+from utils.calculate_next_open_time import get_next_open_time_ns
+from utils.ensure_datetime import from_epoch_ns, to_epoch_ns
 from utils.logger import get_logger
 
+try:
+    from lightweight_charts import Chart # type: ignore
+except ImportError:  # headless replays (verify_exits) do not need the chart
+    Chart = None
+
 BACK_CANDLES_START = 10
 FRONT_CANDLES_END = 2
 
 
+@njit
+def replay_exits_numba(
+    times: np.ndarray,
+    prices: np.ndarray,
+    entry_times: np.ndarray,
+    exit_times: np.ndarray,
+    directions: np.ndarray,
+    entries: np.ndarray,
+    sls: np.ndarray,
+    tps: np.ndarray,
+    trend_exits: np.ndarray,
+    activate_pips: np.ndarray,
+    profit_pips: np.ndarray,
+    timeframe: int,
+    pip_size: float
+):
+    """
+    Re-resolves the exit of every exported trade on the tick stream with resolve_exit_numba.
+
+    Positions open at the close of their signal candle: a BUY entry_time is that closing tick and a SELL
+    entry_time is the first tick of the candle, so ticks are walked from the tick after the candle close.
+    SL/TP exits are searched up to the exported exit tick. Trend-change exits happen at the close of the
+    candle that starts at exit_time: no SL/TP may fire before that close, and the exit price is the close.
+
+    Returns:
+        (exit_index, exit_price, reason) per trade; reason EXIT_NONE with the close tick for trend exits
+        that replay cleanly, exit_index -1 when nothing closes the position.
+    """
+    n = len(entry_times)
+    exit_idx: np.ndarray = np.full(n, -1, dtype=np.int64)
+    exit_prices = np.full(n, np.nan)
+    reasons: np.ndarray = np.zeros(n, dtype=np.int64)
+    no_levels = np.empty(0)
+    for i in range(n):
+        if directions[i] == 1:
+            close_idx = np.searchsorted(times, entry_times[i])
+        else:
+            close_idx = np.searchsorted(times, get_next_open_time_ns(entry_times[i], timeframe))
+
+        if trend_exits[i]:
+            stop = int(np.searchsorted(times, get_next_open_time_ns(exit_times[i], timeframe))) + 1
+        else:
+            stop = int(np.searchsorted(times, exit_times[i], side="right"))
+        stop = min(stop, len(times))
+
+        idx, price, reason, _, _, _ = resolve_exit_numba(
+            prices, close_idx + 1, stop, directions[i], entries[i], sls[i], tps[i],
+            False, activate_pips[i], profit_pips[i], no_levels, no_levels, 0, pip_size
+        )
+        if reason == EXIT_NONE and trend_exits[i] and stop > 0:
+            idx = stop - 1
+            price = prices[idx]
+        exit_idx[i] = idx
+        exit_prices[i] = price
+        reasons[i] = reason
+    return exit_idx, exit_prices, reasons
+
+
 class TradeReplayer:
     def __init__(self, candles_df: pd.DataFrame, ticks_df: pd.DataFrame, trades_df: pd.DataFrame):
+        """
+        candles_df: Candles to draw (only the visual replay uses them)
+        ticks_df: Ticks with columns time, tick (or price)
+        trades_df: Closed positions as exported by PositionManager.export_closed_positions_to_dataframe
+        """
         self.candles_df = candles_df
         self.ticks_df = ticks_df
         self.trades_df = trades_df
+        # entry time (epoch ns) -> row of trades_df, so each tick finds its trade with one dict lookup
+        self.entry_rows: Dict[int, int] = {
+            entry_time: row for row, entry_time in enumerate(to_epoch_ns(trades_df["entry_time"]))
+        }
         self.filtered_candles_df: Optional[pd.DataFrame] = None
         self.chart: Optional[Chart] = None
         self.play_speed: float = 0.05
@@ -44,43 +121,143 @@ class TradeReplayer:
         start_date = self.filtered_candles_df['time'].iloc[- 1]
         self.filtered_ticks_df = self.ticks_df[self.ticks_df["time"] >= start_date].reset_index(drop=True)
 
-    def start_replay(self):
+    def tick_arrays(self, ticks_df: Optional[pd.DataFrame] = None):
+        """Tick times (int64 epoch ns) and prices of ticks_df (all ticks by default)."""
+        ticks_df = self.ticks_df if ticks_df is None else ticks_df
+        column = "tick" if "tick" in ticks_df.columns else "price"
+        return to_epoch_ns(ticks_df["time"]), ticks_df[column].to_numpy(dtype=np.float64)
+
+    def verify_exits(self, timeframe: int = 15, params: Optional[StrategyParams] = None) -> pd.DataFrame:
+        """
+        Headless replay: no chart and no sleeps. Every exported trade is re-resolved on the tick stream
+        (replay_exits_numba) and its exit compared with the exported one.
+
+        Args:
+            timeframe (int): timeframe in minutes of the backtest that exported the trades
+            params (StrategyParams): break-even settings of that backtest (defaults to config.py)
+
+        Returns:
+            pd.DataFrame: one row per trade with the exported and replayed exit (time, price, reason) and a
+            match column; mismatches are also logged.
+        """
+        params = params or StrategyParams()
+        instrument = self.position_manager.instrument
+        times, prices = self.tick_arrays()
+        trades = self.trades_df
+        exit_reasons = trades["exit_reason"].astype(str).to_numpy()
+        trend_exits = np.char.startswith(exit_reasons.astype(np.str_), "CHANGE_TREND")
+        lot_sizes = trades["lot_size"].to_numpy(dtype=np.float64)
+        exported_exit_times = to_epoch_ns(trades["exit_time"])
+
+        exit_idx, exit_prices, reasons = replay_exits_numba(
+            times, prices,
+            to_epoch_ns(trades["entry_time"]),
+            exported_exit_times,
+            np.where(trades["type"].astype(str).to_numpy() == TypeSignal.BUY.value, 1, -1),
+            trades["entry_price"].to_numpy(dtype=np.float64),
+            trades["entry_sl"].to_numpy(dtype=np.float64),
+            trades["entry_tp"].to_numpy(dtype=np.float64),
+            trend_exits,
+            dollars_to_pips(params.break_even_activate_usd, lot_sizes, instrument),
+            dollars_to_pips(params.break_even_profit_usd, lot_sizes, instrument),
+            timeframe,
+            instrument.pip_size
+        )
+
+        found = exit_idx >= 0
+        clean_trend_exits = trend_exits & (reasons == EXIT_NONE) & found
+        replayed_reasons = np.array([EXIT_REASON_NAMES.get(reason, "") for reason in reasons], dtype=object)
+        replayed_reasons[clean_trend_exits] = exit_reasons[clean_trend_exits]
+        # int64 min is NaT once converted. Trend exits are stamped with the open of their closing candle.
+        replayed_times = np.where(found, times[np.maximum(exit_idx, 0)], np.iinfo(np.int64).min)
+        replayed_times = np.where(clean_trend_exits, exported_exit_times, replayed_times)
+
+        exported_prices = trades["exit_price"].to_numpy(dtype=np.float64)
+        match = (
+            found &
+            (replayed_reasons == exit_reasons) &
+            (replayed_times == exported_exit_times) &
+            np.isclose(exit_prices, exported_prices, rtol=0.0, atol=1e-9)
+        )
+        report = pd.DataFrame({
+            "entry_time": trades["entry_time"].to_numpy(),
+            "type": trades["type"].to_numpy(),
+            "exit_time": trades["exit_time"].to_numpy(),
+            "exit_price": exported_prices,
+            "exit_reason": exit_reasons,
+            "replayed_exit_time": from_epoch_ns(replayed_times, getattr(trades["exit_time"].dtype, "tz", None)),
+            "replayed_exit_price": exit_prices,
+            "replayed_exit_reason": replayed_reasons,
+            "match": match,
+        })
+        mismatches = int((~match).sum())
+        if mismatches:
+            self.logger.warning(f"{mismatches} of {len(report)} trades do not replay to their exported exit")
+        else:
+            self.logger.info(f"All {len(report)} trades replay to their exported exit")
+        return report
+
+    def start_replay(self, skip_idle: bool = False):
+        """
+        Visual replay on a lightweight-charts window.
+        skip_idle: while no position is open, jump the chart straight to the candle before the next trade
+        instead of streaming (and sleeping on) every tick in between.
+        """
         if self.filtered_candles_df is None:
             raise ValueError("Should call filter_replay_range() first")
+        if Chart is None:
+            raise ValueError("lightweight_charts is required for the visual replay")
 
         self.chart = Chart()
         self.chart.set(self.filtered_candles_df)
         self.chart.legend(visible=True)
         self.chart.show()
         self.filtered_ticks_df.rename(columns={'tick': 'price'}, inplace=True)
-        
+
+        tick_times, prices = self.tick_arrays(self.filtered_ticks_df)
+        datetimes = self.filtered_ticks_df['time']
+        entry_ticks = np.flatnonzero(np.isin(tick_times, np.fromiter(self.entry_rows, dtype=np.int64)))
+        candle_times = to_epoch_ns(self.candles_df['time'])
+
         detected_times = 0
         self.open_positions = False
-        for _, row in self.filtered_ticks_df.iterrows():
-            candle_time = row['time']
-            price = row['price']
-            self.chart.update_from_tick(row)
+        i = 0
+        while i < len(prices):
+            if skip_idle and not self.position_manager.active_position:
+                next_entry = entry_ticks[np.searchsorted(entry_ticks, i):][:1]
+                if len(next_entry) and next_entry[0] > i + 1:
+                    # Redraw the history up to the candle holding the next entry and continue from there.
+                    last_candle = int(np.searchsorted(candle_times, tick_times[next_entry[0]], side="right"))
+                    self.chart.set(self.candles_df.iloc[max(last_candle - BACK_CANDLES_START, 0):last_candle - 1])
+                    i = int(next_entry[0])
+
+            candle_time = datetimes.iloc[i]
+            price = prices[i]
+            self.chart.update_from_tick(pd.Series({"time": candle_time, "price": price}))
 
-            trade = self.trades_df[self.trades_df['entry_time'] == row['time']]
-            if not trade.empty:
+            row = self.entry_rows.get(int(tick_times[i]))
+            if row is not None:
+                trade = self.trades_df.iloc[row:row + 1]
                 if detected_times >= 3:
                     self.add_markers(candle_time, trade)
                     self.trades_appends.append(candle_time)
                     time.sleep(self.play_speed)
                     detected_times = 0
+                    i += 1
                     continue
                 else:
                     detected_times += 1
-            
+
             if self.position_manager.active_position:
-                closed = self.position_manager.update_position(price, candle_time)
+                closed = self.position_manager.update_position(price, int(tick_times[i]))
                 if closed:
                     self.add_marker_sell()
                     detected_times = 0
-                
+
                 time.sleep(self.play_speed)
-            
+
             time.sleep(self.play_speed)
+            i += 1
 
     def add_markers(self, current_time: datetime, trade):
         tp = trade['entry_tp'].iloc[0]
@@ -117,12 +294,14 @@ class TradeReplayer:
         entry_line = self.chart.create_line(name="Entry", color='gray', style='dotted', width=2)
         entry_line.set(df_entry_line)
 
-        self.position_manager.open_position(TypeSignal.BUY, entry_price, tp, sl, lot_size=0.1, time=current_time)
+        trade_type = TypeSignal(str(trade['type'].iloc[0]))
+        entry_ns = int(to_epoch_ns([current_time])[0])
+        self.position_manager.open_position(trade_type, entry_price, tp, sl, lot_size=0.1, time=entry_ns)
 
     def add_marker_sell(self):
         last_closed = self.position_manager.closed_positions[-1]
-        close_price = last_closed['exit_price']
-        profit = last_closed['profit']
+        close_price = last_closed.exit_price
+        profit = last_closed.profit
         if self.chart is None:
             raise ValueError("Chart is not initialized")
         self.chart.marker(text=f'Close ({close_price}) {profit:.2f}', shape='circle', position='inside', color='red')
@@ -136,9 +315,9 @@ class TradeReplayer:
         direction = 'BUY'
         for idx, level in enumerate(self.position_manager.break_even_manager.levels):
             if direction == 'BUY':
-                activation_price = entry_price + (level.activate_pips / 10)
+                activation_price = entry_price + (level.activate_pips / self.position_manager.instrument.pips_per_unit)
             else:  # SELL
-                activation_price = entry_price - (level.activate_pips / 10)
+                activation_price = entry_price - (level.activate_pips / self.position_manager.instrument.pips_per_unit)
 
             line_name = f"BE_Level_{idx + 1}"
             be_line = self.chart.create_line(name=line_name, color='yellow', style='dashed', width=1)
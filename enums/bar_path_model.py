@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class BarPathModel(Enum):
+    """Order in which the price is assumed to visit the open, high, low and close inside an OHLC bar."""
+    OHLC = "OHLC"
+    OLHC = "OLHC"
+    NEAREST_FIRST = "NEAREST_FIRST"
+    BROWNIAN_BRIDGE = "BROWNIAN_BRIDGE"
@@ -10,7 +10,7 @@ def update_ema(prev_ema: float, value: float, period: int) -> float:
 
 @njit
 def simple_moving_average(values: np.ndarray) -> float:
-    return np.mean(values)
+    return float(np.mean(values))
 
 
 @njit
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Any, Dict, Tuple
 
 import numpy as np
 import pandas as pd
@@ -81,3 +81,141 @@ def bollinger_numba(
     lower = mean - std_multiplier * std
 
     return mean, upper, lower
+
+
+@njit
+def rolling_bollinger_numba(
+    closes: np.ndarray,
+    period: int = BOLLINGER_PERIOD,
+    std_multiplier: float = DESVIATION
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcula Bollinger Bands para cada vela de la serie en una sola pasada.
+
+    El valor en la posición i usa la ventana closes[i - period + 1:i + 1] con la misma
+    aritmética que bollinger_numba, por lo que los resultados son idénticos.
+
+    Parameters:
+        closes (np.ndarray): Array de precios de cierre.
+        period (int): Número de periodos para calcular la media y desviación.
+        std_multiplier (float): Multiplicador para calcular las bandas.
+
+    Returns:
+        Tuple (ma, upper, lower) de arrays alineados con closes (NaN antes de period - 1).
+    """
+    n = closes.shape[0]
+    ma = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+
+    for end in range(period - 1, n):
+        start = end - period + 1
+        mean = 0.0
+        for i in range(start, end + 1):
+            mean += closes[i]
+        mean /= period
+
+        variance = 0.0
+        for i in range(start, end + 1):
+            diff = closes[i] - mean
+            variance += diff * diff
+        variance /= period
+
+        std = np.sqrt(variance)
+        ma[end] = mean
+        upper[end] = mean + std_multiplier * std
+        lower[end] = mean - std_multiplier * std
+
+    return ma, upper, lower
+
+
+class RollingBollinger:
+    """
+    Bollinger Bands incrementales para flujos de velas.
+
+    Mantiene la ventana en un buffer circular junto con la media y la suma de cuadrados de las
+    desviaciones (M2, método de Welford), por lo que cada update es O(1) independientemente del
+    periodo. Usa varianza poblacional, igual que bollinger_numba.
+    """
+
+    def __init__(
+        self,
+        period: int = BOLLINGER_PERIOD,
+        std_multiplier: float = DESVIATION,
+        resync_every: int = 10_000
+    ):
+        """
+        Parameters:
+            period (int): Número de periodos de la ventana.
+            std_multiplier (float): Multiplicador para calcular las bandas.
+            resync_every (int): Cada cuántos updates se recalculan media y M2 desde el buffer
+                para acotar el error acumulado en historiales largos.
+        """
+        self.period = period
+        self.std_multiplier = std_multiplier
+        self.resync_every = resync_every
+        self.buffer = np.zeros(period)
+        self.index = 0
+        self.count = 0
+        self.updates = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        """
+        Añade un cierre a la ventana.
+
+        Returns:
+            Tuple (ma, upper, lower) de la ventana actual, NaN mientras no haya period cierres.
+        """
+        close = float(close)
+        if self.count < self.period:
+            self.count += 1
+            delta = close - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (close - self.mean)
+        else:
+            old = self.buffer[self.index]
+            delta = close - old
+            new_mean = self.mean + delta / self.period
+            self.m2 += delta * (close - new_mean + old - self.mean)
+            self.mean = new_mean
+
+        self.buffer[self.index] = close
+        self.index = (self.index + 1) % self.period
+
+        self.updates += 1
+        if self.ready and self.updates % self.resync_every == 0:
+            self.mean = float(self.buffer.mean())
+            self.m2 = float(((self.buffer - self.mean) ** 2).sum())
+
+        if not self.ready:
+            return np.nan, np.nan, np.nan
+
+        std = np.sqrt(max(self.m2, 0.0) / self.period)
+        return self.mean, self.mean + self.std_multiplier * std, self.mean - self.std_multiplier * std
+
+    def get_state(self) -> Dict[str, Any]:
+        """Estado completo de la ventana, para checkpoints (ver utils.checkpoint)."""
+        return {
+            "buffer": self.buffer.copy(),
+            "index": self.index,
+            "count": self.count,
+            "updates": self.updates,
+            "mean": self.mean,
+            "m2": self.m2,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        if len(state["buffer"]) != self.period:
+            raise ValueError(f"Bollinger state period {len(state['buffer'])} does not match {self.period}")
+        self.buffer = np.array(state["buffer"], dtype=np.float64)
+        self.index = state["index"]
+        self.count = state["count"]
+        self.updates = state["updates"]
+        self.mean = state["mean"]
+        self.m2 = state["m2"]
@@ -1,9 +1,13 @@
-from typing import List, Optional
+import time
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 from numba import njit
 
-from config import RSI_PERIOD
+from config import RSI_PERIOD, RSI_SMOOTHING
+
+RSI_SMOOTHING_SIMPLE = "simple"
+RSI_SMOOTHING_WILDER = "wilder"
 
 
 @njit
@@ -39,14 +43,104 @@ def rsi_numba(closes: np.ndarray, period: int) -> np.ndarray:
     return rsi
 
 
+@njit
+def rsi_rolling_numba(closes: np.ndarray, period: int, wilder: bool = False) -> np.ndarray:
+    """
+    Batch mode of RSIRolling: the value of update(closes[i]) after feeding closes[:i + 1]
+    in order, with the same arithmetic (running sums / Wilder averages), so the results
+    are identical to the streaming class.
+
+    wilder=False: simple mean of the last `period` gains and losses (RSIFastRolling).
+    wilder=True: Wilder smoothing seeded with the mean of the first `period` deltas (rsi_numba).
+    """
+    n = len(closes)
+    rsi = np.empty(n)
+    rsi[:] = np.nan
+
+    gains = np.zeros(period)
+    losses = np.zeros(period)
+    index = 0
+    count = 0
+    sum_gain = 0.0
+    sum_loss = 0.0
+    nonzero_gains = 0
+    nonzero_losses = 0
+    avg_gain = 0.0
+    avg_loss = 0.0
+
+    for i in range(1, n):
+        delta = closes[i] - closes[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if wilder:
+            if count < period:
+                sum_gain += gain
+                sum_loss += loss
+                count += 1
+                if count < period:
+                    continue
+                avg_gain = sum_gain / period
+                avg_loss = sum_loss / period
+            else:
+                avg_gain = (avg_gain * (period - 1) + gain) / period
+                avg_loss = (avg_loss * (period - 1) + loss) / period
+
+            if avg_loss == 0:
+                rsi[i] = np.nan if avg_gain == 0 else 100.0
+            else:
+                rsi[i] = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+            continue
+
+        if count == period:
+            old_gain = gains[index]
+            old_loss = losses[index]
+            sum_gain -= old_gain
+            sum_loss -= old_loss
+            if old_gain > 0:
+                nonzero_gains -= 1
+            if old_loss > 0:
+                nonzero_losses -= 1
+        else:
+            count += 1
+
+        gains[index] = gain
+        losses[index] = loss
+        index = (index + 1) % period
+        sum_gain += gain
+        sum_loss += loss
+        if gain > 0:
+            nonzero_gains += 1
+        if loss > 0:
+            nonzero_losses += 1
+        if nonzero_gains == 0:
+            sum_gain = 0.0
+        if nonzero_losses == 0:
+            sum_loss = 0.0
+
+        if count < period:
+            continue
+
+        avg_gain = sum_gain / period
+        avg_loss = sum_loss / period
+        if avg_loss == 0:
+            rsi[i] = 100.0
+        elif avg_gain == 0:
+            rsi[i] = 0.0
+        else:
+            rsi[i] = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+    return rsi
+
+
 class RSIIncremental:
     def __init__(self, period: int = RSI_PERIOD):
         self.period = period
-        self.last_avg_gain = None
-        self.last_avg_loss = None
-        self.prev_close = None
+        self.last_avg_gain: Optional[float] = None
+        self.last_avg_loss: Optional[float] = None
+        self.prev_close: Optional[float] = None
         self.ready = False
-        self.current_rsi = None
+        self.current_rsi: Optional[float] = None
 
     def initialize(self, closes: np.ndarray):
         if len(closes) < 2:
@@ -56,8 +150,8 @@ class RSIIncremental:
         gains = np.where(deltas > 0, deltas, 0.0)
         losses = np.where(deltas < 0, -deltas, 0.0)
 
-        avg_gain = np.mean(gains[:self.period])
-        avg_loss = np.mean(losses[:self.period])
+        avg_gain = float(np.mean(gains[:self.period]))
+        avg_loss = float(np.mean(losses[:self.period]))
 
         self.last_avg_gain = avg_gain
         self.last_avg_loss = avg_loss
@@ -65,11 +159,11 @@ class RSIIncremental:
         rs = avg_gain / avg_loss
         self.current_rsi = 100 - (100 / (1 + rs))
 
-        self.prev_close = closes[-1]
+        self.prev_close = float(closes[-1])
         self.ready = True
 
     def update(self, current_close: float) -> float:
-        if not self.ready or self.prev_close is None:
+        if not self.ready or self.prev_close is None or self.last_avg_gain is None or self.last_avg_loss is None:
             return np.nan
 
         delta = current_close - self.prev_close
@@ -111,7 +205,7 @@ class RSIFastRolling:
             self.ready = True
             self.current_rsi = self.calculate_rsi()
 
-        self.prev_close = closes[-1]
+        self.prev_close = float(closes[-1])
 
     def update(self, current_close: float) -> float:
         if self.prev_close is None:
@@ -141,8 +235,8 @@ class RSIFastRolling:
         return self.current_rsi
 
     def calculate_rsi(self) -> float:
-        avg_gain = np.mean(self.gains) if self.gains else 0.0
-        avg_loss = np.mean(self.losses) if self.losses else 0.0
+        avg_gain = float(np.mean(self.gains)) if self.gains else 0.0
+        avg_loss = float(np.mean(self.losses)) if self.losses else 0.0
 
         if avg_loss == 0:
             return 100.0
@@ -151,3 +245,186 @@ class RSIFastRolling:
 
         rs = avg_gain / avg_loss
         return float(100.0 - (100.0 / (1.0 + rs)))
+
+
+class RSIRolling:
+    """
+    Fixed-capacity RSI: gains and losses live in ring buffers with running sums, so update is O(1)
+    (RSIFastRolling pays list.pop(0) and two np.mean per update). Drop-in replacement for it.
+
+    smoothing RSI_SMOOTHING_SIMPLE: simple mean of the last `period` gains/losses (RSIFastRolling).
+    smoothing RSI_SMOOTHING_WILDER: Wilder averages seeded with the first `period` deltas (rsi_numba).
+    rsi_rolling_numba is the batch mode and returns exactly the same values.
+    """
+
+    def __init__(self, period: int = RSI_PERIOD, smoothing: str = RSI_SMOOTHING):
+        if smoothing not in (RSI_SMOOTHING_SIMPLE, RSI_SMOOTHING_WILDER):
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+        self.period = period
+        self.wilder = smoothing == RSI_SMOOTHING_WILDER
+        self.gains = np.zeros(period)
+        self.losses = np.zeros(period)
+        self.index = 0
+        self.count = 0
+        self.sum_gain = 0.0
+        self.sum_loss = 0.0
+        # Number of non-zero entries in the buffers: when it drops to 0 the running sum is reset to an
+        # exact 0.0, so "no losses" still yields RSI 100 despite rounding residue.
+        self.nonzero_gains = 0
+        self.nonzero_losses = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.prev_close: Optional[float] = None
+        self.ready: bool = False
+        self.current_rsi: float = np.nan
+
+    def initialize(self, closes: np.ndarray):
+        """Streams closes (same contract as RSIFastRolling.initialize: needs at least `period` closes)."""
+        if len(closes) < self.period:
+            return
+
+        for close in closes:
+            self.update(close)
+
+    def update(self, current_close: float) -> float:
+        current_close = float(current_close)
+        if self.prev_close is None:
+            self.prev_close = current_close
+            return np.nan
+
+        delta = current_close - self.prev_close
+        self.prev_close = current_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.wilder:
+            self._update_wilder(gain, loss)
+        else:
+            self._update_simple(gain, loss)
+        return self.current_rsi
+
+    def _update_wilder(self, gain: float, loss: float) -> None:
+        period = self.period
+        if self.count < period:
+            self.sum_gain += gain
+            self.sum_loss += loss
+            self.count += 1
+            if self.count < period:
+                return
+            self.avg_gain = self.sum_gain / period
+            self.avg_loss = self.sum_loss / period
+        else:
+            self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+        self.ready = True
+        if self.avg_loss == 0:
+            self.current_rsi = np.nan if self.avg_gain == 0 else 100.0
+        else:
+            self.current_rsi = 100.0 - (100.0 / (1.0 + self.avg_gain / self.avg_loss))
+
+    def _update_simple(self, gain: float, loss: float) -> None:
+        period = self.period
+        index = self.index
+        if self.count == period:
+            old_gain = self.gains[index]
+            old_loss = self.losses[index]
+            self.sum_gain -= old_gain
+            self.sum_loss -= old_loss
+            if old_gain > 0:
+                self.nonzero_gains -= 1
+            if old_loss > 0:
+                self.nonzero_losses -= 1
+        else:
+            self.count += 1
+
+        self.gains[index] = gain
+        self.losses[index] = loss
+        self.index = (index + 1) % period
+        self.sum_gain += gain
+        self.sum_loss += loss
+        if gain > 0:
+            self.nonzero_gains += 1
+        if loss > 0:
+            self.nonzero_losses += 1
+        if self.nonzero_gains == 0:
+            self.sum_gain = 0.0
+        if self.nonzero_losses == 0:
+            self.sum_loss = 0.0
+
+        if self.count < period:
+            self.ready = False
+            self.current_rsi = np.nan
+            return
+
+        self.ready = True
+        avg_gain = self.sum_gain / period
+        avg_loss = self.sum_loss / period
+        if avg_loss == 0:
+            self.current_rsi = 100.0
+        elif avg_gain == 0:
+            self.current_rsi = 0.0
+        else:
+            self.current_rsi = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+    def get_state(self) -> Dict[str, Any]:
+        """Ring buffers and running sums, for checkpoints (see utils.checkpoint)."""
+        return {
+            "period": self.period,
+            "wilder": self.wilder,
+            "gains": self.gains.copy(),
+            "losses": self.losses.copy(),
+            "index": self.index,
+            "count": self.count,
+            "sum_gain": self.sum_gain,
+            "sum_loss": self.sum_loss,
+            "nonzero_gains": self.nonzero_gains,
+            "nonzero_losses": self.nonzero_losses,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "prev_close": self.prev_close,
+            "ready": self.ready,
+            "current_rsi": self.current_rsi,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        if state["period"] != self.period or state["wilder"] != self.wilder:
+            raise ValueError("RSI state was saved with a different period or smoothing")
+        self.gains = np.array(state["gains"], dtype=np.float64)
+        self.losses = np.array(state["losses"], dtype=np.float64)
+        for name in (
+            "index", "count", "sum_gain", "sum_loss", "nonzero_gains", "nonzero_losses",
+            "avg_gain", "avg_loss", "prev_close", "ready", "current_rsi"
+        ):
+            setattr(self, name, state[name])
+
+
+def benchmark_rsi(n: int = 200_000, period: int = RSI_PERIOD, seed: int = 0) -> None:
+    """Times RSIFastRolling against RSIRolling (streaming, both smoothings) and the batch kernel."""
+    closes = 2000 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+
+    def run_streaming(calculator) -> float:
+        start = time.perf_counter()
+        for close in closes:
+            calculator.update(close)
+        return time.perf_counter() - start
+
+    rsi_rolling_numba(closes[:period * 2], period, False)
+    rsi_rolling_numba(closes[:period * 2], period, True)
+    results = {
+        "RSIFastRolling": run_streaming(RSIFastRolling(period)),
+        "RSIRolling simple": run_streaming(RSIRolling(period, RSI_SMOOTHING_SIMPLE)),
+        "RSIRolling wilder": run_streaming(RSIRolling(period, RSI_SMOOTHING_WILDER)),
+    }
+    for wilder in (False, True):
+        start = time.perf_counter()
+        rsi_rolling_numba(closes, period, wilder)
+        results[f"rsi_rolling_numba {'wilder' if wilder else 'simple'}"] = time.perf_counter() - start
+
+    for name, elapsed in results.items():
+        print(f"{name:<28} {elapsed * 1000:10.2f} ms  ({elapsed / n * 1e9:8.1f} ns/close)")
+
+
+if __name__ == "__main__":
+    # python -m indicators_tools.rsi
+    benchmark_rsi()
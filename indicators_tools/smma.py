@@ -1,7 +1,12 @@
+from typing import Any, Dict
+
 import numpy as np
 from numba import njit
 
-from config import SMMA_LENGTH
+from config import SMMA_LENGTH, SMMA_SEED
+
+SMMA_SEED_SMA = "sma"
+SMMA_SEED_FIRST = "first"
 
 
 @njit
@@ -29,3 +34,83 @@ def smma_numba(series: np.ndarray, length: int = SMMA_LENGTH) -> np.ndarray:
         smma_values[i] = (smma_values[i - 1] * (length - 1) + series[i]) * inv_length
 
     return smma_values
+
+
+@njit
+def smma_streaming_numba(series: np.ndarray, length: int = SMMA_LENGTH, seed_sma: bool = True) -> np.ndarray:
+    """
+    Modo batch de StreamingSMMA: reproduce exactamente los valores que devuelve update()
+    al recibir series en orden, con la misma aritmética.
+
+    Args:
+        series (np.ndarray): Array de precios (floats) con todo el historial.
+        length (int): Periodo para suavizado.
+        seed_sma (bool): True para la semilla SMMA_SEED_SMA, False para SMMA_SEED_FIRST.
+
+    Returns:
+        np.ndarray: Array alineado con series (NaN durante el calentamiento).
+    """
+    n = len(series)
+    smma_values = np.full(n, np.nan)
+    inv_length = 1.0 / length
+    seed_count = length if seed_sma else 1
+
+    total = 0.0
+    value = np.nan
+    for i in range(n):
+        if i < seed_count:
+            total += series[i]
+            if i == seed_count - 1:
+                value = total / seed_count
+        else:
+            value = (value * (length - 1) + series[i]) * inv_length
+        smma_values[i] = value
+
+    return smma_values
+
+
+class StreamingSMMA:
+    """
+    SMMA incremental: un update O(1) por vela sobre todo el historial, sin depender de ventanas.
+
+    Política de semilla explícita:
+        SMMA_SEED_SMA: el primer valor es la media simple de los primeros length cierres
+            (NaN hasta entonces), como el RMA de Wilder.
+        SMMA_SEED_FIRST: el primer valor es el primer cierre, como smma_numba.
+    """
+
+    def __init__(self, length: int = SMMA_LENGTH, seed: str = SMMA_SEED):
+        if seed not in (SMMA_SEED_SMA, SMMA_SEED_FIRST):
+            raise ValueError(f"Unknown SMMA seed policy: {seed}")
+        self.length = length
+        self.seed = seed
+        self.inv_length = 1.0 / length
+        self.seed_count = length if seed == SMMA_SEED_SMA else 1
+        self.count = 0
+        self.total = 0.0
+        self.value = np.nan
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.seed_count
+
+    def update(self, value: float) -> float:
+        """Añade un cierre y devuelve el SMMA actual (NaN mientras se calienta)."""
+        value = float(value)
+        if self.count < self.seed_count:
+            self.total += value
+            if self.count == self.seed_count - 1:
+                self.value = self.total / self.seed_count
+        else:
+            self.value = (self.value * (self.length - 1) + value) * self.inv_length
+        self.count += 1
+        return self.value
+
+    def get_state(self) -> Dict[str, Any]:
+        """Estado completo, para checkpoints (ver utils.checkpoint)."""
+        return {"count": self.count, "total": self.total, "value": self.value}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.total = state["total"]
+        self.value = state["value"]
@@ -3,6 +3,7 @@ import pandas as pd
 from numba import njit
 
 from config import ATR_PERIOD, MULTIPLIER, USE_ATR
+from indicators_tools.atr import true_range, update_ema
 
 
 def simulate_trend_signals(
@@ -151,3 +152,51 @@ def update_trend_signal(
         trend_val = -1
 
     return trend_val, up, dn
+
+
+@njit
+def trend_signals_numba(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    prev_closes: np.ndarray,
+    multiplier: float = MULTIPLIER,
+    atr_period: int = ATR_PERIOD
+):
+    """
+    Batch equivalent of IndicatorManager.calculate_trend_signals + SignalManager.detect_signal
+    applied candle by candle, starting from the same initial state (trend -1, up/dn 0).
+    """
+    n = len(closes)
+    trend: np.ndarray = np.empty(n, dtype=np.int64)
+    up_series = np.empty(n)
+    dn_series = np.empty(n)
+    buy_signal = np.full(n, np.nan)
+    sell_signal = np.full(n, np.nan)
+
+    prev_atr = 0.0
+    prev_up = 0.0
+    prev_dn = 0.0
+    trend_val = -1
+
+    for i in range(n):
+        tr = true_range(highs[i], lows[i], prev_closes[i])
+        atr = tr if i == 0 else update_ema(prev_atr, tr, atr_period)
+        prev_atr = atr
+
+        prev_trend = trend_val
+        trend_val, up, dn = update_trend_signal(
+            closes[i], highs[i], lows[i], prev_closes[i], prev_up, prev_dn, trend_val, atr, multiplier
+        )
+        prev_up = up
+        prev_dn = dn
+
+        trend[i] = trend_val
+        up_series[i] = up
+        dn_series[i] = dn
+        if prev_trend == -1 and trend_val == 1:
+            buy_signal[i] = closes[i]
+        elif prev_trend == 1 and trend_val == -1:
+            sell_signal[i] = closes[i]
+
+    return trend, up_series, dn_series, buy_signal, sell_signal
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Account:
+    """Cash balance of a PositionManager; several managers (one per symbol) can share one Account."""
+    balance: float
+    initial_balance: float
+
+    @classmethod
+    def with_balance(cls, balance: float) -> "Account":
+        return cls(balance=balance, initial_balance=balance)
@@ -1,11 +1,10 @@
 from dataclasses import dataclass
-from datetime import datetime
 from typing import Optional
 
 
 @dataclass(slots=True)
 class Candle:
-    time: datetime
+    time: int  # epoch nanoseconds of the first tick
     open: float
     high: float
     low: float
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True, slots=True)
+class InstrumentSpec:
+    """
+    Price and size conventions of a traded symbol.
+    pip_size: price move of one pip; contract_size: units per 1.0 lot (profit = price move * contract_size * lot_size).
+    Profits are in the quote currency and are booked to the account as they are, so only symbols quoted
+    in the account currency (USD) are supported; there is no conversion for pairs such as USDJPY.
+    """
+    symbol: str
+    pip_size: float
+    contract_size: float
+
+    @property
+    def pip_value_per_lot(self) -> float:
+        """Account currency per pip for 1.0 lot."""
+        return self.pip_size * self.contract_size
+
+    @property
+    def pips_per_unit(self) -> float:
+        """Pips in a price move of 1.0."""
+        return 1.0 / self.pip_size
+
+
+XAUUSD = InstrumentSpec("XAUUSD", pip_size=0.1, contract_size=100.0)
+XAGUSD = InstrumentSpec("XAGUSD", pip_size=0.01, contract_size=5000.0)
+EURUSD = InstrumentSpec("EURUSD", pip_size=0.0001, contract_size=100_000.0)
+GBPUSD = InstrumentSpec("GBPUSD", pip_size=0.0001, contract_size=100_000.0)
+# USD-quoted symbols only (see InstrumentSpec).
+INSTRUMENTS: Dict[str, InstrumentSpec] = {spec.symbol: spec for spec in (XAUUSD, XAGUSD, EURUSD, GBPUSD)}
@@ -1,35 +1,64 @@
-from datetime import datetime
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
 
-from pydantic import BaseModel
+import numpy as np
 
+from enums.entry_context import EntryContext
 from enums.type_signals import TypeSignal
 
+BUY = 1
+SELL = -1
 
-class TPTrail(BaseModel):
-    trail_price: list[float]
-    trail_time: list[datetime]
 
+def direction_from_signal(trade_type: TypeSignal) -> int:
+    return BUY if trade_type == TypeSignal.BUY else SELL
 
-class SLTrail(BaseModel):
-    trail_price: list[float]
-    trail_time: list[datetime]
 
-
-class Position(BaseModel):
-    direction: TypeSignal
-    entry_price: float
-    exit_price: float
-    pnl: float
-    duration: float
-    lot_size: float
-    tp: float
+@dataclass(slots=True)
+class Position:
+    """
+    Trade handled by PositionManager. direction is BUY (1) or SELL (-1); times are epoch nanoseconds.
+    Break-even/trailing levels stay None until the V1 rules set them.
+    """
+    direction: int
+    entry: float
+    entry_sl: float
+    entry_tp: float
     sl: float
-    breakeven_applied: bool
-    break_even_price: float
-    tp_trail: TPTrail
-    sl_trail: SLTrail
-    tp_hit: bool
-    sl_hit: bool
-    entry_time: datetime
-    exit_time: datetime
-    is_closed: bool
+    tp: float
+    open_time: int
+    lot_size: float
+    quantity: float
+    balance: float
+    max_price: float
+    min_price: float
+    entry_context: EntryContext = EntryContext.STANDARD
+    sl_break_even: Optional[float] = None
+    tp_break_even: Optional[float] = None
+    sl_trail: Optional[float] = None
+    tp_trail: Optional[float] = None
+    breakeven_applied: bool = False
+    trail_active: bool = False
+    status: str = "open"
+    exit_price: float = np.nan
+    exit_time: Optional[int] = None
+    exit_reason: str = ""
+    profit: float = 0.0
+
+    @property
+    def type(self) -> TypeSignal:
+        return TypeSignal.BUY if self.direction == BUY else TypeSignal.SELL
+
+    @property
+    def is_buy(self) -> bool:
+        return self.direction == BUY
+
+    def to_state(self) -> Dict[str, Any]:
+        """Fields as plain values (entry_context by its value), for checkpoints."""
+        state = asdict(self)
+        state["entry_context"] = self.entry_context.value
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Position":
+        return cls(**{**state, "entry_context": EntryContext(state["entry_context"])})
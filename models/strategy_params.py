@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+
+from config import (ATR_PERIOD, BALANCE, BOLLINGER_PERIOD, BREAK_EVEN_ACTIVATE_USD,
+                    BREAK_EVEN_PROFIT_USD, BREAK_EVEN_TRIGGER, CLOSE_ON_TREND_CHANGE, DESVIATION, LOOKBACK,
+                    LOT_SIZE, MAX_LOOKBACK, MAX_POSITIONS, MIN_RRR, MULTIPLIER, RRR_HARD, RRR_SOFT,
+                    RSI_PERIOD, RSI_SMOOTHING, SMMA_LENGTH, SMMA_SEED, TRAILING_DISTANCE)
+
+
+@dataclass(slots=True)
+class StrategyParams:
+    """Tuning knobs of the strategy. Defaults come from config.py; pass an instance to override them per run."""
+    bollinger_period: int = BOLLINGER_PERIOD
+    desviation: float = DESVIATION
+    multiplier: float = MULTIPLIER
+    atr_period: int = ATR_PERIOD
+    smma_length: int = SMMA_LENGTH
+    smma_seed: str = SMMA_SEED
+    rsi_period: int = RSI_PERIOD
+    rsi_smoothing: str = RSI_SMOOTHING
+    rrr_soft: float = RRR_SOFT
+    rrr_hard: float = RRR_HARD
+    min_rrr: float = MIN_RRR
+    lookback: int = LOOKBACK
+    max_lookback: int = MAX_LOOKBACK
+    lot_size: float = LOT_SIZE
+    balance: float = BALANCE
+    break_even_trigger: float = BREAK_EVEN_TRIGGER
+    trailing_distance: float = TRAILING_DISTANCE
+    break_even_activate_usd: float = BREAK_EVEN_ACTIVATE_USD
+    break_even_profit_usd: float = BREAK_EVEN_PROFIT_USD
+    max_positions: int = MAX_POSITIONS
+    close_on_trend_change: bool = CLOSE_ON_TREND_CHANGE
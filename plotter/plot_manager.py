@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import List, Optional
 
 import pandas as pd
 import plotly.graph_objects as go
@@ -6,6 +6,8 @@ import plotly.io as pio
 from plotly.subplots import make_subplots
 
 from enums.indicator import Indicator
+from models.position import Position
+from utils.ensure_datetime import to_timestamp
 from utils.logger import get_logger
 
 pio.templates.default = "plotly_dark"
@@ -16,7 +18,7 @@ class PlotManager:
         self.df = df
         self.indicators = indicators
         self.logger = get_logger(__name__)
-        self.positions: List[Dict[str, Any]] = []
+        self.positions: List[Position] = []
 
     def add_position_marker(self, fig: go.Figure, entry_time, exit_time, entry_price, exit_price, tp_price, sl_price):
         color_tp = "rgba(0, 255, 0, 0.2)"  # Verde claro
@@ -49,14 +51,15 @@ class PlotManager:
 
     def add_trade_markers(self, fig, trades):
         start_time = self.df['time'].iloc[0]
+        tz = getattr(start_time, "tz", None)
         for i, trade in enumerate(trades):
-            if trade['open_time'] < start_time:
+            entry_time = to_timestamp(trade.open_time, tz)
+            if entry_time < start_time:
                 continue
 
-            entry_time = trade["open_time"]
-            entry = trade["entry"]
-            direction = trade["type"].value
-            texthover = f'{i} {direction}\n Entry:{entry:.2f}\n SL:{trade["sl"]}\n TP:{trade["tp"]}'
+            entry = trade.entry
+            direction = trade.type.value
+            texthover = f'{i} {direction}\n Entry:{entry:.2f}\n SL:{trade.sl}\n TP:{trade.tp}'
             fig.add_trace(go.Scatter(
                 x=[entry_time],
                 y=[entry],
@@ -73,10 +76,11 @@ class PlotManager:
             ))
 
             # Línea hacia salida si existe
-            if "exit_price" in trade and "exit_time" in trade:
-                exit_price = trade["exit_price"]
+            if trade.exit_time is not None:
+                exit_price = trade.exit_price
+                exit_time = to_timestamp(trade.exit_time, tz)
                 fig.add_trace(go.Scatter(
-                    x=[entry_time, trade["exit_time"]],
+                    x=[entry_time, exit_time],
                     y=[entry, exit_price],
                     mode="lines",
                     line={"dash": "dot", "color": "gray"},
@@ -85,7 +89,7 @@ class PlotManager:
                 ))
 
                 fig.add_trace(go.Scatter(
-                    x=[trade["exit_time"]],
+                    x=[exit_time],
                     y=[exit_price],
                     mode='markers',
                     marker={
@@ -95,20 +99,20 @@ class PlotManager:
                         "line": {"width": 1, "color": "black"}
                     },
                     name=f'{direction} Exit',
-                    hovertext=f'{i} {direction} Reason: {trade["exit_reason"]} Profit: {trade["profit"]:.2f}',
+                    hovertext=f'{i} {direction} Reason: {trade.exit_reason} Profit: {trade.profit:.2f}',
                     showlegend=False
                 ))
                 self.add_position_marker(
                     fig,
                     entry_time,
-                    trade["exit_time"],
+                    exit_time,
                     entry,
                     exit_price,
-                    trade["tp"],
-                    trade["sl"]
+                    trade.tp,
+                    trade.sl
                 )
 
-    def set_positions(self, positions: List[Dict[str, Any]]):
+    def set_positions(self, positions: List[Position]):
         self.positions = positions
 
     def plot(
@@ -5,6 +5,11 @@ import pandas as pd
 
 from core.trade_replayer import TradeReplayer
 
+# True: re-check every exported exit against the ticks without opening the chart.
+HEADLESS = False
+# Visual replay: jump over the stretches without an open position.
+SKIP_IDLE = True
+
 if __name__ == "__main__":
     candles_df = pd.read_csv("history/gold_m15.csv")
     ticks_df = pd.read_csv("history/gold_minute_ticks.csv")
@@ -18,8 +23,12 @@ if __name__ == "__main__":
     try:
         candles_df.drop(columns=['ma', 'volume'], inplace=True)
         replayer = TradeReplayer(candles_df, ticks_df, trades_df)
-        replayer.filter_replay_range(trades_df['entry_time'][-4:])
-        replayer.start_replay()
+        if HEADLESS:
+            report = replayer.verify_exits(timeframe=15)
+            print(report[~report["match"]])
+        else:
+            replayer.filter_replay_range(trades_df['entry_time'][-4:])
+            replayer.start_replay(skip_idle=SKIP_IDLE)
     except KeyboardInterrupt:
         exit(0)
     except Exception:
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.batch_simulator import BatchSimulator
+from core.market_simulator import MarketSimulator
+from enums.indicator import Indicator
+
+INDICATORS = [Indicator.TREND_SIGNALS, Indicator.BOLL, Indicator.SMMA, Indicator.RSI]
+
+
+@pytest.fixture(scope="module")
+def ticks():
+    """Synthetic gold-like ticks: irregular 5-90 s gaps and a random walk with 0.5 price steps."""
+    rng = np.random.default_rng(7)
+    n = 20_000
+    start = pd.Timestamp("2025-01-02 01:00").value
+    times = start + np.cumsum(rng.integers(5, 90, n)).astype(np.int64) * 1_000_000_000
+    prices = np.round(2600 + np.cumsum(rng.normal(0, 0.5, n)), 2)
+    return times, prices
+
+
+@pytest.mark.parametrize("timeframe", [5, 15])
+def test_batch_matches_tick_engine(ticks, timeframe):
+    times, prices = ticks
+    tick_engine = MarketSimulator(timeframe=timeframe, indicators=INDICATORS)
+    tick_engine.process_ticks(times, prices)
+    tick_engine.finalize_current_candle()
+    batch = BatchSimulator(timeframe=timeframe, indicators=INDICATORS)
+    batch.run(times, prices)
+
+    expected_trades = tick_engine.position_manager.export_closed_positions_to_dataframe()
+    assert len(expected_trades) > 10
+    pd.testing.assert_frame_equal(batch.export_to_dataframe(), tick_engine.export_to_dataframe())
+    pd.testing.assert_frame_equal(batch.position_manager.export_closed_positions_to_dataframe(), expected_trades)
+    assert batch.position_manager.balance == pytest.approx(tick_engine.position_manager.balance)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from core.market_simulator import MarketSimulator
+from enums.indicator import Indicator
+
+INDICATORS = [Indicator.TREND_SIGNALS, Indicator.BOLL, Indicator.SMMA, Indicator.RSI]
+
+
+def test_max_history_exports_the_retained_tail():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    start = pd.Timestamp("2025-01-02 01:00").value
+    times = start + np.cumsum(rng.integers(5, 90, n)).astype(np.int64) * 1_000_000_000
+    prices = np.round(2600 + np.cumsum(rng.normal(0, 0.5, n)), 2)
+    simulators = []
+    for max_history in (None, 100):
+        simulator = MarketSimulator(timeframe=15, indicators=INDICATORS, max_history=max_history)
+        simulator.process_ticks(times, prices)
+        simulator.finalize_current_candle()
+        simulators.append(simulator)
+    full, bounded = simulators
+
+    expected = full.export_to_dataframe()
+    exported = bounded.export_to_dataframe()
+    assert len(exported) == 100
+    pd.testing.assert_frame_equal(exported, expected.iloc[-100:].reset_index(drop=True))
+    pd.testing.assert_frame_equal(
+        bounded.position_manager.export_closed_positions_to_dataframe(),
+        full.position_manager.export_closed_positions_to_dataframe()
+    )
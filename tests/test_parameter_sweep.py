@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from core.parameter_sweep import ParameterSweep
+from core.simulation_loader import SimulationLoader
+from enums.indicator import Indicator
+
+
+def test_sweep_runs_multi_position_points_on_the_tick_engine():
+    rng = np.random.default_rng(11)
+    n = 5_000
+    start = pd.Timestamp("2025-01-02 01:00").value
+    times = start + np.cumsum(rng.integers(5, 90, n)).astype(np.int64) * 1_000_000_000
+    prices = np.round(2600 + np.cumsum(rng.normal(0, 0.5, n)), 2)
+    sweep = ParameterSweep(
+        SimulationLoader.from_arrays(times, prices),
+        timeframe=5,
+        indicators=[Indicator.TREND_SIGNALS],
+        max_workers=1
+    )
+
+    results = sweep.run_grid({"max_positions": [1, 3], "close_on_trend_change": [True, False]})
+
+    assert len(results) == 4
+    assert sorted(zip(results["max_positions"], results["close_on_trend_change"])) == [
+        (1, False), (1, True), (3, False), (3, True)
+    ]
@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta
 
+from numba import njit
+
+NS_PER_MINUTE = 60_000_000_000
+
 
 def get_next_open_time(current_time: datetime, timeframe_minutes: int) -> datetime:
     minute = current_time.minute
@@ -8,3 +12,11 @@ def get_next_open_time(current_time: datetime, timeframe_minutes: int) -> dateti
         return current_time + timedelta(minutes=timeframe_minutes)
     minutes_to_add = timeframe_minutes - remainder
     return current_time.replace(second=0, microsecond=0) + timedelta(minutes=minutes_to_add)
+
+
+@njit
+def get_next_open_time_ns(current_time_ns: int, timeframe_minutes: int) -> int:
+    """Same as get_next_open_time for an epoch timestamp in nanoseconds."""
+    minutes = current_time_ns // NS_PER_MINUTE
+    remainder = (minutes % 60) % timeframe_minutes
+    return (minutes - remainder + timeframe_minutes) * NS_PER_MINUTE
@@ -0,0 +1,64 @@
+import json
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+CHECKPOINT_VERSION = 2
+# Key of the JSON document inside the npz archive; array entries use their dotted path in the state.
+META_KEY = "__state__"
+ARRAY_TAG = "__array__"
+
+
+def _split_arrays(value: Any, path: str, arrays: Dict[str, np.ndarray]) -> Any:
+    if isinstance(value, np.ndarray):
+        arrays[path] = value
+        return {ARRAY_TAG: path}
+    if isinstance(value, dict):
+        return {key: _split_arrays(item, f"{path}.{key}" if path else key, arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split_arrays(item, f"{path}.{i}", arrays) for i, item in enumerate(value)]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _join_arrays(value: Any, archive: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {ARRAY_TAG}:
+            return archive[value[ARRAY_TAG]]
+        return {key: _join_arrays(item, archive) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_join_arrays(item, archive) for item in value]
+    return value
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> str:
+    """
+    Writes a nested state dict (as returned by the get_state methods) to a single compressed npz file:
+    NumPy arrays are stored as binary entries and every other value (numbers, strings, None) in one
+    JSON document. The file is written to a temporary name first, so an interrupted save keeps the
+    previous checkpoint.
+
+    Returns:
+        str: path of the written checkpoint
+    """
+    if not path.endswith(".npz"):
+        path += ".npz"
+    arrays: Dict[str, np.ndarray] = {}
+    meta = {"version": CHECKPOINT_VERSION, "state": _split_arrays(state, "", arrays)}
+    arrays[META_KEY] = np.array(json.dumps(meta))
+
+    tmp_path = path[:-len(".npz")] + ".tmp.npz"
+    np.savez_compressed(tmp_path, allow_pickle=False, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    """Reads a checkpoint written by save_checkpoint back into the nested state dict."""
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(archive[META_KEY].item())
+        if meta.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {meta.get('version')}")
+        return _join_arrays(meta["state"], archive)
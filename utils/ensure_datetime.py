@@ -1,5 +1,6 @@
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 
@@ -10,3 +11,42 @@ def ensure_datetime(ts) -> datetime:
     if isinstance(ts, datetime):
         return ts
     return pd.to_datetime(ts).to_pydatetime()
+
+
+def from_epoch_ns(values: np.ndarray, tz=None) -> pd.DatetimeIndex:
+    """
+    Convierte un array int64 de nanosegundos epoch a un DatetimeIndex (en la zona tz si se indica).
+    """
+    index = pd.to_datetime(np.asarray(values, dtype=np.int64), unit="ns")
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return pd.DatetimeIndex(index)
+
+
+def to_epoch_ns(values) -> np.ndarray:
+    """
+    Convierte datetimes (columna, índice o str) a un array int64 de nanosegundos epoch; los valores con zona
+    horaria se toman en UTC.
+    """
+    return pd.DatetimeIndex(pd.to_datetime(values)).as_unit("ns").asi8
+
+
+def ensure_datetime_index(values, tz=None) -> pd.DatetimeIndex:
+    """
+    Convierte una secuencia de timestamps a DatetimeIndex. Los enteros se interpretan como nanosegundos
+    epoch (ver from_epoch_ns); cualquier otro valor se pasa a pd.to_datetime.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind in "iu":
+        return from_epoch_ns(array, tz)
+    return pd.DatetimeIndex(pd.to_datetime(list(values)))
+
+
+def to_timestamp(value, tz=None) -> pd.Timestamp:
+    """
+    Convierte un timestamp (entero en nanosegundos epoch, datetime o str) a pandas.Timestamp.
+    """
+    if isinstance(value, (int, np.integer)):
+        ts = pd.Timestamp(int(value), unit="ns")
+        return ts.tz_localize("UTC").tz_convert(tz) if tz is not None else ts
+    return pd.Timestamp(value)
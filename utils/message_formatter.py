@@ -11,7 +11,6 @@ def format_trade_message(direction: TypeSignal, last_row, df):
         direction=direction,
         rsi=rsi,
         entry=entry,
-        stop_distance=2,
         df=df
     )
     icon = "🟢" if direction.value == TypeSignal.BUY.value else "🔴"
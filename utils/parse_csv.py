@@ -1,5 +1,20 @@
+import itertools
+import os
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from core.tick_store import TickStore, get_store_path
+from utils.logger import get_logger
+
+# MT5 exports are in server time; the ticks are stored three hours earlier.
+MT5_TIME_SHIFT = pd.Timedelta(hours=-3)
+OHLC_COLUMNS = ["open", "high", "low", "close"]
+
+logger = get_logger(__name__)
+
 
 def normalize_csv_from_mt5(file_path: str, columns: list[str]) -> None:
     df = pd.read_csv(file_path, header=None)
@@ -8,17 +23,115 @@ def normalize_csv_from_mt5(file_path: str, columns: list[str]) -> None:
     df.to_csv(file_path, index=False)
 
 
-def normalize_from_ohlcv_to_ticks(file_path: str, output_path: str = "history/gold_ticks.csv") -> None:
-    df = pd.read_csv(file_path)
+def ohlc_to_ticks(
+    times: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Four ticks per bar (open, high, low, close, all at the bar time) with one interleave."""
+    prices = np.column_stack((opens, highs, lows, closes)).ravel()
+    return np.repeat(times, len(OHLC_COLUMNS)), prices
 
-    df['time'] = pd.to_datetime(df['time'])
-    df['time'] = df['time'] - pd.Timedelta(hours=3)
-    data = []
-    columns = ['open', 'high', 'low', 'close']
-    for _, row in df.iterrows():
-        time = row['time']
-        for col in columns:
-            data.append([time, row[col]])
-
-    ticks_df = pd.DataFrame(data, columns=['time', 'tick'])
+
+def normalize_from_ohlcv_to_ticks(
+    file_path: str,
+    output_path: str = "history/gold_ticks.csv",
+    time_shift: pd.Timedelta = MT5_TIME_SHIFT
+) -> None:
+    df = pd.read_csv(file_path, parse_dates=["time"])
+    times = pd.DatetimeIndex(df["time"]) + time_shift
+    tick_times, ticks = ohlc_to_ticks(times.as_unit("ns").asi8, *(df[col].to_numpy() for col in OHLC_COLUMNS))
+    ticks_df = pd.DataFrame({"time": pd.DatetimeIndex(tick_times, tz=times.tz), "tick": ticks})
     ticks_df.to_csv(output_path, index=False)
+
+
+def read_bar_chunks(file_path: str, columns: Optional[List[str]], skip: int, chunk_size: int):
+    """Chunked reader of the time and OHLC columns of a bar csv, starting after its first skip rows."""
+    has_header = columns is None
+    return pd.read_csv(
+        file_path,
+        header=0 if has_header else None,
+        names=columns,
+        skiprows=range(1, skip + 1) if has_header else skip,
+        usecols=["time"] + OHLC_COLUMNS,
+        chunksize=chunk_size
+    )
+
+
+def bar_times(chunk: pd.DataFrame, time_shift: pd.Timedelta) -> pd.DatetimeIndex:
+    """Bar times of a chunk moved by time_shift."""
+    return pd.DatetimeIndex(pd.to_datetime(chunk["time"])) + time_shift
+
+
+def convert_ohlc_to_store(
+    file_path: str,
+    store_path: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    time_shift: pd.Timedelta = MT5_TIME_SHIFT,
+    chunk_size: int = 1_000_000
+) -> str:
+    """
+    Converts an OHLC bar csv straight to the tick store (four ticks per bar, as normalize_from_ohlcv_to_ticks)
+    without an intermediate tick csv. Runs are incremental: the store remembers how many rows of file_path it
+    has converted, so re-running on an export that grows daily only reads and appends the new rows (bars at
+    or before the last stored time are skipped). The last converted row must still hold the last stored bar;
+    when it does not (e.g. an export of the latest N bars that dropped its oldest rows) the whole file is
+    read again and only the bars after the last stored time are appended.
+
+    Args:
+        file_path (str): bar csv with time, open, high, low, close columns
+        store_path (Optional[str]): tick store directory, defaults to get_store_path(file_path)
+        columns (Optional[List[str]]): column names of a csv without header, e.g. a raw MT5 export
+            (["time", "open", "high", "low", "close", "tick_volume", "volume", "spread"])
+        time_shift (pd.Timedelta): added to the bar times (MT5 server time to the store time)
+        chunk_size (int): csv rows parsed at a time
+
+    Returns:
+        str: path of the written store
+    """
+    store_path = store_path or get_store_path(file_path)
+    source = os.path.abspath(file_path)
+    meta = TickStore.read_meta(store_path) if TickStore.exists(store_path) else {}
+    converted = meta.get("source_rows", 0) if meta.get("source") == source else 0
+    last_time = None
+    if meta.get("rows"):
+        last_time = int(TickStore(store_path).load().times[-1])
+
+    # Re-read the last converted row to check that the file still lines up with the store.
+    reader = read_bar_chunks(file_path, columns, max(converted - 1, 0), chunk_size)
+    chunks: Iterable[pd.DataFrame] = reader
+    if converted:
+        first = next(reader, None)
+        if first is not None and len(first) and bar_times(first[:1], time_shift).as_unit("ns").asi8[0] == last_time:
+            chunks = itertools.chain([first[1:]], reader)
+        else:
+            logger.warning(f"{file_path} no longer holds the last converted bar at row {converted}, reading it whole")
+            reader.close()
+            converted = 0
+            chunks = read_bar_chunks(file_path, columns, 0, chunk_size)
+
+    added = 0
+    for chunk in chunks:
+        converted += len(chunk)
+        index = bar_times(chunk, time_shift)
+        times = index.as_unit("ns").asi8
+        bars = chunk[OHLC_COLUMNS].to_numpy(dtype=np.float64)
+        if last_time is not None:
+            new = times > last_time
+            times, bars = times[new], bars[new]
+        tick_times, ticks = ohlc_to_ticks(times, *bars.T)
+        TickStore.append(store_path, tick_times, ticks, tz=index.tz, source=source, source_rows=converted)
+        added += len(times)
+        if len(times):
+            last_time = int(times[-1])
+
+    logger.info(f"Converted {added} new bars from {file_path} to {store_path}")
+    return store_path
+
+
+if __name__ == "__main__":
+    # python -m utils.parse_csv history/gold_m1.csv  (re-run after each export to append the new bars)
+    for csv_file in sys.argv[1:]:
+        convert_ohlc_to_store(csv_file)
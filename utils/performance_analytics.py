@@ -0,0 +1,276 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.ensure_datetime import from_epoch_ns
+
+if TYPE_CHECKING:
+    from core.position_components.trade_ledger import TradeLedger
+
+NS_PER_HOUR = 3_600_000_000_000
+NS_PER_YEAR = 365.25 * 24 * NS_PER_HOUR
+# Hours [start, end) in the timezone of the analysis; the first matching session wins, the rest is "off".
+SESSIONS: Dict[str, Tuple[int, int]] = {
+    "asia": (0, 7),
+    "london": (7, 13),
+    "new_york": (13, 21),
+}
+OFF_SESSION = "off"
+
+
+def drawdown_curve(balances: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Drawdown of a balance series from its running peak.
+
+    Returns:
+        Tuple (drawdowns, drawdowns_percent) aligned with balances.
+    """
+    balances = np.asarray(balances, dtype=np.float64)
+    peaks = np.maximum.accumulate(balances)
+    drawdowns = peaks - balances
+    return drawdowns, drawdowns / peaks * 100
+
+
+def returns_from_equity(equity: np.ndarray) -> np.ndarray:
+    """Simple returns between consecutive equity values."""
+    equity = np.asarray(equity, dtype=np.float64)
+    return np.diff(equity) / equity[:-1]
+
+
+def trade_returns(profits: np.ndarray, balances: np.ndarray) -> np.ndarray:
+    """Return of each trade over the balance it was opened with (balances are taken after each trade)."""
+    profits = np.asarray(profits, dtype=np.float64)
+    return profits / (np.asarray(balances, dtype=np.float64) - profits)
+
+
+def periods_per_year(times: np.ndarray) -> float:
+    """Observations per year implied by the span of times (epoch nanoseconds)."""
+    if len(times) < 2:
+        return np.nan
+    span = (int(times[-1]) - int(times[0])) / NS_PER_YEAR
+    return (len(times) - 1) / span if span > 0 else np.nan
+
+
+def sharpe_ratio(returns: np.ndarray, periods: Optional[float] = None, risk_free: float = 0.0) -> float:
+    """
+    Mean over standard deviation of the excess returns, annualized with sqrt(periods) when given.
+    risk_free is the rate per period of the returns.
+    """
+    excess = np.asarray(returns, dtype=np.float64) - risk_free
+    if len(excess) < 2:
+        return np.nan
+    std = excess.std(ddof=1)
+    if std == 0:
+        return np.nan
+    ratio = excess.mean() / std
+    return float(ratio * np.sqrt(periods)) if periods else float(ratio)
+
+
+def sortino_ratio(returns: np.ndarray, periods: Optional[float] = None, risk_free: float = 0.0) -> float:
+    """Like sharpe_ratio but divided by the downside deviation (root mean square of the negative excess returns)."""
+    excess = np.asarray(returns, dtype=np.float64) - risk_free
+    if len(excess) < 2:
+        return np.nan
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+    mean = excess.mean()
+    if downside == 0:
+        return np.inf if mean > 0 else np.nan
+    ratio = mean / downside
+    return float(ratio * np.sqrt(periods)) if periods else float(ratio)
+
+
+def drawdown_periods(times: np.ndarray, equity: np.ndarray, tz: Any = None) -> pd.DataFrame:
+    """
+    Every stretch spent below a previous equity peak.
+
+    Args:
+        times (np.ndarray): epoch nanoseconds of each equity value
+        equity (np.ndarray): balance or equity curve
+
+    Returns:
+        pd.DataFrame: one row per drawdown with peak_time, trough_time, recovery_time (NaT while not
+        recovered), depth, depth_percent, duration (peak to recovery, or to the last time) and bars.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    drawdowns, drawdowns_pct = drawdown_curve(equity)
+    underwater = drawdowns > 0
+    edges = np.diff(underwater.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return pd.DataFrame(columns=[
+            "peak_time", "trough_time", "recovery_time", "depth", "depth_percent", "duration", "bars"
+        ])
+
+    # Deepest point of each stretch: sort the underwater rows by (stretch, -drawdown) and keep the first of each.
+    rows = np.flatnonzero(underwater)
+    stretch = np.cumsum(edges[:-1] == 1)[rows] - 1
+    order = np.lexsort((-drawdowns[rows], stretch))
+    first = np.flatnonzero(np.diff(stretch[order], prepend=-1))
+    troughs = rows[order[first]]
+
+    n = len(times)
+    peaks: np.ndarray = starts - 1
+    recovered = stops < n
+    ends = times[np.minimum(stops, n - 1)]
+    # int64 min is NaT once converted
+    recovery_times = np.where(recovered, ends, np.iinfo(np.int64).min)
+    return pd.DataFrame({
+        "peak_time": from_epoch_ns(times[peaks], tz),
+        "trough_time": from_epoch_ns(times[troughs], tz),
+        "recovery_time": from_epoch_ns(recovery_times, tz),
+        "depth": drawdowns[troughs],
+        "depth_percent": drawdowns_pct[troughs],
+        "duration": pd.to_timedelta(ends - times[peaks], unit="ns"),
+        "bars": stops - peaks,
+    })
+
+
+def rolling_winrate(profits: np.ndarray, window: int) -> np.ndarray:
+    """Percentage of winning trades (profit >= 0) over the last window trades; nan until window trades exist."""
+    if window < 1:
+        raise ValueError("window must be positive")
+    wins = np.cumsum(np.asarray(profits) >= 0, dtype=np.int64)
+    winrate = np.full(len(wins), np.nan)
+    if len(wins) >= window:
+        counts = wins[window - 1:].copy()
+        counts[1:] -= wins[:-window]
+        winrate[window - 1:] = counts / window * 100
+    return winrate
+
+
+def group_breakdown(keys: np.ndarray, profits: np.ndarray) -> pd.DataFrame:
+    """
+    Trade statistics per distinct key, computed with np.unique + np.bincount.
+
+    Returns:
+        pd.DataFrame indexed by key: trades, wins, winrate_percent, gross_profit, gross_loss,
+        net_profit, profit_factor, average_profit.
+    """
+    if isinstance(keys, pd.Categorical):
+        observed, inverse = np.unique(keys.codes, return_inverse=True)
+        labels = np.asarray(keys.categories)[observed]
+    else:
+        labels, inverse = np.unique(np.asarray(keys), return_inverse=True)
+
+    profits = np.asarray(profits, dtype=np.float64)
+    size = len(labels)
+    is_win = profits >= 0
+    trades = np.bincount(inverse, minlength=size)
+    wins = np.bincount(inverse, weights=is_win, minlength=size).astype(np.int64)
+    gross_profit = np.bincount(inverse, weights=np.where(is_win, profits, 0.0), minlength=size)
+    gross_loss = np.bincount(inverse, weights=np.where(is_win, 0.0, profits), minlength=size)
+    net_profit = gross_profit + gross_loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_factor = np.where(gross_loss != 0, np.abs(gross_profit / gross_loss), np.inf)
+    return pd.DataFrame({
+        "trades": trades,
+        "wins": wins,
+        "winrate_percent": wins / trades * 100,
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "net_profit": net_profit,
+        "profit_factor": profit_factor,
+        "average_profit": net_profit / trades,
+    }, index=pd.Index(labels))
+
+
+def local_times(times: np.ndarray, tz: Any = None) -> np.ndarray:
+    """Epoch nanoseconds shifted to the wall clock of tz (unchanged when tz is None)."""
+    times = np.asarray(times, dtype=np.int64)
+    if tz is None:
+        return times
+    return from_epoch_ns(times, tz).tz_localize(None).asi8
+
+
+def month_keys(times: np.ndarray, tz: Any = None) -> np.ndarray:
+    """Calendar month (datetime64[M]) of each time in tz."""
+    return local_times(times, tz).view("datetime64[ns]").astype("datetime64[M]")
+
+
+def session_keys(
+    times: np.ndarray,
+    tz: Any = None,
+    sessions: Optional[Dict[str, Tuple[int, int]]] = None
+) -> pd.Categorical:
+    """Trading session of each time by its hour in tz (see SESSIONS)."""
+    sessions = SESSIONS if sessions is None else sessions
+    names: List[str] = list(sessions) + [OFF_SESSION]
+    hours: np.ndarray = (local_times(times, tz) // NS_PER_HOUR) % 24
+    codes: np.ndarray = np.full(len(hours), len(names) - 1, dtype=np.int64)
+    for code in range(len(sessions) - 1, -1, -1):
+        start, end = sessions[names[code]]
+        codes[(hours >= start) & (hours < end)] = code
+    return pd.Categorical.from_codes(codes, names)
+
+
+def monthly_breakdown(times: np.ndarray, profits: np.ndarray, tz: Any = None) -> pd.DataFrame:
+    """group_breakdown per calendar month (YYYY-MM) of the trade times."""
+    breakdown = group_breakdown(month_keys(times, tz), profits)
+    breakdown.index = np.datetime_as_string(breakdown.index.to_numpy().astype("datetime64[M]"), unit="M")
+    return breakdown
+
+
+def session_breakdown(
+    times: np.ndarray,
+    profits: np.ndarray,
+    tz: Any = None,
+    sessions: Optional[Dict[str, Tuple[int, int]]] = None
+) -> pd.DataFrame:
+    """group_breakdown per trading session of the trade times."""
+    return group_breakdown(session_keys(times, tz, sessions), profits)
+
+
+def performance_report(
+    ledger: "TradeLedger",
+    tz: Any = None,
+    equity_times: Optional[np.ndarray] = None,
+    equity: Optional[np.ndarray] = None,
+    rolling_window: int = 20,
+    sessions: Optional[Dict[str, Tuple[int, int]]] = None
+) -> Dict[str, Any]:
+    """
+    Risk and breakdown metrics of a closed-trade ledger.
+    Ratios and drawdowns use the candle-level equity curve when given, else the balance after each trade.
+    Trades are attributed to months and sessions by their open time.
+
+    Returns:
+        Dict with "summary" (dict of scalars), "rolling_winrate" (np.ndarray), "drawdowns",
+        "monthly", "sessions" and "exit_reasons" (pd.DataFrame).
+    """
+    if len(ledger) == 0:
+        return {}
+
+    profits = ledger.column("profit")
+    open_times = ledger.column("open_time")
+    if equity is None:
+        curve_times = ledger.column("exit_time")
+        curve = ledger.column("balance")
+        returns = trade_returns(profits, curve)
+    else:
+        curve_times = np.asarray(equity_times, dtype=np.int64)
+        curve = np.asarray(equity, dtype=np.float64)
+        returns = returns_from_equity(curve)
+
+    per_year = periods_per_year(curve_times)
+    periods = None if np.isnan(per_year) else per_year
+    drawdowns = drawdown_periods(curve_times, curve, tz)
+    depth, depth_pct = drawdown_curve(curve)
+    summary = {
+        "sharpe_ratio": sharpe_ratio(returns, periods),
+        "sortino_ratio": sortino_ratio(returns, periods),
+        "max_drawdown": float(depth.max()),
+        "max_drawdown_percent": float(depth_pct.max()),
+        "max_drawdown_duration": drawdowns["duration"].max() if len(drawdowns) else pd.Timedelta(0),
+        "drawdown_periods": len(drawdowns),
+    }
+    reasons = pd.Categorical.from_codes(ledger.column("exit_reason"), ledger.reason_names)
+    return {
+        "summary": summary,
+        "rolling_winrate": rolling_winrate(profits, rolling_window),
+        "drawdowns": drawdowns,
+        "monthly": monthly_breakdown(open_times, profits, tz),
+        "sessions": session_breakdown(open_times, profits, tz, sessions),
+        "exit_reasons": group_breakdown(reasons, profits),
+    }
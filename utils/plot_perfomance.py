@@ -1,10 +1,12 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional
 
-import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from config import BALANCE
+from core.position_components.equity_tracker import EquityTracker
+from core.position_components.trade_ledger import TradeLedger
+from utils.ensure_datetime import from_epoch_ns
 
 
 def plot_complete_performance_dashboard(df, summary):
@@ -66,78 +68,45 @@ def plot_complete_performance_dashboard(df, summary):
     fig.show()
 
 
-def calculate_max_drawdown_percent_from_closed_positions(closed_positions: List[Dict[str, Any]]) -> float:
+def calculate_max_drawdown_percent_from_closed_positions(closed_positions: TradeLedger) -> float:
     if not closed_positions:
         return 0.0
 
-    balances = [pos["balance"] for pos in closed_positions]
+    _, drawdowns_pct = closed_positions.drawdowns()
+    return float(drawdowns_pct.max())
 
-    peak = balances[0]
-    max_drawdown_pct = 0.0
 
-    for balance in balances:
-        if balance > peak:
-            peak = balance
-        drawdown_pct = (peak - balance) / peak * 100
-        if drawdown_pct > max_drawdown_pct:
-            max_drawdown_pct = drawdown_pct
-
-    return max_drawdown_pct
-
-
-def calculate_max_drawdown_from_closed_positions(closed_positions: List[Dict[str, Any]]) -> float:
+def calculate_max_drawdown_from_closed_positions(closed_positions: TradeLedger) -> float:
     if not closed_positions:
         return 0.0
 
-    balances = [pos["balance"] for pos in closed_positions]
-
-    peak = balances[0]
-    max_drawdown = 0.0
+    drawdowns, _ = closed_positions.drawdowns()
+    return float(drawdowns.max())
 
-    for balance in balances:
-        if balance > peak:
-            peak = balance
-        drawdown = peak - balance
-        if drawdown > max_drawdown:
-            max_drawdown = drawdown
 
-    return max_drawdown
-
-
-def plot_performance_dashboard(closed_positions: List[Dict[str, Any]], summary: Dict[str, Any]):
+def plot_performance_dashboard(
+    closed_positions: TradeLedger,
+    summary: Dict[str, Any],
+    tz=None,
+    equity_tracker: Optional[EquityTracker] = None
+):
+    """
+    Balance after each closed trade; with equity_tracker also the per-candle mark-to-market equity,
+    whose drawdown (including open trades) is then the one reported.
+    """
     if not closed_positions:
         print("No closed positions to show.")
         return
 
-    trades_data = []
-    for pos in closed_positions:
-        entry = pos["entry"]
-        exit_price = pos["exit_price"]
-        ttype = pos["type"]
-        direction = 1 if ttype == "buy" else -1
-        pnl = (exit_price - entry) * direction
-
-        trades_data.append({
-            "time_entry": pos["open_time"],
-            "time_exit": pos["exit_time"],
-            "entry_price": entry,
-            "exit_price": exit_price,
-            "pnl": pnl,
-            "type": ttype,
-            "zone": pos.get("zone", "N/A"),
-            "reason": pos.get("exit_reason", "N/A"),
-        })
-
-    times = [pos["open_time"] for pos in closed_positions]
-    balances = [pos["balance"] for pos in closed_positions]
-    rolling_max = np.maximum.accumulate(balances)
-    drawdowns = rolling_max - balances
-    drawdowns_pct = (drawdowns / rolling_max) * 100
-
-    max_drawdown_percent = max(drawdowns_pct)
-    max_drawdown = max(drawdowns)
-    summary["max_drawdown_percent"] = max_drawdown_percent
-    summary["max_drawdown"] = max_drawdown
+    times = from_epoch_ns(closed_positions.column("open_time"), tz)
+    balances = closed_positions.column("balance")
+    drawdowns, drawdowns_pct = closed_positions.drawdowns()
+
+    summary["max_drawdown_percent"] = drawdowns_pct.max()
+    summary["max_drawdown"] = drawdowns.max()
+    if equity_tracker is not None and len(equity_tracker):
+        summary["max_drawdown_percent"] = equity_tracker.max_drawdown_percent
+        summary["max_drawdown"] = equity_tracker.max_drawdown
     # Scoreboard layout
     rows_scoreboard = (len(summary) + 2) // 3
     fig = make_subplots(
@@ -168,6 +137,14 @@ def plot_performance_dashboard(closed_positions: List[Dict[str, Any]], summary:
         name='Balance',
         line={"color": "blue"}
     ), row=rows_scoreboard + 1, col=1)
+
+    if equity_tracker is not None and len(equity_tracker):
+        fig.add_trace(go.Scatter(
+            x=from_epoch_ns(equity_tracker.column("time"), tz),
+            y=equity_tracker.column("equity"),
+            name='Equity',
+            line={"color": "orange", "width": 1}
+        ), row=rows_scoreboard + 1, col=1)
     
     fig.add_trace(go.Scatter(
         x=times,
@@ -0,0 +1,274 @@
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from numba import njit
+
+from config import LOOKBACK, MAX_LOOKBACK, MIN_RRR, RRR_HARD, RRR_SOFT
+
+
+def sparse_table_levels(max_window: int) -> int:
+    """Levels needed to answer any range of up to max_window rows."""
+    return max(int(max_window).bit_length(), 1)
+
+
+@njit
+def sparse_table_append(table: np.ndarray, pos: int, value: float, is_min: bool) -> None:
+    """
+    Writes values[pos] into a sparse table whose rows [0, pos) are already filled.
+    table[k, j] holds the min (or max) of values[j:j + 2**k]; only the entries ending at pos are new.
+    """
+    table[0, pos] = value
+    for k in range(1, table.shape[0]):
+        j = pos - (1 << k) + 1
+        if j < 0:
+            break
+        a = table[k - 1, j]
+        b = table[k - 1, j + (1 << (k - 1))]
+        if is_min:
+            table[k, j] = a if a < b else b
+        else:
+            table[k, j] = a if a > b else b
+
+
+@njit
+def build_sparse_table(values: np.ndarray, levels: int, is_min: bool) -> np.ndarray:
+    table = np.empty((levels, len(values)))
+    for pos in range(len(values)):
+        sparse_table_append(table, pos, values[pos], is_min)
+    return table
+
+
+@njit
+def range_extreme(table: np.ndarray, start: int, stop: int, is_min: bool) -> float:
+    """Min (or max) of values[start:stop] in O(1); stop - start must fit in the table levels."""
+    length = stop - start
+    k = 0
+    while (1 << (k + 1)) <= length:
+        k += 1
+    a = float(table[k, start])
+    b = float(table[k, stop - (1 << k)])
+    if is_min:
+        return a if a < b else b
+    return a if a > b else b
+
+
+@njit
+def find_swing(
+    table: np.ndarray,
+    first: int,
+    end: int,
+    entry: float,
+    lookback: int,
+    max_lookback: int,
+    is_min: bool
+) -> Tuple[float, bool]:
+    """
+    Most recent window values[end - lookback * i:end] (i = 1 .. max_lookback // lookback, only windows
+    that fit after `first`) whose min is below entry (is_min) or whose max is above it.
+    The suffix min only decreases (max only increases) as the window grows, so the first match is
+    found by binary search: O(log n) range queries.
+
+    Returns:
+        (extreme of that window, True) or (nan, False) when no window matches.
+    """
+    steps = max_lookback // lookback
+    available = (end - first) // lookback
+    if available < steps:
+        steps = available
+
+    low = 1
+    high = steps
+    match = -1
+    while low <= high:
+        mid = (low + high) // 2
+        value = range_extreme(table, end - lookback * mid, end, is_min)
+        if (is_min and value < entry) or (not is_min and value > entry):
+            match = mid
+            high = mid - 1
+        else:
+            low = mid + 1
+
+    if match == -1:
+        return np.nan, False
+    return range_extreme(table, end - lookback * match, end, is_min), True
+
+
+@njit
+def tp_sl_from_tables(
+    low_table: np.ndarray,
+    high_table: np.ndarray,
+    first: int,
+    end: int,
+    entry: float,
+    direction: int,
+    rsi: float,
+    rrr_soft: float,
+    rrr_hard: float,
+    min_rrr: float,
+    lookback: int,
+    max_lookback: int
+) -> Tuple[float, float]:
+    """
+    calculate_initial_tp_sl over the candles [first, end) of the indexed lows/highs.
+    direction: 1 for BUY, -1 for SELL.
+    """
+    if direction == 1:
+        rrr = rrr_hard if rsi <= 25 else rrr_soft
+    else:
+        rrr = rrr_hard if rsi >= 75 else rrr_soft
+
+    fallback_start = max(end - lookback, first)
+    if direction == 1:
+        sl, found = find_swing(low_table, first, end, entry, lookback, max_lookback, True)
+        if not found:
+            sl = range_extreme(low_table, fallback_start, end, True)
+        tp, found = find_swing(high_table, first, end, entry, lookback, max_lookback, False)
+        if not found:
+            tp = entry + abs(entry - sl) * max(rrr, 1.0)
+    else:
+        sl, found = find_swing(high_table, first, end, entry, lookback, max_lookback, False)
+        if not found:
+            sl = range_extreme(high_table, fallback_start, end, False)
+        tp = entry - abs(sl - entry) * max(rrr, min_rrr)
+
+    return tp, sl
+
+
+@njit
+def _calculate_tp_sl_batch(
+    low_table: np.ndarray,
+    high_table: np.ndarray,
+    ends: np.ndarray,
+    entries: np.ndarray,
+    directions: np.ndarray,
+    rsi: np.ndarray,
+    rrr_soft: float,
+    rrr_hard: float,
+    min_rrr: float,
+    lookback: int,
+    max_lookback: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(ends)
+    tps = np.empty(n)
+    sls = np.empty(n)
+    for i in range(n):
+        tps[i], sls[i] = tp_sl_from_tables(
+            low_table, high_table, 0, ends[i], entries[i], directions[i], rsi[i],
+            rrr_soft, rrr_hard, min_rrr, lookback, max_lookback
+        )
+    return tps, sls
+
+
+def calculate_tp_sl_batch(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    ends: np.ndarray,
+    entries: np.ndarray,
+    directions: np.ndarray,
+    rsi: np.ndarray,
+    rrr_soft: float = RRR_SOFT,
+    rrr_hard: float = RRR_HARD,
+    min_rrr: float = MIN_RRR,
+    lookback: int = LOOKBACK,
+    max_lookback: int = MAX_LOOKBACK
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    calculate_initial_tp_sl for many signals at once. Signal i sees the candles lows[:ends[i]] and highs[:ends[i]].
+
+    Args:
+        lows, highs (np.ndarray): candle lows and highs of the whole history
+        ends (np.ndarray): number of candles visible to each signal (>= 1)
+        entries (np.ndarray): entry price of each signal
+        directions (np.ndarray): 1 for BUY, -1 for SELL
+        rsi (np.ndarray): RSI at each signal
+
+    Returns:
+        Tuple (tps, sls) aligned with the signals.
+    """
+    levels = sparse_table_levels(max(lookback, max_lookback))
+    low_table = build_sparse_table(np.ascontiguousarray(lows, dtype=np.float64), levels, True)
+    high_table = build_sparse_table(np.ascontiguousarray(highs, dtype=np.float64), levels, False)
+    return _calculate_tp_sl_batch(
+        low_table, high_table,
+        np.asarray(ends, dtype=np.int64),
+        np.asarray(entries, dtype=np.float64),
+        np.asarray(directions, dtype=np.int64),
+        np.asarray(rsi, dtype=np.float64),
+        rrr_soft, rrr_hard, min_rrr, lookback, max_lookback
+    )
+
+
+class SwingIndex:
+    """
+    Streaming range-min/range-max index over candle lows and highs (sparse tables) for TP/SL lookups.
+
+    Only the last `window` candles are kept: the tables hold 2 * window columns and slide the newest
+    window columns back to the start when full, so append and memory stay bounded on long runs.
+    """
+
+    def __init__(self, lookback: int = LOOKBACK, max_lookback: int = MAX_LOOKBACK):
+        self.lookback = lookback
+        self.max_lookback = max_lookback
+        # One extra candle so queries that skip the newest one still see the full lookback.
+        self.window = max(lookback, max_lookback) + 1
+        levels = sparse_table_levels(self.window)
+        self.low_table = np.empty((levels, 2 * self.window))
+        self.high_table = np.empty((levels, 2 * self.window))
+        self.end = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.end
+
+    def append(self, low: float, high: float) -> None:
+        if self.end == self.low_table.shape[1]:
+            keep = self.window
+            self.low_table[:, :keep] = self.low_table[:, self.end - keep:self.end]
+            self.high_table[:, :keep] = self.high_table[:, self.end - keep:self.end]
+            self.end = keep
+
+        sparse_table_append(self.low_table, self.end, low, True)
+        sparse_table_append(self.high_table, self.end, high, False)
+        self.end += 1
+        self.total += 1
+
+    def calculate_tp_sl(
+        self,
+        entry: float,
+        direction: int,
+        rsi: float,
+        rrr_soft: float = RRR_SOFT,
+        rrr_hard: float = RRR_HARD,
+        min_rrr: float = MIN_RRR,
+        skip_last: int = 0
+    ) -> Tuple[float, float]:
+        """
+        Same result as calculate_initial_tp_sl over the indexed candles (minus the newest skip_last).
+        direction: 1 for BUY, -1 for SELL.
+        """
+        end = self.end - skip_last
+        if end <= 0:
+            raise ValueError("SwingIndex has no candles to search")
+
+        tp, sl = tp_sl_from_tables(
+            self.low_table, self.high_table, 0, end, entry, direction, rsi,
+            rrr_soft, rrr_hard, min_rrr, self.lookback, self.max_lookback
+        )
+        return float(tp), float(sl)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "lookback": self.lookback,
+            "max_lookback": self.max_lookback,
+            "low_table": self.low_table[:, :self.end].copy(),
+            "high_table": self.high_table[:, :self.end].copy(),
+            "total": self.total,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        if state["lookback"] != self.lookback or state["max_lookback"] != self.max_lookback:
+            raise ValueError("SwingIndex state was saved with a different lookback")
+        self.end = state["low_table"].shape[1]
+        self.low_table[:, :self.end] = state["low_table"]
+        self.high_table[:, :self.end] = state["high_table"]
+        self.total = state["total"]
@@ -1,11 +1,13 @@
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 import numpy as np
 import pandas as pd
+from numba import njit
 
-from config import MIN_RRR, RRR_HARD, RRR_SOFT
+from config import LOOKBACK, MAX_LOOKBACK, MIN_RRR, RRR_HARD, RRR_SOFT
 from enums.type_signals import TypeSignal
 from utils.logger import get_logger
+from utils.swing_index import build_sparse_table, find_swing, range_extreme, sparse_table_levels
 
 logger = get_logger(__name__)
 
@@ -61,6 +63,92 @@ def get_trade_parameters(
     return tp, sl, rrr, zone
 
 
+@njit
+def _trade_parameters_sl_numba(
+    low_table: np.ndarray,
+    high_table: np.ndarray,
+    ends: np.ndarray,
+    entries: np.ndarray,
+    directions: np.ndarray,
+    lookback: int,
+    max_lookback: int
+) -> np.ndarray:
+    """SL of get_trade_parameters for each signal; signal i sees the candles [0, ends[i])."""
+    n = len(ends)
+    sls = np.empty(n)
+    widest = lookback * (max_lookback // lookback)
+    for i in range(n):
+        end = ends[i]
+        if directions[i] == 1:
+            # Windows longer than the history are clipped to it, so when no full window matches the
+            # result is the min of the widest (clipped) window either way.
+            sl, found = find_swing(low_table, 0, end, entries[i], lookback, max_lookback, True)
+            if not found:
+                sl = range_extreme(low_table, max(end - widest, 0), end, True)
+            sls[i] = sl
+        else:
+            sls[i] = range_extreme(high_table, max(end - lookback, 0), end, False)
+    return sls
+
+
+def get_trade_parameters_batch(
+    df: pd.DataFrame,
+    signal_mask: Union[pd.Series, np.ndarray],
+    direction: Union[TypeSignal, pd.Series, np.ndarray],
+    rrr_soft: float = RRR_SOFT,
+    rrr_hard: float = RRR_HARD,
+    min_rrr: float = MIN_RRR,
+    entry_column: str = "close",
+    rsi_column: str = "rsi",
+    lookback: int = LOOKBACK,
+    max_lookback: int = MAX_LOOKBACK
+) -> pd.DataFrame:
+    """
+    get_trade_parameters for every signal row of a candle frame in one pass.
+    Row r is evaluated as if df[:r + 1] were the frame passed to get_trade_parameters, with the
+    entry and rsi taken from row r.
+
+    Args:
+        df (pd.DataFrame): candles with low, high, entry_column and rsi_column
+        signal_mask (pd.Series | np.ndarray): boolean mask of the signal rows
+        direction (TypeSignal | pd.Series | np.ndarray): one direction for every signal, or one TypeSignal per row of df
+
+    Returns:
+        pd.DataFrame: columns tp, sl, rrr, zone indexed like the signal rows of df
+    """
+    mask = np.asarray(signal_mask, dtype=bool)
+    rows = np.flatnonzero(mask)
+    index = df.index[rows]
+    if len(rows) == 0:
+        return pd.DataFrame({"tp": [], "sl": [], "rrr": [], "zone": []}, index=index)
+
+    if isinstance(direction, TypeSignal):
+        is_buy = np.full(len(rows), direction == TypeSignal.BUY)
+    else:
+        is_buy = np.asarray(direction, dtype=object)[rows] == TypeSignal.BUY
+
+    entries = df[entry_column].to_numpy(dtype=np.float64)[rows]
+    rsi = df[rsi_column].to_numpy(dtype=np.float64)[rows]
+
+    levels = sparse_table_levels(max(lookback, max_lookback))
+    low_table = build_sparse_table(df["low"].to_numpy(dtype=np.float64), levels, True)
+    high_table = build_sparse_table(df["high"].to_numpy(dtype=np.float64), levels, False)
+    sl = _trade_parameters_sl_numba(
+        low_table, high_table, rows + 1, entries, np.where(is_buy, 1, -1), lookback, max_lookback
+    )
+
+    zone = np.select(
+        [is_buy & (rsi <= 25), is_buy & (rsi <= 35), is_buy, rsi >= 75, rsi >= 65],
+        ["Hard Buy", "Soft Buy", "Neutral Buy", "Hard Sell", "Soft Sell"],
+        default="Neutral Sell"
+    )
+    rrr = np.where(np.isin(zone, ["Hard Buy", "Hard Sell"]), rrr_hard, rrr_soft)
+    distance = np.abs(entries - sl) * np.maximum(rrr, min_rrr)
+    tp = np.where(is_buy, entries + distance, entries - distance)
+
+    return pd.DataFrame({"tp": tp, "sl": sl, "rrr": rrr, "zone": zone}, index=index)
+
+
 def calculate_initial_tp_sl(
     lows: List[float],
     highs: List[float],
@@ -70,8 +158,8 @@ def calculate_initial_tp_sl(
     rrr_soft: float = RRR_SOFT,
     rrr_hard: float = RRR_HARD,
     min_rrr: float = MIN_RRR,
-    lookback: int = 5,
-    max_lookback: int = 50
+    lookback: int = LOOKBACK,
+    max_lookback: int = MAX_LOOKBACK
 ):
     sl = None
     tp = None
@@ -100,7 +188,7 @@ def calculate_initial_tp_sl(
             find_lookback = lookback * i
             if len(lows) < find_lookback:
                 break
-            recent_low = np.min(lows[-find_lookback:])
+            recent_low = float(np.min(lows[-find_lookback:]))
             if recent_low < entry:
                 sl = recent_low
                 break
@@ -113,7 +201,7 @@ def calculate_initial_tp_sl(
             if len(highs) < find_lookback:
                 break
             
-            recent_high = np.max(highs[-find_lookback:])
+            recent_high = float(np.max(highs[-find_lookback:]))
             if recent_high > entry:
                 # if recent_high - entry < BREAK_EVEN_TRIGGER:
                 #     tp = recent_high + BREAK_EVEN_TRIGGER
@@ -128,7 +216,7 @@ def calculate_initial_tp_sl(
             find_lookback = lookback * i
             if len(highs) < find_lookback:
                 break
-            recent_high = np.max(highs[-find_lookback:])
+            recent_high = float(np.max(highs[-find_lookback:]))
             if recent_high > entry:
                 sl = recent_high
                 break